@@ -0,0 +1,74 @@
+"""
+Time full-image decoding against the number of threads and the tile size.
+
+Usage:  python benchmarks/decode_threads.py [--size N] [--repeat N]
+                                           [--threads N,N,...]
+
+A synthetic RGB image is encoded losslessly to temporary files with several
+tile sizes, and each is decoded with Jp2k.read_bands(num_threads=N).  More
+than one thread requires OpenJPEG 2.2.0 or later built with thread support.
+"""
+# Standard library imports ...
+import argparse
+import multiprocessing
+import os
+import shutil
+import tempfile
+import timeit
+
+# Third party library imports ...
+import numpy as np
+
+# Local imports
+import glymur
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--size', type=int, default=2048)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--threads',
+                        help='thread counts, defaults to powers of two up '
+                             'to the number of CPUs')
+    args = parser.parse_args()
+
+    # Smooth gradients plus noise compress like a natural image.
+    rows, cols = np.mgrid[:args.size, :args.size]
+    noise = np.random.RandomState(0).randint(0, 16, (args.size, args.size))
+    image = np.dstack([(rows + noise) % 256, (cols + noise) % 256,
+                       (rows + cols) // 2 % 256]).astype(np.uint8)
+
+    max_threads = multiprocessing.cpu_count()
+    if args.threads is not None:
+        thread_counts = [int(n) for n in args.threads.split(',')]
+    else:
+        thread_counts = [n for n in (1, 2, 4, 8, 16) if n <= max_threads]
+    if not glymur.lib.openjp2.has_thread_support():
+        thread_counts = [1]
+    tilesizes = [None, (1024, 1024), (512, 512), (256, 256)]
+
+    print('OpenJPEG {0}, {1} CPUs, {2}x{2} RGB image, MB/s'.format(
+        glymur.version.openjpeg_version, max_threads, args.size))
+    print('{0:>12s}'.format('tile') +
+          ''.join('{0:>10d}'.format(n) for n in thread_counts))
+
+    tdir = tempfile.mkdtemp()
+    path = os.path.join(tdir, 'image.jp2')
+    try:
+        for tilesize in tilesizes:
+            label = 'none' if tilesize is None else '{0}x{1}'.format(*tilesize)
+            line = '{0:>12s}'.format(label)
+            jp2 = glymur.Jp2k(path, data=image, tilesize=tilesize)
+            for num_threads in thread_counts:
+                def decode():
+                    jp2.read_bands(num_threads=num_threads)
+                seconds = min(timeit.repeat(decode, number=1,
+                                            repeat=args.repeat))
+                line += '{0:>10.1f}'.format(image.nbytes / seconds / 1e6)
+            print(line)
+    finally:
+        shutil.rmtree(tdir)
+
+
+if __name__ == '__main__':
+    main()
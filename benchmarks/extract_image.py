@@ -0,0 +1,84 @@
+"""
+Time the extraction of decoded components into a NumPy array.
+
+Usage:  python benchmarks/extract_image.py [--repeat N]
+
+Images of 1, 3, and 4 components of 2048 x 2048 and of 200 components of
+256 x 256 are encoded to temporary files and decoded once.  Only the
+copying of the library's buffers into an array is then timed: into a new
+array, into the same output array each time, and into a new array with the
+components first.  The first column extracts each component with a
+temporary astype copy and a strided write, for comparison.
+"""
+# Standard library imports ...
+import argparse
+import ctypes
+import os
+import shutil
+import tempfile
+import timeit
+
+# Third party library imports ...
+import numpy as np
+
+# Local imports
+import glymur
+
+
+def extract_astype(jp2, raw_image):
+    """Extract each component with a temporary copy of its own."""
+    ncomps = raw_image.contents.numcomps
+    first = raw_image.contents.comps[0]
+    dtype = jp2._component2dtype(first)
+    image = np.zeros((first.h, first.w, ncomps), dtype)
+    for k in range(ncomps):
+        component = raw_image.contents.comps[k]
+        nelts = component.h * component.w
+        band = np.ctypeslib.as_array(
+            (ctypes.c_int32 * nelts).from_address(
+                ctypes.addressof(component.data.contents)))
+        band = band.astype(dtype).reshape(component.h, component.w)
+        image[:, :, k] = band
+    return image
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    shapes = [(2048, 2048, 1), (2048, 2048, 3), (2048, 2048, 4),
+              (256, 256, 200)]
+
+    print('OpenJPEG {0}, ms'.format(glymur.version.openjpeg_version))
+    print('{0:>14s}{1:>10s}{2:>10s}{3:>10s}{4:>10s}'.format(
+        'shape', 'astype', 'new', 'out', 'chw'))
+
+    tdir = tempfile.mkdtemp()
+    path = os.path.join(tdir, 'image.j2k')
+    try:
+        for shape in shapes:
+            data = np.random.RandomState(0).randint(0, 256, shape)
+            jp2 = glymur.Jp2k(path, data=data.astype(np.uint8))
+            out = np.empty(shape, np.uint8)
+            with jp2.open_session() as session:
+                session.read()
+                raw_image = session._image
+                timings = [
+                    lambda: extract_astype(jp2, raw_image),
+                    lambda: jp2._extract_image(raw_image),
+                    lambda: jp2._extract_image(raw_image, out=out),
+                    lambda: jp2._extract_image(raw_image, layout='chw'),
+                ]
+                line = '{0:>14s}'.format('x'.join(str(n) for n in shape))
+                for func in timings:
+                    seconds = min(timeit.repeat(func, number=1,
+                                                repeat=args.repeat))
+                    line += '{0:>10.1f}'.format(1000 * seconds)
+            print(line)
+    finally:
+        shutil.rmtree(tdir)
+
+
+if __name__ == '__main__':
+    main()
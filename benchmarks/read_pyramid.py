@@ -0,0 +1,64 @@
+"""
+Time Jp2k.read_pyramid against slicing each resolution level separately.
+
+Usage:  python benchmarks/read_pyramid.py [FILE] [--numres N] [--repeat N]
+
+Without a file, the nemo image shipped with glymur is written to temporary
+files with N resolution levels, once as a single tile and once in tiles of
+512 x 512, and both are timed.
+"""
+# Standard library imports ...
+import argparse
+import os
+import shutil
+import tempfile
+import timeit
+
+# Local imports
+import glymur
+
+
+def slice_levels(jp2, num_levels):
+    """Decode every resolution level by slicing."""
+    return [jp2[::2 ** rlevel, ::2 ** rlevel]
+            for rlevel in range(num_levels + 1)]
+
+
+def time_file(jp2, repeat):
+    num_levels = jp2.codestream.segment[2].num_res
+    timings = [
+        ('slicing', lambda: slice_levels(jp2, num_levels)),
+        ('read_pyramid', jp2.read_pyramid),
+    ]
+    print('{0}: {1} resolution levels'.format(jp2.filename, num_levels + 1))
+    for name, func in timings:
+        seconds = min(timeit.repeat(func, number=1, repeat=repeat))
+        print('{0:>14s}: {1:.3f}s'.format(name, seconds))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('filename', nargs='?')
+    parser.add_argument('--numres', type=int, default=6)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print('OpenJPEG {0}'.format(glymur.version.openjpeg_version))
+    if args.filename is not None:
+        time_file(glymur.Jp2k(args.filename), args.repeat)
+        return
+
+    data = glymur.Jp2k(glymur.data.nemo())[:]
+    tempdir = tempfile.mkdtemp()
+    try:
+        for name, kwargs in [('single.jp2', {}),
+                             ('tiled.jp2', {'tilesize': (512, 512)})]:
+            path = os.path.join(tempdir, name)
+            jp2 = glymur.Jp2k(path, data=data, numres=args.numres, **kwargs)
+            time_file(jp2, args.repeat)
+    finally:
+        shutil.rmtree(tempdir)
+
+
+if __name__ == '__main__':
+    main()
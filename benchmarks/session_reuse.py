@@ -0,0 +1,87 @@
+"""
+Time small windows read by slicing against reads through a decoder session.
+
+Usage:  python benchmarks/session_reuse.py [FILE] [--window N] [--count N]
+                                           [--repeat N]
+
+Without a file, the nemo image shipped with glymur is written to temporary
+files once as a single tile and once in tiles of 256 x 256, and both are
+timed.  The windows are at random positions, the same ones for both
+methods.  A session decodes a single-tile image with one codec only with
+OpenJPEG 2.3.0 or later.
+"""
+# Standard library imports ...
+import argparse
+import os
+import shutil
+import tempfile
+import timeit
+
+# Third party library imports ...
+import numpy as np
+
+# Local imports
+import glymur
+
+
+def window_areas(jp2, window, count):
+    """Areas of random windows within the image."""
+    numrows, numcols = jp2.shape[:2]
+    random = np.random.RandomState(0)
+    rows = random.randint(0, numrows - window, count)
+    cols = random.randint(0, numcols - window, count)
+    return [(int(r), int(c), int(r) + window, int(c) + window)
+            for r, c in zip(rows, cols)]
+
+
+def read_sliced(jp2, areas):
+    """Read each window by slicing."""
+    for r0, c0, r1, c1 in areas:
+        jp2[r0:r1, c0:c1]
+
+
+def read_session(jp2, areas):
+    """Read each window through one session."""
+    with jp2.open_session() as session:
+        for area in areas:
+            session.read(area=area)
+
+
+def time_file(jp2, window, count, repeat):
+    areas = window_areas(jp2, window, count)
+    print('{0}: {1} windows of {2}x{2}, ms per window'.format(
+        jp2.filename, count, window))
+    for name, func in [('slicing', read_sliced), ('session', read_session)]:
+        seconds = min(timeit.repeat(lambda: func(jp2, areas), number=1,
+                                    repeat=repeat))
+        print('{0:>14s}: {1:.2f}'.format(name, 1000 * seconds / count))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('filename', nargs='?')
+    parser.add_argument('--window', type=int, default=64)
+    parser.add_argument('--count', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print('OpenJPEG {0}'.format(glymur.version.openjpeg_version))
+    if args.filename is not None:
+        time_file(glymur.Jp2k(args.filename), args.window, args.count,
+                  args.repeat)
+        return
+
+    data = glymur.Jp2k(glymur.data.nemo())[:]
+    tempdir = tempfile.mkdtemp()
+    try:
+        for name, kwargs in [('single.jp2', {}),
+                             ('tiled.jp2', {'tilesize': (256, 256)})]:
+            path = os.path.join(tempdir, name)
+            jp2 = glymur.Jp2k(path, data=data, **kwargs)
+            time_file(jp2, args.window, args.count, args.repeat)
+    finally:
+        shutil.rmtree(tempdir)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,14 +3,19 @@
 # Local imports
 from glymur import version
 from .jp2k import Jp2k
+from .batch import read_many, write_many
+from ._write import write_from, encode
 from .config import (get_option, set_option, reset_option,
                      get_printoptions, set_printoptions,
                      get_parseoptions, set_parseoptions)
+from ._cache import tile_cache_info, clear_tile_cache
+from ._async import aopen, awrite
 from . import data
 
 __version__ = version.version
 
 
-__all__ = [__version__, Jp2k, get_printoptions, set_printoptions,
-           get_parseoptions, set_parseoptions, get_option, set_option,
-           reset_option, data]
+__all__ = [__version__, Jp2k, read_many, write_many, write_from, encode,
+           get_printoptions, set_printoptions, get_parseoptions,
+           set_parseoptions, get_option, set_option, reset_option,
+           tile_cache_info, clear_tile_cache, aopen, awrite, data]
@@ -0,0 +1,147 @@
+# -*- coding:  utf-8 -*-
+"""
+Part of glymur.
+
+Running the OpenJPEG work of the asyncio API on a bounded executor, sized by
+the 'async.workers' option.
+"""
+# Standard library imports ...
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import multiprocessing
+import threading
+
+_LOCK = threading.Lock()
+_EXECUTOR = None
+
+
+def get_executor():
+    """
+    Return the shared executor, creating it if necessary.
+    """
+    global _EXECUTOR
+    # The options module imports this one.
+    from .config import get_option
+
+    with _LOCK:
+        if _EXECUTOR is None:
+            workers = get_option('async.workers')
+            if workers is None:
+                workers = multiprocessing.cpu_count()
+            _EXECUTOR = ThreadPoolExecutor(max_workers=workers)
+        return _EXECUTOR
+
+
+def reset_executor():
+    """
+    Discard the shared executor so that the next one has the current size.
+    Work already submitted to the old one still runs to completion.
+    """
+    global _EXECUTOR
+    with _LOCK:
+        if _EXECUTOR is not None:
+            _EXECUTOR.shutdown(wait=False)
+        _EXECUTOR = None
+
+
+class _ExecutorCall(object):
+    """
+    Awaitable that runs a function on an executor when it is awaited.
+    """
+    def __init__(self, func, executor):
+        self._func = func
+        self._executor = executor
+
+    def __await__(self):
+        import asyncio
+
+        executor = self._executor
+        if executor is None:
+            executor = get_executor()
+        try:
+            loop = asyncio.get_running_loop()
+        except AttributeError:
+            # Python versions older than 3.7.
+            loop = asyncio.get_event_loop()
+        return loop.run_in_executor(executor, self._func).__await__()
+
+
+def run(func, args=(), kwargs=None, executor=None):
+    """
+    Run a function on an executor without blocking the event loop.
+
+    Parameters
+    ----------
+    func : callable
+        The blocking work.
+    args, kwargs : optional
+        Arguments for the function.
+    executor : concurrent.futures.Executor, optional
+        Defaults to the shared executor.
+
+    Returns
+    -------
+    awaitable
+        Like a coroutine, the work is submitted once this is awaited.
+        Cancelling the awaiting task cancels the work if it has not yet
+        started.  Work already underway runs to completion and its result
+        is discarded.
+    """
+    if kwargs is None:
+        kwargs = {}
+    return _ExecutorCall(functools.partial(func, *args, **kwargs), executor)
+
+
+def aopen(filename, executor=None):
+    """Open a JPEG 2000 file for reading without blocking the event loop.
+
+    Parameters
+    ----------
+    filename : str
+        The path to JPEG 2000 file.
+    executor : concurrent.futures.Executor, optional
+        Executor to parse the file on, defaults to one shared by glymur and
+        sized by the 'async.workers' option.
+
+    Returns
+    -------
+    awaitable
+        Resolves to the Jp2k object once the file is parsed.
+
+    See also
+    --------
+    Jp2k.aread, awrite
+    """
+    from .jp2k import Jp2k
+
+    return run(Jp2k, args=(filename,), executor=executor)
+
+
+def awrite(filename, data, executor=None, **kwargs):
+    """Write a JPEG 2000 file without blocking the event loop.
+
+    Parameters
+    ----------
+    filename : str
+        The path to JPEG 2000 file.
+    data : ndarray
+        Image data to be written to file.
+    executor : concurrent.futures.Executor, optional
+        Executor to encode on, defaults to one shared by glymur and sized by
+        the 'async.workers' option.
+    kwargs : optional
+        Any of the compression parameters accepted by Jp2k.
+
+    Returns
+    -------
+    awaitable
+        Resolves to the new Jp2k object once the file is written.
+
+    See also
+    --------
+    aopen, Jp2k.aread
+    """
+    from .jp2k import Jp2k
+
+    return run(Jp2k, args=(filename,), kwargs=dict(kwargs, data=data),
+               executor=executor)
@@ -0,0 +1,114 @@
+# -*- coding:  utf-8 -*-
+"""
+Part of glymur.
+
+Least-recently-used cache of decoded tiles, sized by the 'cache.tile_bytes'
+option.
+"""
+# Standard library imports ...
+from collections import namedtuple, OrderedDict
+import threading
+
+CacheInfo = namedtuple('CacheInfo',
+                       ['hits', 'misses', 'evictions', 'tiles', 'nbytes'])
+
+
+class TileCache(object):
+    """
+    Decoded tiles keyed by (file identity, tile index, rlevel, layer,
+    components, ignore_pclr_cmap_cdef).
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tiles = OrderedDict()
+        self._nbytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key):
+        """
+        Return the cached tile, or None, marking it as most recently used.
+        """
+        with self._lock:
+            tile = self._tiles.pop(key, None)
+            if tile is None:
+                self._misses += 1
+                return None
+            self._tiles[key] = tile
+            self._hits += 1
+            return tile
+
+    def put(self, key, tile, max_nbytes):
+        """
+        Add a tile, evicting the least recently used tiles as needed to stay
+        within max_nbytes.  Tiles larger than that are not cached.
+        """
+        if tile.nbytes > max_nbytes:
+            return
+        tile.setflags(write=False)
+        with self._lock:
+            old = self._tiles.pop(key, None)
+            if old is not None:
+                self._nbytes -= old.nbytes
+            self._tiles[key] = tile
+            self._nbytes += tile.nbytes
+            self._trim(max_nbytes)
+
+    def trim(self, max_nbytes):
+        """
+        Evict the least recently used tiles until within max_nbytes.
+        """
+        with self._lock:
+            self._trim(max_nbytes)
+
+    def _trim(self, max_nbytes):
+        while self._nbytes > max_nbytes:
+            _, tile = self._tiles.popitem(last=False)
+            self._nbytes -= tile.nbytes
+            self._evictions += 1
+
+    def clear(self):
+        """
+        Remove all tiles and reset the counters.
+        """
+        with self._lock:
+            self._tiles.clear()
+            self._nbytes = 0
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+
+    def info(self):
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self._evictions,
+                             len(self._tiles), self._nbytes)
+
+
+TILE_CACHE = TileCache()
+
+
+def tile_cache_info():
+    """Report the usage of the decoded tile cache.
+
+    Returns
+    -------
+    CacheInfo
+        Named tuple of the hits, misses and evictions so far, the number of
+        tiles currently cached and their total size in bytes.
+
+    See also
+    --------
+    clear_tile_cache, glymur.set_option
+    """
+    return TILE_CACHE.info()
+
+
+def clear_tile_cache():
+    """Empty the decoded tile cache and reset its counters.
+
+    See also
+    --------
+    tile_cache_info
+    """
+    TILE_CACHE.clear()
@@ -0,0 +1,293 @@
+# -*- coding:  utf-8 -*-
+"""
+Part of glymur.
+
+Access to JPEG 2000 data held in memory or in file objects rather than in
+named files, for both decoding and encoding.
+"""
+# Standard library imports ...
+import ctypes
+import mmap
+import os
+import threading
+
+# Third party library imports ...
+import numpy as np
+
+# Local imports ...
+from .lib import openjp2 as opj2
+
+# File object sources may be shared by readers in several threads, each
+# with its own position, so every seek and read of one is made under a lock.
+_SOURCE_LOCK = threading.Lock()
+
+# Returned by a stream read function at the end of the stream, and by a
+# stream write function on failure.
+_READ_FAILED = ctypes.c_size_t(-1).value
+_WRITE_FAILED = _READ_FAILED
+
+
+def is_source(obj):
+    """
+    Determine if an object is an in-memory buffer or a file object, i.e.
+    something other than a path.  Python 2 strings are always paths.
+    """
+    if isinstance(obj, (bytearray, memoryview, mmap.mmap)):
+        return True
+    if isinstance(obj, bytes) and not isinstance(obj, str):
+        return True
+    return hasattr(obj, 'read') and hasattr(obj, 'seek')
+
+
+class SourceReader(object):
+    """
+    Read-only file object over a buffer or over a seekable file object.
+
+    Reading from a buffer copies only the bytes requested.  The buffer is
+    exported only for the duration of each read, so an mmap.mmap source may
+    still be closed afterwards.  Positions are relative to the start of the
+    buffer or file.  Each reader keeps its own position, so that readers in
+    several threads may share a file object.
+    """
+    def __init__(self, source):
+        self._source = source
+        self._pos = 0
+        if isinstance(source, (bytes, bytearray, memoryview, mmap.mmap)):
+            self._fobj = None
+            self.size = self._view().size
+        else:
+            self._fobj = source
+            with _SOURCE_LOCK:
+                self._fobj.seek(0, os.SEEK_END)
+                self.size = self._fobj.tell()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        # The source belongs to the caller, so there is nothing to close.
+        pass
+
+    def _view(self):
+        return np.frombuffer(self._source, dtype=np.uint8)
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        if whence == os.SEEK_CUR:
+            offset += self._pos
+        elif whence == os.SEEK_END:
+            offset += self.size
+        if offset < 0:
+            raise IOError('Negative seek position {0}.'.format(offset))
+        self._pos = offset
+        return self._pos
+
+    def read(self, size=-1):
+        if self._fobj is not None:
+            with _SOURCE_LOCK:
+                self._fobj.seek(self._pos)
+                data = self._fobj.read(size)
+            self._pos += len(data)
+            return data
+
+        start = min(self._pos, self.size)
+        stop = self.size if size < 0 else min(start + size, self.size)
+        self._pos = stop
+        return self._view()[start:stop].tobytes()
+
+    def readinto_address(self, address, size):
+        """
+        Read up to size bytes directly into memory at the given address.
+
+        Returns
+        -------
+        int
+            The number of bytes read, zero at the end of the data.
+        """
+        if self._fobj is None:
+            view = self._view()
+            size = max(0, min(size, self.size - self._pos))
+            ctypes.memmove(address, view.ctypes.data + self._pos, size)
+            self._pos += size
+            return size
+
+        readinto = getattr(self._fobj, 'readinto', None)
+        if readinto is None:
+            data = self.read(size)
+            ctypes.memmove(address, data, len(data))
+            return len(data)
+
+        # Raw file objects may return less than asked for.
+        total = 0
+        with _SOURCE_LOCK:
+            self._fobj.seek(self._pos)
+            while total < size:
+                offset_address = address + total
+                target = (ctypes.c_ubyte * (size - total)).from_address(
+                    offset_address)
+                nread = readinto(target)
+                if not nread:
+                    break
+                total += nread
+        self._pos += total
+        return total
+
+
+def create_read_stream(source, stack):
+    """
+    Create an OpenJPEG stream that decodes from a buffer or file object.
+
+    Parameters
+    ----------
+    source : bytes, bytearray, memoryview, mmap.mmap, or file object
+        The JPEG 2000 data.
+    stack : ExitStack
+        Context that destroys the stream.
+
+    Returns
+    -------
+    STREAM_TYPE_P
+        The OpenJPEG stream.
+    """
+    reader = SourceReader(source)
+
+    def read(buffer, nbytes, _):
+        try:
+            nread = reader.readinto_address(buffer, nbytes)
+        except Exception:
+            nread = 0
+        return nread if nread > 0 else _READ_FAILED
+
+    def skip(nbytes, _):
+        try:
+            reader.seek(nbytes, os.SEEK_CUR)
+        except Exception:
+            return -1
+        return nbytes
+
+    def seek(offset, _):
+        try:
+            reader.seek(offset)
+        except Exception:
+            return opj2.FALSE
+        return opj2.TRUE
+
+    # The library holds on to the callbacks until the stream is destroyed.
+    callbacks = [opj2.STREAM_READ_FN(read),
+                 opj2.STREAM_SKIP_FN(skip),
+                 opj2.STREAM_SEEK_FN(seek)]
+
+    stream = opj2.stream_create(opj2.STREAM_CHUNK_SIZE, True)
+
+    def destroy():
+        opj2.stream_destroy(stream)
+        del callbacks[:]
+
+    stack.callback(destroy)
+
+    opj2.stream_set_read_function(stream, callbacks[0])
+    opj2.stream_set_skip_function(stream, callbacks[1])
+    opj2.stream_set_seek_function(stream, callbacks[2])
+    opj2.stream_set_user_data_length(stream, reader.size)
+
+    return stream
+
+
+def is_seekable(target):
+    """
+    Determine if a writable file object can be sought, as encoding JP2 files
+    in place requires.
+    """
+    seekable = getattr(target, 'seekable', None)
+    if seekable is None:
+        return hasattr(target, 'seek') and hasattr(target, 'tell')
+    try:
+        return seekable()
+    except Exception:
+        return False
+
+
+def write_all(target, data):
+    """
+    Write all of the data to a file object.
+
+    Raw file objects may write less than asked for, or nothing at all (None)
+    if they are non-blocking, so the writes are repeated until every byte
+    has been written.
+
+    Raises
+    ------
+    IOError
+        If the file object stops accepting the data.
+    """
+    data = memoryview(data)
+    total = 0
+    while total < len(data):
+        nwritten = target.write(data[total:])
+        if not nwritten:
+            msg = "Only {0} of {1} bytes could be written."
+            raise IOError(msg.format(total, len(data)))
+        total += nwritten
+
+
+def create_write_stream(target, stack):
+    """
+    Create an OpenJPEG stream that encodes into a seekable file object.
+
+    Parameters
+    ----------
+    target : file object
+        Writable and seekable file object, such as io.BytesIO.  The data are
+        written from its current position, which positions in the stream
+        are relative to.
+    stack : ExitStack
+        Context that destroys the stream.
+
+    Returns
+    -------
+    STREAM_TYPE_P
+        The OpenJPEG stream.
+    """
+    start = target.tell()
+
+    def write(buffer, nbytes, _):
+        try:
+            write_all(target, ctypes.string_at(buffer, nbytes))
+        except Exception:
+            return _WRITE_FAILED
+        return nbytes
+
+    def skip(nbytes, _):
+        try:
+            target.seek(nbytes, os.SEEK_CUR)
+        except Exception:
+            return -1
+        return nbytes
+
+    def seek(offset, _):
+        try:
+            target.seek(start + offset)
+        except Exception:
+            return opj2.FALSE
+        return opj2.TRUE
+
+    # The library holds on to the callbacks until the stream is destroyed.
+    callbacks = [opj2.STREAM_WRITE_FN(write),
+                 opj2.STREAM_SKIP_FN(skip),
+                 opj2.STREAM_SEEK_FN(seek)]
+
+    stream = opj2.stream_create(opj2.STREAM_CHUNK_SIZE, False)
+
+    def destroy():
+        opj2.stream_destroy(stream)
+        del callbacks[:]
+
+    stack.callback(destroy)
+
+    opj2.stream_set_write_function(stream, callbacks[0])
+    opj2.stream_set_skip_function(stream, callbacks[1])
+    opj2.stream_set_seek_function(stream, callbacks[2])
+
+    return stream
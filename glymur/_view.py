@@ -0,0 +1,228 @@
+# -*- coding:  utf-8 -*-
+"""
+Part of glymur.
+
+Lazy views of JPEG 2000 images, decoded only when converted to an array.
+"""
+# Standard library imports ...
+import operator
+
+# Third party library imports ...
+import numpy as np
+
+
+class Jp2kView(object):
+    """
+    Lazily decoded selection of an image.
+
+    Indexing a view with integers, slices, and (in the band dimension)
+    sequences of integers gives another view without decoding anything.
+    The image is decoded when the view is read or converted with
+    numpy.asarray, as a single request for the smallest area, the lowest
+    resolution level, and the fewest components that cover the selection.
+
+    Row and column strides that are powers of two are satisfied by decoding
+    at a reduced resolution level, as with Jp2k slicing, provided that the
+    selection starts on a multiple of the stride.  Any other strides are
+    taken from the decoded image.
+
+    Parameters
+    ----------
+    jp2 : Jp2k
+        Image to be viewed.
+    """
+    def __init__(self, jp2):
+        dtype = jp2._codestream_dtype()
+        if dtype is None:
+            msg = ("The image components must share a datatype of no more "
+                   "than 16 bits in order to be viewed lazily.")
+            raise IOError(msg)
+
+        self._jp2 = jp2
+        self._dtype = np.dtype(dtype)
+
+        # Each of the rows and columns is a (start, step, count) progression
+        # of full resolution positions.
+        numrows, numcols = jp2.shape[:2]
+        self._rows = (0, 1, numrows)
+        self._cols = (0, 1, numcols)
+        if len(jp2.shape) == 2:
+            self._bands = None
+            self._axes = (0, 1)
+        else:
+            self._bands = np.arange(jp2.shape[2])
+            self._axes = (0, 1, 2)
+
+    def __repr__(self):
+        msg = "<Jp2kView of {jp2!r}, shape={shape}, dtype={dtype}>"
+        return msg.format(jp2=self._jp2, shape=self.shape, dtype=self.dtype)
+
+    @property
+    def shape(self):
+        sizes = (self._rows[2], self._cols[2])
+        if self._bands is not None:
+            sizes += (len(self._bands),)
+        return tuple(sizes[axis] for axis in self._axes)
+
+    @property
+    def dtype(self):
+        return self._dtype
+
+    @property
+    def ndim(self):
+        return len(self._axes)
+
+    @property
+    def size(self):
+        return int(np.prod(self.shape))
+
+    def __len__(self):
+        if self.ndim == 0:
+            raise TypeError("len() of unsized object")
+        return self.shape[0]
+
+    def __array__(self, dtype=None, copy=None):
+        data = self.read()
+        if dtype is not None:
+            data = data.astype(dtype, copy=False)
+        return data
+
+    def __getitem__(self, index):
+        if not isinstance(index, tuple):
+            index = (index,)
+
+        num_ellipses = sum(x is Ellipsis for x in index)
+        if num_ellipses > 1:
+            raise IndexError("An index can only have a single ellipsis.")
+        if num_ellipses == 1:
+            i = [x is Ellipsis for x in index].index(True)
+            fill = (slice(None),) * (self.ndim - len(index) + 1)
+            index = index[:i] + fill + index[i + 1:]
+        if len(index) > self.ndim:
+            raise IndexError("Too many indices for the view.")
+        index += (slice(None),) * (self.ndim - len(index))
+
+        view = object.__new__(Jp2kView)
+        view.__dict__.update(self.__dict__)
+
+        axes = []
+        for axis, key in zip(self._axes, index):
+            if axis == 2:
+                bands = self._bands[key]
+                if np.ndim(bands) == 0:
+                    view._bands = np.array([bands])
+                    continue
+                if np.ndim(bands) > 1:
+                    msg = "Bands can only be selected with a 1D index."
+                    raise IndexError(msg)
+                view._bands = bands
+            elif axis == 0:
+                view._rows = _index_progression(self._rows, key)
+                if not isinstance(key, slice):
+                    continue
+            else:
+                view._cols = _index_progression(self._cols, key)
+                if not isinstance(key, slice):
+                    continue
+            axes.append(axis)
+        view._axes = tuple(axes)
+
+        return view
+
+    def read(self):
+        """Decode the selection.
+
+        Returns
+        -------
+        ndarray
+            The image data.
+        """
+        if 0 in (self._rows[2], self._cols[2]) or (self._bands is not None and
+                                                   len(self._bands) == 0):
+            return np.zeros(self.shape, dtype=self.dtype)
+
+        jp2 = self._jp2
+        row_start, row_step, row_stop = _bounds(self._rows)
+        col_start, col_step, col_stop = _bounds(self._cols)
+
+        # The deepest resolution level whose samples include the selected
+        # positions.
+        rlevel = jp2.codestream.segment[2].num_res
+        for n in (row_start, row_step, col_start, col_step):
+            rlevel = min(rlevel, _trailing_zeros(n))
+        factor = 1 << rlevel
+
+        area = (row_start, col_start, row_stop, col_stop)
+        if self._bands is None:
+            data = jp2._read_area(area, rlevel)
+        else:
+            data = jp2._read_area_bands(area, rlevel, self._bands)
+
+        row_step = max(row_step // factor, 1)
+        col_step = max(col_step // factor, 1)
+        if self._rows[1] < 0:
+            row_step = -row_step
+        if self._cols[1] < 0:
+            col_step = -col_step
+        data = data[::row_step, ::col_step]
+
+        # Drop the dimensions selected with integers.
+        index = tuple(slice(None) if axis in self._axes else 0
+                      for axis in range(data.ndim))
+        return np.asarray(data[index])
+
+
+def _index_progression(progression, key):
+    """Index an arithmetic progression (start, step, count).
+
+    Parameters
+    ----------
+    progression : tuple
+        First position, step, and number of positions.
+    key : int or slice
+        Index into the progression.
+
+    Returns
+    -------
+    tuple
+        The indexed progression.  An integer gives a single position.
+    """
+    start, step, count = progression
+    if isinstance(key, slice):
+        first, stop, stride = key.indices(count)
+        return (start + first * step, step * stride,
+                len(range(first, stop, stride)))
+
+    try:
+        key = operator.index(key)
+    except TypeError:
+        msg = "Rows and columns can only be indexed with integers or slices."
+        raise IndexError(msg)
+    if key < 0:
+        key += count
+    if not 0 <= key < count:
+        msg = "Index {0} is out of bounds for size {1}.".format(key, count)
+        raise IndexError(msg)
+    return (start + key * step, 1, 1)
+
+
+def _bounds(progression):
+    """Determine the first position, the absolute step, and one past the
+    last position covered by a non-empty progression.  A single position has
+    a step of one, so that it is decoded at full resolution rather than
+    sampled from a reduced resolution level.
+    """
+    start, step, count = progression
+    if count == 1:
+        return start, 1, start + 1
+    last = start + (count - 1) * step
+    return min(start, last), abs(step), max(start, last) + 1
+
+
+def _trailing_zeros(n):
+    """Number of trailing zero bits of a nonnegative integer, unbounded for
+    zero.
+    """
+    if n == 0:
+        return float('inf')
+    return (n & -n).bit_length() - 1
@@ -0,0 +1,181 @@
+"""This file is part of glymur, a Python interface for accessing JPEG 2000.
+
+Writing images too large for memory, one tile at a time, and writing
+images to memory or to file objects rather than to named files.
+
+http://glymur.readthedocs.org
+
+Copyright 2013 John Evans
+
+License:  MIT
+"""
+# Standard library imports...
+import io
+import os
+
+# Third party library imports
+import numpy as np
+
+# Local imports...
+from .jp2k import Jp2k
+from . import _stream
+
+
+def write_from(source, filename, tilesize, shape=None, **kwargs):
+    """Write a JPEG 2000 file one tile at a time.
+
+    Only one tile of the image is held in memory at a time, so the image
+    may be far larger than the memory available.
+
+    Parameters
+    ----------
+    source : array_like or iterable
+        Either an object with shape, dtype, and __getitem__, such as
+        numpy.memmap, from which each tile is sliced, or an iterable of the
+        tiles in raster order.  Tiles on the bottom and right edges are
+        smaller when the image size is not a multiple of the tile size.
+    filename : str
+        The path to JPEG 2000 file.
+    tilesize : tuple
+        Tile size (NROWS, NCOLS).
+    shape : tuple, optional
+        Size of the image, required when the source is an iterable of tiles.
+    kwargs : optional
+        Any of the other compression parameters accepted by Jp2k.
+
+    Returns
+    -------
+    Jp2k
+        The new image.  If writing fails, the partly written file is
+        removed.
+
+    Examples
+    --------
+    >>> import glymur, numpy as np, tempfile
+    >>> tfile = tempfile.NamedTemporaryFile(suffix='.jp2')
+    >>> image = np.zeros((1024, 1024), dtype=np.uint8)
+    >>> jp2 = glymur.write_from(image, tfile.name, tilesize=(256, 256))
+    >>> jp2.shape
+    (1024, 1024)
+    """
+    if hasattr(source, 'shape') and hasattr(source, '__getitem__'):
+        shape = tuple(source.shape)
+        tiles = None
+    elif shape is None:
+        msg = ("The shape must be given when the source is an iterable of "
+               "tiles.")
+        raise ValueError(msg)
+    else:
+        shape = tuple(shape)
+        tiles = iter(source)
+
+    jp2 = Jp2k(filename, shape=shape, tilesize=tilesize, **kwargs)
+    try:
+        try:
+            _write_tiles(jp2, source, tiles, tilesize)
+        finally:
+            # Release the encoder of a write that did not finish.
+            if jp2._tile_writer is not None:
+                jp2._tile_writer.close()
+    except Exception:
+        if os.path.exists(jp2.filename):
+            os.remove(jp2.filename)
+        raise
+
+    return jp2
+
+
+def _write_tiles(jp2, source, tiles, tilesize):
+    """Write each tile of the source in raster order.
+
+    Parameters
+    ----------
+    jp2 : Jp2k
+        Image to be written, with its shape set.
+    source : array_like or iterable
+        Source of the tiles.
+    tiles : iterator or None
+        Iterator over the tiles, or None if the tiles are sliced from the
+        source.
+    tilesize : tuple
+        Tile size (NROWS, NCOLS).
+    """
+    tile_rows, tile_cols = tilesize
+    numrows, numcols = jp2.shape[:2]
+    for row in range(0, numrows, tile_rows):
+        for col in range(0, numcols, tile_cols):
+            rows = slice(row, min(row + tile_rows, numrows))
+            cols = slice(col, min(col + tile_cols, numcols))
+            if tiles is None:
+                block = source[rows, cols]
+            else:
+                try:
+                    block = next(tiles)
+                except StopIteration:
+                    msg = ("The source ran out of tiles at row {0}, column "
+                           "{1}.")
+                    raise ValueError(msg.format(row, col))
+            jp2[rows, cols] = np.asarray(block)
+
+    if tiles is not None and next(tiles, None) is not None:
+        msg = "The source has more tiles than the image."
+        raise ValueError(msg)
+
+
+def encode(data, target=None, format='jp2', **kwargs):
+    """Encode an image without writing it to a named file.
+
+    Parameters
+    ----------
+    data : ndarray
+        Image data to be encoded.
+    target : file object, optional
+        Writable file object to encode into, such as io.BytesIO, a pipe, or
+        a socket file.  If it cannot seek, the image is encoded in memory
+        and then written to it all at once.  If not provided, the encoded
+        image is returned.
+    format : {'jp2', 'j2k'}, optional
+        Write a JP2 file or a raw codestream.
+    kwargs : optional
+        Any of the compression parameters accepted by Jp2k.
+
+    Returns
+    -------
+    bytes or None
+        The encoded image, unless a target is given.
+
+    Raises
+    ------
+    IOError
+        If the format is not valid, if the OpenJPEG library is too old to
+        encode into memory, or if the target stops accepting the data.
+
+    Examples
+    --------
+    >>> import glymur, numpy as np
+    >>> image = np.zeros((64, 64), dtype=np.uint8)
+    >>> b = glymur.encode(image, format='j2k')
+    >>> b[:4] == b'\\xff\\x4f\\xff\\x51'
+    True
+    """
+    if format not in ('jp2', 'j2k'):
+        msg = 'Invalid format "{0}".'.format(format)
+        raise IOError(msg)
+
+    if target is None:
+        buffer = io.BytesIO()
+        encode(data, buffer, format=format, **kwargs)
+        return buffer.getvalue()
+
+    if not _stream.is_seekable(target):
+        buffer = io.BytesIO()
+        encode(data, buffer, format=format, **kwargs)
+        _stream.write_all(target, buffer.getvalue())
+        return None
+
+    data = np.asarray(data)
+
+    # The extension only determines the format, nothing is written to a file.
+    jp2 = Jp2k('image.' + format, shape=data.shape)
+    jp2._write(data, target=target, **kwargs)
+    return None
@@ -0,0 +1,386 @@
+"""This file is part of glymur, a Python interface for accessing JPEG 2000.
+
+Reading and writing many JPEG 2000 files at once with a pool of workers.
+
+http://glymur.readthedocs.org
+
+Copyright 2013 John Evans
+
+License:  MIT
+"""
+# Standard library imports...
+from collections import namedtuple
+from concurrent.futures import (ThreadPoolExecutor, ProcessPoolExecutor,
+                                as_completed, wait, FIRST_COMPLETED)
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+
+# Third party library imports
+import numpy as np
+
+# Local imports...
+from .jp2k import Jp2k
+from . import version
+
+ReadResult = namedtuple('ReadResult', ['index', 'path', 'image', 'error'])
+ReadResult.__doc__ = """Outcome of reading one file with read_many.
+
+Exactly one of image and error is None.
+"""
+
+WriteResult = namedtuple('WriteResult', ['index', 'path', 'seconds', 'error'])
+WriteResult.__doc__ = """Outcome of writing one file with write_many.
+
+The error is None if the file was written.  The seconds are the time spent
+encoding the file, or None if the worker itself failed.
+"""
+
+# Arrays are handed to worker processes through files in this directory,
+# which on Linux is memory rather than disk.
+_SHARED_MEMORY_DIR = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+
+def read_many(paths, area=None, rlevel=0, workers=None, executor='thread',
+              ordered=True, stack=False):
+    """Read many JPEG 2000 files with a pool of workers.
+
+    A file that cannot be read does not stop the others from being read,
+    its error is reported in its result instead.
+
+    Parameters
+    ----------
+    paths : iterable
+        Paths of the JPEG 2000 files.
+    area : tuple, optional
+        Specifies decoding image area of every file,
+        (first_row, first_col, last_row, last_col)
+    rlevel : int, optional
+        Factor by which to rlevel output resolution.  Use -1 to get the
+        lowest resolution thumbnail.
+    workers : int, optional
+        Number of workers, defaults to the number of CPUs.
+    executor : {'thread', 'process'}, optional
+        Decode in worker threads or in worker processes.  The OpenJPEG
+        library runs without the global interpreter lock, so threads are
+        usually sufficient.
+    ordered : bool, optional
+        If True, return a list of results in the order of the paths.
+        Otherwise return an iterator of results in the order that they
+        complete.
+    stack : bool, optional
+        If True, decode into a single array of shape (len(paths), ...)
+        allocated from the first file that can be read.  Files decoding to
+        any other shape or datatype are reported as errors, and their slots
+        in the array are left as zeros.
+
+    Returns
+    -------
+    list or iterator of ReadResult, or tuple
+        The results, each one having the index and path of the file and
+        either the image or the exception raised when reading it.  If
+        stacking, the stacked array and the list of results are returned,
+        with each image being a view into the stacked array.
+
+    Raises
+    ------
+    IOError
+        If the executor is not valid, or if stacking without ordering.
+
+    Examples
+    --------
+    >>> import glymur
+    >>> paths = [glymur.data.nemo(), glymur.data.goodstuff()]
+    >>> results = glymur.read_many(paths, rlevel=1)
+    >>> [result.image.shape for result in results]
+    [(728, 1296, 3), (400, 240, 3)]
+    """
+    if executor == 'thread':
+        executor_class = ThreadPoolExecutor
+    elif executor == 'process':
+        executor_class = ProcessPoolExecutor
+    else:
+        msg = 'Invalid executor "{0}".'.format(executor)
+        raise IOError(msg)
+
+    if stack and not ordered:
+        msg = "Stacked results can only be returned in order."
+        raise IOError(msg)
+
+    paths = list(paths)
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+
+    if not stack:
+        results = _iter_results(paths, area, rlevel, workers, executor_class)
+        if ordered:
+            return sorted(results, key=lambda result: result.index)
+        return results
+
+    # The first readable file determines the shape and datatype.
+    results = []
+    for index, path in enumerate(paths):
+        result = _read_result(index, path, area, rlevel)
+        results.append(result)
+        if result.error is None:
+            break
+    else:
+        msg = "None of the files could be read."
+        raise IOError(msg)
+
+    first = results[-1]
+    out = np.zeros((len(paths),) + first.image.shape, first.image.dtype)
+    out[first.index] = first.image
+    results[-1] = first._replace(image=out[first.index])
+
+    remaining = range(first.index + 1, len(paths))
+    if executor == 'thread':
+        # Threads decode straight into the stacked array.
+        outs = dict((index, out[index]) for index in remaining)
+    else:
+        outs = None
+    for result in _iter_results(paths, area, rlevel, workers,
+                                executor_class, indices=remaining,
+                                outs=outs):
+        if result.error is None and outs is None:
+            try:
+                _check_stackable(result.image, out)
+            except ValueError as e:
+                result = result._replace(image=None, error=e)
+            else:
+                out[result.index] = result.image
+                result = result._replace(image=out[result.index])
+        results.append(result)
+
+    results.sort(key=lambda result: result.index)
+    return out, results
+
+
+def _iter_results(paths, area, rlevel, workers, executor_class,
+                  indices=None, outs=None):
+    """Yield a ReadResult for each file as its read completes."""
+    if indices is None:
+        indices = range(len(paths))
+    with executor_class(max_workers=workers) as pool:
+        futures = {}
+        for index in indices:
+            out = None if outs is None else outs[index]
+            future = pool.submit(_read_result, index, paths[index], area,
+                                 rlevel, out)
+            futures[future] = index
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                yield future.result()
+            except Exception as e:
+                # Failure of the worker itself, e.g. a crashed process.
+                yield ReadResult(index, paths[index], None, e)
+
+
+def _read_result(index, path, area, rlevel, out=None):
+    """Read one file, reporting rather than raising any error.
+
+    Parameters
+    ----------
+    out : ndarray, optional
+        Decode into this array, which must match the image exactly.
+    """
+    try:
+        jp2 = Jp2k(path)
+        if out is None:
+            image = jp2._read(area=area, rlevel=rlevel)
+        elif version.openjpeg_version_tuple[0] < 2:
+            image = jp2._read(area=area, rlevel=rlevel)
+            _check_stackable(image, out[np.newaxis])
+            out[...] = image
+            image = out
+        else:
+            image = jp2._read(area=area, rlevel=rlevel, out=out)
+    except Exception as e:
+        return ReadResult(index, path, None, e)
+    return ReadResult(index, path, image, None)
+
+
+def _check_stackable(image, out):
+    """Make sure that an image fits in a slot of the stacked array."""
+    if image.shape != out.shape[1:] or image.dtype != out.dtype:
+        msg = ("The image shape {0} and datatype {1} do not match the "
+               "stacked shape {2} and datatype {3}.")
+        msg = msg.format(image.shape, image.dtype, out.shape[1:], out.dtype)
+        raise ValueError(msg)
+
+
+def write_many(items, workers=None, executor='process', ordered=True,
+               **kwargs):
+    """Write many JPEG 2000 files with a pool of workers.
+
+    A file that cannot be written does not stop the others from being
+    written, its error is reported in its result instead.  With worker
+    processes, each array is copied once into shared memory rather than
+    being pickled, and only a few more arrays than there are workers are
+    shared at any one time.
+
+    Parameters
+    ----------
+    items : iterable
+        Pairs of (path, data), or triples of (path, data, kwargs) where the
+        kwargs are compression parameters for that file alone.
+    workers : int, optional
+        Number of workers, defaults to the number of CPUs.
+    executor : {'process', 'thread'}, optional
+        Encode in worker processes or in worker threads.
+    ordered : bool, optional
+        If True, return a list of results in the order of the items.
+        Otherwise return an iterator of results in the order that they
+        complete.
+    kwargs : optional
+        Any of the compression parameters accepted by Jp2k, common to all
+        of the files.
+
+    Returns
+    -------
+    list or iterator of WriteResult
+        The results, each one having the index and path of the file, the
+        time spent encoding it, and any exception raised when writing it.
+
+    Raises
+    ------
+    IOError
+        If the executor is not valid.
+
+    Examples
+    --------
+    >>> import glymur, numpy as np, os, tempfile
+    >>> tdir = tempfile.mkdtemp()
+    >>> chips = [np.zeros((64, 64), dtype=np.uint8) for _ in range(4)]
+    >>> paths = [os.path.join(tdir, '{0}.jp2'.format(j)) for j in range(4)]
+    >>> results = glymur.write_many(zip(paths, chips), numres=3)
+    >>> [result.error for result in results]
+    [None, None, None, None]
+    """
+    if executor == 'thread':
+        executor_class = ThreadPoolExecutor
+    elif executor == 'process':
+        executor_class = ProcessPoolExecutor
+    else:
+        msg = 'Invalid executor "{0}".'.format(executor)
+        raise IOError(msg)
+
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+
+    results = _iter_write_results(items, workers, executor_class, kwargs)
+    if ordered:
+        return sorted(results, key=lambda result: result.index)
+    return results
+
+
+def _iter_write_results(items, workers, executor_class, kwargs):
+    """Yield a WriteResult for each file as its write completes."""
+    share = executor_class is ProcessPoolExecutor
+    shared_dir = tempfile.mkdtemp(dir=_SHARED_MEMORY_DIR) if share else None
+    items = enumerate(items)
+    try:
+        with executor_class(max_workers=workers) as pool:
+            futures = {}
+            while True:
+                # Keep the workers busy without sharing every array at once.
+                while len(futures) < 2 * workers:
+                    try:
+                        index, item = next(items)
+                    except StopIteration:
+                        break
+                    try:
+                        path, data, item_kwargs = _unpack_item(item)
+                        item_kwargs = dict(kwargs, **item_kwargs)
+                        if share:
+                            data = _SharedArray(data, shared_dir, index)
+                    except Exception as e:
+                        yield WriteResult(index, None, None, e)
+                        continue
+                    future = pool.submit(_write_result, index, path, data,
+                                         item_kwargs)
+                    futures[future] = (index, path, data)
+
+                if len(futures) == 0:
+                    break
+
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, path, data = futures.pop(future)
+                    if share:
+                        data.release()
+                    try:
+                        yield future.result()
+                    except Exception as e:
+                        # Failure of the worker itself, e.g. a crashed
+                        # process.
+                        yield WriteResult(index, path, None, e)
+    finally:
+        if shared_dir is not None:
+            shutil.rmtree(shared_dir, ignore_errors=True)
+
+
+def _unpack_item(item):
+    """Split an item into its path, data, and compression parameters."""
+    if len(item) == 2:
+        path, data = item
+        item_kwargs = {}
+    elif len(item) == 3:
+        path, data, item_kwargs = item
+    else:
+        msg = ("Each item must be (path, data) or (path, data, kwargs), not "
+               "a sequence of length {0}.")
+        raise ValueError(msg.format(len(item)))
+    return path, data, item_kwargs
+
+
+def _write_result(index, path, data, kwargs):
+    """Write one file, reporting rather than raising any error."""
+    start = time.time()
+    try:
+        if isinstance(data, _SharedArray):
+            data = data.attach()
+        Jp2k(path, data=data, **kwargs)
+    except Exception as e:
+        return WriteResult(index, path, time.time() - start, e)
+    return WriteResult(index, path, time.time() - start, None)
+
+
+class _SharedArray(object):
+    """Copy of an array in a file in memory shared with worker processes.
+
+    Only the file name, shape, and datatype are pickled.
+
+    Parameters
+    ----------
+    array : array_like
+        Data to be shared.
+    directory : str
+        Directory in which to create the file.
+    index : int
+        Index of the array, used to name the file.
+    """
+    def __init__(self, array, directory, index):
+        array = np.asarray(array)
+        self.path = os.path.join(directory, '{0}.dat'.format(index))
+        self.shape = array.shape
+        self.dtype = array.dtype.str
+        shared = np.memmap(self.path, dtype=array.dtype, mode='w+',
+                           shape=array.shape)
+        shared[...] = array
+        del shared
+
+    def attach(self):
+        """Map the shared array, read-only, in a worker process."""
+        return np.memmap(self.path, dtype=self.dtype, mode='r',
+                         shape=self.shape)
+
+    def release(self):
+        """Remove the shared array once the worker is done with it."""
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
@@ -9,6 +9,8 @@ import platform
 import sys
 import warnings
 
+from . import _async, _cache
+
 if sys.hexversion <= 0x03000000:
     from ConfigParser import SafeConfigParser as ConfigParser
     from ConfigParser import NoOptionError, NoSectionError
@@ -173,6 +175,11 @@ def get_configdir():
 
 
 _original_options = {
+    'async.workers': None,
+    'cache.tile_bytes': 0,
+    'decode.max_working_bytes': 0,
+    'encode.num_threads': 1,
+    'lib.num_threads': 1,
     'parse.full_codestream': False,
     'print.xml': True,
     'print.codestream': True,
@@ -186,6 +193,11 @@ def set_option(key, value):
 
     Available options:
 
+        async.workers
+        cache.tile_bytes
+        decode.max_working_bytes
+        encode.num_threads
+        lib.num_threads
         parse.full_codestream
         print.xml
         print.codestream
@@ -200,6 +212,28 @@ def set_option(key, value):
 
     Option Descriptions
     -------------------
+    async.workers : int
+        Number of threads that the asyncio API (Jp2k.aread, awrite) runs
+        the OpenJPEG library on.  None means the number of CPUs.
+        [default: None]
+    cache.tile_bytes : int
+        Size in bytes of the cache of decoded tiles from which array-style
+        slices are assembled.  Zero disables the cache. [default: 0]
+    decode.max_working_bytes : int
+        Approximate limit in bytes of the OpenJPEG library's working buffers
+        when decoding.  Larger images and areas are decoded in tiles or
+        strips written one at a time into the output array, so that the
+        peak memory use is near the size of the output.  The image data is
+        the same either way.  Zero means no limit. [default: 0]
+    encode.num_threads : int
+        Number of threads used by the OpenJPEG library when encoding, unless
+        the num_threads keyword is given when writing.  More than one
+        thread requires OpenJPEG 2.4.0 or later built with thread support.
+        [default: 1]
+    lib.num_threads : int
+        Number of threads used by the OpenJPEG library when decoding.  More
+        than one thread requires OpenJPEG 2.2.0 or later built with thread
+        support. [default: 1]
     parse.full_codestream : bool
         When False, only the codestream header is parsed for metadata.  This
         can results in faster JP2/JPX parsing.  When True, the entire
@@ -222,7 +256,47 @@ def set_option(key, value):
     """
     if key not in _options.keys():
         raise KeyError('{key} not valid.'.format(key=key))
+    if key == 'lib.num_threads':
+        _validate_num_threads(value)
+    elif key == 'encode.num_threads':
+        _validate_num_threads(value, encode=True)
     _options[key] = value
+    if key == 'cache.tile_bytes':
+        _cache.TILE_CACHE.trim(value)
+    elif key == 'async.workers':
+        _async.reset_executor()
+
+
+def _validate_num_threads(num_threads, encode=False):
+    """Make sure that the library can use the requested number of threads.
+
+    Parameters
+    ----------
+    num_threads : int
+        Number of threads.
+    encode : bool, optional
+        If True, the threads are for encoding, which OpenJPEG only supports
+        from version 2.4.0.  Earlier versions do not install the thread
+        handler on a compressor at all.
+
+    Raises
+    ------
+    RuntimeError
+        If more than one thread is requested but the library cannot use them.
+    """
+    # The library module itself depends upon this one.
+    from .lib import openjp2 as opj2
+    from . import version
+
+    if num_threads > 1 and not opj2.has_thread_support():
+        msg = ("Using more than one thread requires version 2.2.0 or higher "
+               "of OpenJPEG built with thread support.")
+        raise RuntimeError(msg)
+    if (num_threads > 1 and encode and
+            version.openjpeg_version_tuple[:3] < [2, 4, 0]):
+        msg = ("Encoding with more than one thread requires version 2.4.0 or "
+               "higher of OpenJPEG.  The installed version is {version}.")
+        raise RuntimeError(msg.format(version=version.openjpeg_version))
 
 
 def get_option(key):
@@ -230,6 +304,11 @@ def get_option(key):
 
     Available options:
 
+        async.workers
+        cache.tile_bytes
+        decode.max_working_bytes
+        encode.num_threads
+        lib.num_threads
         parse.full_codestream
         print.xml
         print.codestream
@@ -259,6 +338,11 @@ def reset_option(key):
 
     Available options:
 
+        async.workers
+        cache.tile_bytes
+        decode.max_working_bytes
+        encode.num_threads
+        lib.num_threads
         parse.full_codestream
         print.xml
         print.codestream
@@ -276,6 +360,9 @@ def reset_option(key):
         if key not in _options.keys():
             raise KeyError('{key} not valid.'.format(key=key))
         _options[key] = _original_options[key]
+    _cache.TILE_CACHE.trim(_options['cache.tile_bytes'])
+    if key in ('all', 'async.workers'):
+        _async.reset_executor()
 
 
 def set_parseoptions(full_codestream=True):
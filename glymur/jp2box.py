@@ -251,7 +251,10 @@ class Jp2kBox(object):
             if box_length == 0:
                 # The length of the box is presumed to last until the end of
                 # the file.  Compute the effective length of the box.
-                num_bytes = os.path.getsize(fptr.name) - fptr.tell() + 8
+                position = fptr.tell()
+                fptr.seek(0, os.SEEK_END)
+                num_bytes = fptr.tell() - position + 8
+                fptr.seek(position)
 
             elif box_length == 1:
                 # The length of the box is in the XL field, a 64-bit value.
@@ -987,8 +990,10 @@ class ContiguousCodestreamBox(Jp2kBox):
         self.offset = offset
         self.main_header_offset = main_header_offset
 
-        # The filename can be set if lazy loading is desired.
+        # The filename (or, for in-memory sources, the file object) can be
+        # set if lazy loading is desired.
         self._filename = None
+        self._fptr = None
 
     @property
     def codestream(self):
@@ -1003,6 +1008,11 @@ class ContiguousCodestreamBox(Jp2kBox):
                     codestream = Codestream(fptr, self._length,
                                             header_only=header_only)
                     self._codestream = codestream
+            elif self._fptr is not None:
+                self._fptr.seek(self.main_header_offset)
+                codestream = Codestream(self._fptr, self._length,
+                                        header_only=header_only)
+                self._codestream = codestream
         return self._codestream
 
     def __repr__(self):
@@ -1050,7 +1060,11 @@ class ContiguousCodestreamBox(Jp2kBox):
             codestream = None
         box = cls(codestream, main_header_offset=main_header_offset,
                   length=length, offset=offset)
-        box._filename = fptr.name
+        name = getattr(fptr, 'name', None)
+        if isinstance(name, str):
+            box._filename = name
+        else:
+            box._fptr = fptr
         box._length = length
         return box
 
@@ -15,11 +15,14 @@ except ImportError:
     # v2.7, third party library import ...
     from contextlib2 import ExitStack
     from itertools import ifilterfalse as filterfalse
+import copy
 import ctypes
 import math
+import multiprocessing
 import os
 import re
 import struct
+import tempfile
 from uuid import UUID
 import warnings
 
@@ -28,7 +31,9 @@ import numpy as np
 
 # Local imports...
 from .codestream import Codestream
-from . import core, version
+from . import core, version, _async, _cache, _stream
+from ._view import Jp2kView
+from .config import get_option, _validate_num_threads
 from .jp2box import (Jp2kBox, JPEG2000SignatureBox, FileTypeBox,
                      JP2HeaderBox, ColourSpecificationBox,
                      ContiguousCodestreamBox, ImageHeaderBox)
@@ -41,7 +46,8 @@ class Jp2k(Jp2kBox):
     Attributes
     ----------
     filename : str
-        The path to the JPEG 2000 file.
+        The path to the JPEG 2000 file, or None if the image is read from
+        memory or from a file object.
     box : sequence
         List of top-level boxes in the file.  Each box may in turn contain
         its own list of boxes.  Will be empty if the file consists only of a
@@ -56,6 +62,9 @@ class Jp2k(Jp2kBox):
         color transformation, defaults to False.
     layer : int
         Zero-based number of quality layer to decode.
+    num_threads : int
+        Number of threads the OpenJPEG library uses when decoding.  If None,
+        the 'lib.num_threads' option is used.
     verbose : bool
         Whether or not to print informational messages produced by the
         OpenJPEG library, defaults to false.
@@ -87,12 +96,19 @@ class Jp2k(Jp2kBox):
 
         Parameters
         ----------
-        filename : str
-            The path to JPEG 2000 file.
+        filename : str, bytes, memoryview, mmap.mmap, or file object
+            The path to JPEG 2000 file.  JPEG 2000 data already in memory, or
+            a seekable file object, can be read but not written.
         image_data : ndarray, optional
             Image data to be written to file.
         shape : tuple, optional
             Size of image data, only required when image_data is not provided.
+            The image is then written by assigning to jp2[:], or, if tilesize
+            is given, by assigning tile-aligned blocks such as
+            jp2[256:512, 0:1024] = block.  The blocks may be assigned in any
+            order; each tile is encoded once the tiles before it in raster
+            order have been written, and the file is complete with the last
+            tile.
         cbsize : tuple, optional
             Code block size (NROWS, NCOLS)
         cinema2k : int, optional
@@ -120,6 +136,10 @@ class Jp2k(Jp2kBox):
                 8 = VSC
                 16 = ERTERM(SEGTERM)
                 32 = SEGMARK(SEGSYM)
+        num_threads : int, optional
+            Number of threads the OpenJPEG library uses when encoding.  If not
+            provided, the 'encode.num_threads' option is used.  More than one
+            thread requires OpenJPEG 2.4.0 or higher.
         numres : int, optional
             Number of resolutions.
         prog : {"LRCP" "RLCP", "RPCL", "PCRL", "CPRL"}
@@ -140,8 +160,16 @@ class Jp2k(Jp2kBox):
         """
         Jp2kBox.__init__(self)
 
-        # In case of pathlib.Paths... 
-        self.filename = str(filename)
+        if _stream.is_source(filename):
+            if data is not None or shape is not None:
+                msg = "Only JPEG 2000 files can be written."
+                raise IOError(msg)
+            self._source = filename
+            self.filename = None
+        else:
+            self._source = None
+            # In case of pathlib.Paths... 
+            self.filename = str(filename)
 
         self.box = []
         self._codec_format = None
@@ -154,8 +182,14 @@ class Jp2k(Jp2kBox):
             self._shape = shape
 
         self._ignore_pclr_cmap_cdef = False
+        self._num_threads = None
         self._verbose = False
 
+        # Images created with just a shape are written through the slicing
+        # protocol, with the keyword arguments given here.
+        self._write_kwargs = kwargs if data is None else None
+        self._tile_writer = None
+
         # Parse the file for JP2/JPX contents only if we are reading it.
         if data is None and shape is None:
             self.parse()
@@ -185,6 +219,35 @@ class Jp2k(Jp2kBox):
 
         self._layer = 0 if layer is None else layer
 
+    @property
+    def num_threads(self):
+        return self._num_threads
+
+    @num_threads.setter
+    def num_threads(self, num_threads):
+        if num_threads is not None:
+            _validate_num_threads(num_threads)
+        self._num_threads = num_threads
+
+    @property
+    def view(self):
+        """Lazily decoded view of the image.
+
+        The view can be sliced repeatedly without decoding anything, and is
+        decoded with a single read when converted to an array.
+
+        Examples
+        --------
+        >>> import glymur, numpy as np
+        >>> jp2 = glymur.Jp2k(glymur.data.nemo())
+        >>> view = jp2.view[200:1000][::4, ::4][:, 100:300, 0]
+        >>> view.shape
+        (200, 200)
+        >>> np.asarray(view).shape
+        (200, 200)
+        """
+        return Jp2kView(self)
+
     @property
     def codestream(self):
         if self._codestream is None:
@@ -247,11 +310,16 @@ class Jp2k(Jp2kBox):
         self._shape = shape
 
     def __repr__(self):
+        if self._source is not None:
+            return "glymur.Jp2k({0})".format(self._source_name)
         msg = "glymur.Jp2k('{0}')".format(self.filename)
         return msg
 
     def __str__(self):
-        metadata = ['File:  ' + os.path.basename(self.filename)]
+        if self._source is not None:
+            metadata = ['File:  ' + self._source_name]
+        else:
+            metadata = ['File:  ' + os.path.basename(self.filename)]
         if len(self.box) > 0:
             for box in self.box:
                 metadata.append(str(box))
@@ -267,9 +335,11 @@ class Jp2k(Jp2kBox):
         IOError
             The file was not JPEG 2000.
         """
-        self.length = os.path.getsize(self.filename)
+        with self._open_source() as fptr:
 
-        with open(self.filename, 'rb') as fptr:
+            fptr.seek(0, os.SEEK_END)
+            self.length = fptr.tell()
+            fptr.seek(0)
 
             # Make sure we have a JPEG2000 file.  It could be either JP2 or
             # J2C.  Check for J2C first, single box in that case.
@@ -296,7 +366,7 @@ class Jp2k(Jp2kBox):
             if (((box_length != 12) or (box_id != b'jP  ') or
                  (signature != (13, 10, 135, 10)))):
                 msg = '{filename} is not a JPEG 2000 file.'
-                msg = msg.format(filename=self.filename)
+                msg = msg.format(filename=self._source_name)
                 raise IOError(msg)
 
             # Back up and start again, we know we have a superbox (box of
@@ -305,6 +375,22 @@ class Jp2k(Jp2kBox):
             self.box = self.parse_superbox(fptr)
             self._validate()
 
+    @property
+    def _source_name(self):
+        """Name of the file or a description of the in-memory source."""
+        if self._source is None:
+            return self.filename
+        name = getattr(self._source, 'name', None)
+        if isinstance(name, str):
+            return name
+        return '<{0} object>'.format(type(self._source).__name__)
+
+    def _open_source(self):
+        """Open the JPEG 2000 file or in-memory source for reading."""
+        if self._source is None:
+            return open(self.filename, 'rb')
+        return _stream.SourceReader(self._source)
+
     def _validate(self):
         """Validate the JPEG 2000 outermost superbox.  These checks must be
         done at a file level.
@@ -313,7 +399,7 @@ class Jp2k(Jp2kBox):
         # type box.
         if not isinstance(self.box[1], FileTypeBox):
             msg = "{filename} does not contain a valid File Type box."
-            msg = msg.format(filename=self.filename)
+            msg = msg.format(filename=self._source_name)
             raise IOError(msg)
 
         # A jp2-branded file cannot contain an "any ICC profile
@@ -494,26 +580,63 @@ class Jp2k(Jp2kBox):
 
         self._cparams = cparams
 
-    def _write(self, img_array, verbose=False, **kwargs):
+    def _write(self, img_array, verbose=False, num_threads=None, target=None,
+               **kwargs):
         """Write image data to a JP2/JPX/J2k file.  Intended usage of the
         various parameters follows that of OpenJPEG's opj_compress utility.
 
         This method can only be used to create JPEG 2000 images that can fit
-        in memory.
+        in memory.  If a target file object is given, the image is written
+        to it instead of to the file, and is not parsed.
         """
         if re.match("0|1.[0-4]", version.openjpeg_version) is not None:
             msg = ("You must have at least version 1.5 of OpenJPEG "
                    "in order to write images.")
             raise RuntimeError(msg)
 
+        num_threads = self._encoder_threads(num_threads)
+
+        if target is not None and opj2.OPENJP2 is None:
+            msg = ("Writing to a file object requires version 2 of the "
+                   "OpenJPEG library.")
+            raise IOError(msg)
+
         self._determine_colorspace(**kwargs)
         self._populate_cparams(img_array, **kwargs)
 
         if opj2.OPENJP2 is not None:
-            self._write_openjp2(img_array, verbose=verbose)
+            self._write_openjp2(img_array, verbose=verbose,
+                                num_threads=num_threads, target=target)
         else:
             self._write_openjpeg(img_array, verbose=verbose)
 
+    @staticmethod
+    def _encoder_threads(num_threads=None):
+        """Determine the number of threads to encode with.
+
+        Parameters
+        ----------
+        num_threads : int, optional
+            Number of threads requested for this image.  If not provided, the
+            'encode.num_threads' option is used.
+
+        Returns
+        -------
+        int
+            The number of threads.
+
+        Raises
+        ------
+        RuntimeError
+            If more than one thread is requested but the library cannot
+            encode with them.
+        """
+        if num_threads is None:
+            num_threads = get_option('encode.num_threads')
+        else:
+            _validate_num_threads(num_threads, encode=True)
+        return num_threads
+
     def _write_openjpeg(self, img_array, verbose=False):
         """
         Write JPEG 2000 file using OpenJPEG 1.5 interface.
@@ -719,9 +842,11 @@ class Jp2k(Jp2kBox):
 
             self._colorspace = COLORSPACE_MAP[colorspace.lower()]
 
-    def _write_openjp2(self, img_array, verbose=False):
+    def _write_openjp2(self, img_array, verbose=False, num_threads=1,
+                       target=None):
         """
-        Write JPEG 2000 file using OpenJPEG 2.x interface.
+        Write JPEG 2000 file using OpenJPEG 2.x interface, or write to a
+        seekable file object.
         """
         if img_array.ndim == 2:
             # Force the image to be 3D.  Just makes things easier later on.
@@ -749,17 +874,23 @@ class Jp2k(Jp2kBox):
             opj2.set_error_handler(codec, _ERROR_CALLBACK)
 
             opj2.setup_encoder(codec, self._cparams, image)
+            if num_threads > 1:
+                opj2.codec_set_threads(codec, num_threads)
 
-            strm = opj2.stream_create_default_file_stream(self.filename,
-                                                          False)
-            stack.callback(opj2.stream_destroy, strm)
+            if target is None:
+                strm = opj2.stream_create_default_file_stream(self.filename,
+                                                              False)
+                stack.callback(opj2.stream_destroy, strm)
+            else:
+                strm = _stream.create_write_stream(target, stack)
 
             opj2.start_compress(codec, image, strm)
             opj2.encode(codec, strm)
             opj2.end_compress(codec, strm)
 
-        # Refresh the metadata.
-        self.parse()
+        if target is None:
+            # Refresh the metadata.
+            self.parse()
 
     def append(self, box):
         """Append a JP2 box to the file in-place.
@@ -770,6 +901,10 @@ class Jp2k(Jp2kBox):
             Instance of a JP2 box.  Only UUID and XML boxes can currently be
             appended.
         """
+        if self._source is not None:
+            msg = "Boxes can only be appended to JPEG 2000 files."
+            raise IOError(msg)
+
         if self._codec_format == opj2.CODEC_J2K:
             msg = "Only JP2 files can currently have boxes appended to them."
             raise IOError(msg)
@@ -859,7 +994,7 @@ class Jp2k(Jp2kBox):
             # of myself out to file.
             ofile.write(struct.pack('>I', self.length + 8))
             ofile.write(b'jp2c')
-            with open(self.filename, 'rb') as ifile:
+            with self._open_source() as ifile:
                 ofile.write(ifile.read())
             return
 
@@ -878,7 +1013,7 @@ class Jp2k(Jp2kBox):
             offset = jp2c[0].offset
 
         # Ready to write the codestream.
-        with open(self.filename, 'rb') as ifile:
+        with self._open_source() as ifile:
             ifile.seek(offset)
 
             # Verify that the specified codestream is right.
@@ -890,7 +1025,7 @@ class Jp2k(Jp2kBox):
             if L == 0:
                 # The length of the box is presumed to last until the end of
                 # the file.  Compute the effective length of the box.
-                L = os.path.getsize(ifile.name) - ifile.tell() + 8
+                L = self.length - ifile.tell() + 8
 
             elif L == 1:
                 # The length of the box is in the XL field, a 64-bit value.
@@ -940,10 +1075,68 @@ class Jp2k(Jp2kBox):
             # Case of jp2[:] = data, i.e. write the entire image.
             #
             # Should have a slice object where start = stop = step = None
-            self._write(data)
+            self._write(data, **(self._write_kwargs or {}))
         else:
-            msg = "Partial write operations are currently not allowed."
+            self._write_tiles(index, data)
+
+    def _write_tiles(self, index, data):
+        """Write a tile-aligned block of an image created with a shape and a
+        tile size.  The tiles are encoded in raster order, so a block is
+        held in memory until all the tiles before it have been written.
+
+        Parameters
+        ----------
+        index : tuple
+            Rows and columns of the block, and optionally all of the bands.
+        data : ndarray
+            Image data of the block.
+        """
+        kwargs = self._write_kwargs
+        if kwargs is None or kwargs.get('tilesize') is None:
+            msg = ("Partial write operations are only allowed for images "
+                   "created with a shape and a tile size.")
+            raise TypeError(msg)
+
+        if not isinstance(index, tuple) or len(index) not in (2, 3):
+            msg = "Partial writes must index the rows and the columns."
             raise TypeError(msg)
+        if len(index) == 3 and index[2] != slice(None):
+            msg = "Partial writes must include all of the bands."
+            raise TypeError(msg)
+
+        tile_rows, tile_cols = kwargs['tilesize']
+        bounds = []
+        for key, tile_size, size in zip(index[:2], (tile_rows, tile_cols),
+                                        self.shape[:2]):
+            if not isinstance(key, slice) or key.step not in (None, 1):
+                msg = "Partial writes must index the image with slices."
+                raise TypeError(msg)
+            start, stop, _ = key.indices(size)
+            if start % tile_size != 0 or start >= stop or (
+                    stop % tile_size != 0 and stop != size):
+                msg = ("Partial writes must be aligned with the "
+                       "{0} x {1} tile grid.")
+                raise TypeError(msg.format(tile_rows, tile_cols))
+            bounds.append((start, stop))
+        (row0, row1), (col0, col1) = bounds
+
+        data = np.asarray(data)
+        expected = (row1 - row0, col1 - col0) + tuple(self.shape[2:])
+        if data.shape != expected:
+            msg = "The block shape must be {0}, not {1}."
+            raise ValueError(msg.format(expected, data.shape))
+
+        if self._tile_writer is None:
+            self._tile_writer = TileWriter(self, data.dtype, kwargs)
+
+        num_tile_cols = _ceildiv(self.shape[1], tile_cols)
+        for row in range(row0, row1, tile_rows):
+            for col in range(col0, col1, tile_cols):
+                tile_index = (row // tile_rows) * num_tile_cols
+                tile_index += col // tile_cols
+                block = data[row - row0:row - row0 + tile_rows,
+                             col - col0:col - col0 + tile_cols]
+                self._tile_writer.write(tile_index, block)
 
     def _remove_ellipsis(self, index, numrows, numcols, numbands):
         """
@@ -1071,12 +1264,183 @@ class Jp2k(Jp2kBox):
                 numrows if rows.stop is None else rows.stop,
                 numcols if cols.stop is None else cols.stop
                 )
-        data = self._read(area=area, rlevel=rlevel)
         if len(pargs) == 2:
+            return self._read_area(area, rlevel)
+        return self._read_area_bands(area, rlevel, bands)
+
+    def _read_area_bands(self, area, rlevel, bands):
+        """Read bands of an area for the slicing protocol, decoding only the
+        requested bands if the library can do so.
+
+        Parameters
+        ----------
+        area : tuple
+            Area of the reference grid, (first_row, first_col, last_row,
+            last_col).
+        rlevel : int
+            Factor by which to rlevel output resolution.
+        bands : slice or sequence
+            Index into the bands of the image.
+
+        Returns
+        -------
+        ndarray
+            The image data.
+        """
+        numbands = 1 if len(self.shape) == 2 else self.shape[2]
+        components = np.arange(numbands)[bands]
+        decoded = self._components_to_decode(components)
+        if decoded is None:
+            data = self._read_area(area, rlevel)
+            return data[:, :, bands]
+
+        # The library decodes each component at most once, in ascending order.
+        data = self._read_area(area, rlevel, components=decoded)
+        if data.ndim == 2:
+            data = data[:, :, np.newaxis]
+        if decoded == components.tolist():
             return data
+        return data[:, :, np.searchsorted(decoded, components)]
+
+    def _read_area(self, area, rlevel, components=None):
+        """Read an area for the slicing protocol, by way of the tile cache
+        if it is enabled.
 
-        # Ok, 3 arguments in pargs.
-        return data[:, :, bands]
+        Parameters
+        ----------
+        area : tuple
+            Area of the reference grid, (first_row, first_col, last_row,
+            last_col).
+        rlevel : int
+            Factor by which to rlevel output resolution.
+        components : list, optional
+            Ascending indices of the only components to decode.
+
+        Returns
+        -------
+        ndarray
+            The image data.
+        """
+        image = self._read_cached_tiles(area, rlevel, components=components)
+        if image is not None:
+            return image
+
+        if components is None:
+            return self._read(area=area, rlevel=rlevel)
+        return self._read(area=area, rlevel=rlevel, components=components)
+
+    def _read_cached_tiles(self, area, rlevel, components=None):
+        """Assemble an area from decoded tiles, decoding only the tiles
+        missing from the tile cache.
+
+        Returns
+        -------
+        ndarray or None
+            The image data, or None if the cache is disabled or cannot be
+            used with this image.
+        """
+        max_nbytes = get_option('cache.tile_bytes')
+        if max_nbytes <= 0 or self._source is not None:
+            return None
+        if version.openjpeg_version < '2.1.0':
+            return None
+        dtype = self._codestream_dtype()
+        if dtype is None:
+            return None
+        siz = self.codestream.segment[1]
+        if len(set(siz.xrsiz)) > 1 or len(set(siz.yrsiz)) > 1:
+            return None
+
+        # Validate the arguments just as a direct read would.
+        self._populate_dparams(rlevel, area=area)
+        rlevel = self._dparams.cp_reduce
+
+        # Tiles of a file that has since been rewritten must not be reused.
+        st = os.stat(self.filename)
+        identity = (os.path.realpath(self.filename), st.st_dev, st.st_ino,
+                    st.st_size, st.st_mtime)
+        components_key = None if components is None else tuple(components)
+
+        y0, x0, y1, x1 = self._clip_area(area)
+        row0, col0 = self._output_offset(y0, x0, rlevel)
+        row1, col1 = self._output_offset(y1, x1, rlevel)
+        if components is None:
+            num_components = len(siz.xrsiz)
+        else:
+            num_components = len(components)
+        shape = (row1 - row0, col1 - col0)
+        if num_components > 1:
+            shape += (num_components,)
+        image = np.empty(shape, dtype=dtype)
+
+        for tile_index, _ in self._tile_areas(area):
+            # Slicing always decodes all of the quality layers.
+            key = (identity, tile_index, rlevel, 0, components_key,
+                   self.ignore_pclr_cmap_cdef)
+            tile = _cache.TILE_CACHE.get(key)
+            if tile is None:
+                kwargs = {'tile': tile_index, 'rlevel': rlevel}
+                if components is not None:
+                    kwargs['components'] = components
+                tile = self._read(**kwargs)
+                _cache.TILE_CACHE.put(key, tile, max_nbytes)
+
+            ty0, tx0, _, _ = self._tile_extent(tile_index)
+            trow0, tcol0 = self._output_offset(ty0, tx0, rlevel)
+            r0, c0 = max(row0, trow0), max(col0, tcol0)
+            r1 = min(row1, trow0 + tile.shape[0])
+            c1 = min(col1, tcol0 + tile.shape[1])
+            image[r0 - row0:r1 - row0, c0 - col0:c1 - col0] = \
+                tile[r0 - trow0:r1 - trow0, c0 - tcol0:c1 - tcol0]
+
+        return image
+
+    def _components_to_decode(self, components):
+        """Determine which components to decode for a band selection.
+
+        Parameters
+        ----------
+        components : ndarray
+            Indices of the selected bands.
+
+        Returns
+        -------
+        list or None
+            Ascending indices of the components to decode, or None if the
+            whole image should be decoded.
+        """
+        if components.ndim != 1 or len(components) == 0:
+            return None
+        if not self._can_decode_components():
+            return None
+
+        decoded = sorted(set(components.tolist()))
+        num_components = len(self.codestream.segment[1].xrsiz)
+        if len(decoded) == num_components:
+            return None
+        if (((self.codestream.segment[2].mct and num_components >= 3 and
+              decoded[0] < 3))):
+            # The library skips the inverse multiple component transform of
+            # the first three components when decoding a subset.
+            return None
+        return decoded
+
+    def _can_decode_components(self):
+        """Determine if a subset of the components can be decoded.
+
+        Requires opj_set_decoded_components (OpenJPEG 2.3.0 or higher).  A
+        palette or channel definitions apply to all of the components, so
+        those images are decoded in full unless they are to be ignored.
+        """
+        if version.openjpeg_version_tuple < [2, 3, 0]:
+            return False
+        if self.ignore_pclr_cmap_cdef:
+            return True
+        jp2h = [box for box in self.box if box.box_id == 'jp2h']
+        if len(jp2h) == 0:
+            return True
+        box_ids = [box.box_id for box in jp2h[0].box]
+        return not any(x in box_ids for x in ('pclr', 'cmap', 'cdef'))
 
     def _read(self, **kwargs):
         """Read a JPEG 2000 image.
@@ -1103,44 +1467,489 @@ class Jp2k(Jp2kBox):
             img = self._read_openjp2(**kwargs)
         return img
 
-    def read(self, **kwargs):
-        """
-        """
-        # Read a JPEG 2000 image.
-        #
-        # Parameters
-        # ----------
-        # rlevel : int, optional
-        #     Factor by which to rlevel output resolution.  Use -1 to get the
-        #     lowest resolution thumbnail.  This is the only keyword option
-        #     available to use when the OpenJPEG version is 1.5 or earlier.
-        # layer : int, optional
-        #     Number of quality layer to decode.
-        # area : tuple, optional
-        #     Specifies decoding image area,
-        #     (first_row, first_col, last_row, last_col)
-        # tile : int, optional
-        #     Number of tile to decode.
-        # verbose : bool, optional
-        #     Print informational messages produced by the OpenJPEG library.
-        #
-        # Returns
-        # -------
-        # img_array : ndarray
-        #     The image data.
-        #
-        # Raises
-        # ------
-        # IOError
-        #     If the image has differing subsample factors.
+    def read(self, parallel=None, workers=None, **kwargs):
+        """Read a JPEG 2000 image.
+
+        Array-style slicing should be used instead of this method unless the
+        image is to be decoded in parallel.
+
+        Parameters
+        ----------
+        rlevel : int, optional
+            Factor by which to rlevel output resolution.  Use -1 to get the
+            lowest resolution thumbnail.  This is the only keyword option
+            available to use when the OpenJPEG version is 1.5 or earlier.
+        layer : int, optional
+            Number of quality layer to decode.
+        area : tuple, optional
+            Specifies decoding image area,
+            (first_row, first_col, last_row, last_col)
+        tile : int, optional
+            Number of tile to decode.  Not available when decoding in
+            parallel.
+        verbose : bool, optional
+            Print informational messages produced by the OpenJPEG library.
+        num_threads : int, optional
+            Number of threads the OpenJPEG library uses when decoding.  Not
+            available when decoding in parallel.
+        parallel : {None, 'process'}, optional
+            If 'process', the image is split along the tile grid and the tiles
+            are decoded by a pool of worker processes.  Each worker writes
+            directly into an output array in shared memory, so no image data
+            is pickled.  Images with a single tile, a palette, or components
+            of differing bit depths are decoded serially instead.
+        workers : int, optional
+            Number of worker processes, defaults to the number of CPUs.
+        out : ndarray or buffer, optional
+            Destination for the image data.  See read_bands.  Not available
+            when decoding in parallel.
+        layout : {'hwc', 'chw'}, optional
+            Whether the components are the last or the first dimension.  See
+            read_bands.  Not available when decoding in parallel.
+
+        Returns
+        -------
+        img_array : ndarray
+            The image data.
 
+        Raises
+        ------
+        IOError
+            If the image has differing subsample factors, or if an option
+            is given that is not available when decoding in parallel.
+        """
         if 'ignore_pclr_cmap_cdef' in kwargs:
             self.ignore_pclr_cmap_cdef = kwargs['ignore_pclr_cmap_cdef']
             kwargs.pop('ignore_pclr_cmap_cdef')
-        warnings.warn("Use array-style slicing instead.", DeprecationWarning)
-        img = self._read(**kwargs)
+
+        if parallel is None:
+            warnings.warn("Use array-style slicing instead.",
+                          DeprecationWarning)
+            img = self._read(**kwargs)
+        elif parallel == 'process':
+            unsupported = sorted(set(kwargs) -
+                                 set(['rlevel', 'layer', 'area', 'verbose']))
+            if len(unsupported) > 0:
+                msg = ('The "{0}" option is not available when decoding in '
+                       'parallel.')
+                raise IOError(msg.format(unsupported[0]))
+            img = self._read_parallel(workers=workers, **kwargs)
+        else:
+            msg = 'Invalid parallel mode "{0}".'.format(parallel)
+            raise IOError(msg)
         return img
 
+    def aread(self, area=None, rlevel=0, layer=None, executor=None):
+        """Read a JPEG 2000 image without blocking the asyncio event loop.
+
+        The decoding runs on an executor.  Any number of reads of the same
+        Jp2k object may be in progress at once, even when it reads from a
+        file object, so long as nothing else reads from that file object
+        meanwhile.
+
+        Parameters
+        ----------
+        area : tuple, optional
+            Specifies decoding image area,
+            (first_row, first_col, last_row, last_col)
+        rlevel : int, optional
+            Factor by which to rlevel output resolution.  Use -1 to get the
+            lowest resolution thumbnail.
+        layer : int, optional
+            Number of quality layer to decode.
+        executor : concurrent.futures.Executor, optional
+            Executor to decode on, defaults to one shared by glymur and sized
+            by the 'async.workers' option.
+
+        Returns
+        -------
+        awaitable
+            Resolves to the image data.  Cancelling the awaiting task before
+            the decoding starts keeps it from starting at all, a decode that
+            is already underway runs to completion and its result is
+            discarded.
+
+        Examples
+        --------
+        >>> import asyncio, glymur
+        >>> jp2 = glymur.Jp2k(glymur.data.nemo())
+        >>> loop = asyncio.new_event_loop()
+        >>> loop.run_until_complete(jp2.aread(rlevel=1)).shape
+        (728, 1296, 3)
+        >>> loop.close()
+        """
+        # The decoding parameters are kept on the object, so each read gets
+        # a copy of its own.
+        jp2 = copy.copy(self)
+        return _async.run(jp2._read,
+                          kwargs={'area': area, 'rlevel': rlevel,
+                                  'layer': layer},
+                          executor=executor)
+
+    def _read_parallel(self, workers=None, rlevel=0, layer=None, area=None,
+                       verbose=False):
+        """Read a JPEG 2000 image by decoding its tiles in worker processes.
+
+        Parameters
+        ----------
+        workers : int, optional
+            Number of worker processes, defaults to the number of CPUs.
+        rlevel : int, optional
+            Factor by which to rlevel output resolution.
+        layer : int, optional
+            Number of quality layer to decode.
+        area : tuple, optional
+            Specifies decoding image area,
+            (first_row, first_col, last_row, last_col)
+        verbose : bool, optional
+            Print informational messages produced by the OpenJPEG library.
+
+        Returns
+        -------
+        ndarray
+            The image data.
+        """
+        if version.openjpeg_version < '2.1.0':
+            msg = ("You must have at least version 2.1.0 of OpenJPEG "
+                   "installed before decoding in parallel.  Your version of "
+                   "OpenJPEG is {version}.")
+            msg = msg.format(version=version.openjpeg_version)
+            raise IOError(msg)
+
+        self._subsampling_sanity_check()
+        rlevel = self._validate_rlevel(rlevel)
+        if workers is None:
+            workers = multiprocessing.cpu_count()
+
+        tiles = self._tile_areas(area)
+        dtype = self._codestream_dtype()
+        # The workers reopen the file by name, an in-memory source would
+        # have to be copied to each of them.
+        if (((workers < 2 or len(tiles) < 2 or dtype is None or
+              self._source is not None))):
+            return self._read(rlevel=rlevel, layer=layer, area=area,
+                              verbose=verbose)
+
+        # Whole rows of tiles make for fewer, larger tasks, as long as there
+        # are enough of them to keep all the workers busy.
+        tile_rows = sorted(set((y0, y1) for _, (y0, _, y1, _) in tiles))
+        if len(tile_rows) >= 2 * workers:
+            x0 = tiles[0][1][1]
+            x1 = tiles[-1][1][3]
+            sub_areas = [(y0, x0, y1, x1) for (y0, y1) in tile_rows]
+        else:
+            sub_areas = [tile_area for _, tile_area in tiles]
+
+        shape, (row0, col0) = self._decoded_shape(area, rlevel)
+
+        tasks = []
+        for sub_area in sub_areas:
+            sub_row, sub_col = self._output_offset(sub_area[0], sub_area[1],
+                                                   rlevel)
+            tasks.append((sub_area, sub_row - row0, sub_col - col0))
+
+        # /dev/shm makes the mapped output file RAM-backed where available.
+        tmpdir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+        fd, path = tempfile.mkstemp(suffix='.dat', dir=tmpdir)
+        os.close(fd)
+        try:
+            out = np.memmap(path, dtype=dtype, mode='w+', shape=shape)
+
+            initargs = (self.filename, path, dtype, shape, rlevel, layer,
+                        self.ignore_pclr_cmap_cdef, verbose)
+            pool = multiprocessing.Pool(workers, _init_decode_worker,
+                                        initargs)
+            with ExitStack() as stack:
+                stack.callback(pool.join)
+                stack.callback(pool.terminate)
+                pool.map(_decode_sub_area, tasks)
+
+            if os.name == 'nt':
+                # Windows cannot remove a file that is still mapped.
+                image = np.array(out)
+                del out
+            else:
+                image = out.view(np.ndarray)
+        finally:
+            os.remove(path)
+
+        return image
+
+    def read_to_file(self, path, format='npy', rlevel=0, workers=1,
+                     resume=False):
+        """Decode the image into an array file, for images too large to be
+        held in memory.
+
+        The image is decoded tile by tile.  With OpenJPEG 2.3 or later,
+        tiles needing more than a few tens of megabytes of the library's
+        buffers (such as the single tile of an untiled image) are decoded
+        in horizontal strips.  Each chunk is written to a memory-mapped
+        output file and flushed to disk as soon as it is decoded, so the
+        peak memory use depends on the tile size and the number of workers,
+        not on the image size.
+
+        The chunks that have been written are listed in a file next to the
+        output, named by appending '.progress'.  If the decoding is
+        interrupted, it can be resumed with resume=True, which decodes only
+        the missing chunks.  The progress file is removed when the output is
+        complete.
+
+        Parameters
+        ----------
+        path : str
+            Output file.
+        format : {'npy', 'raw'}, optional
+            Write a NumPy .npy file, or just the samples in C order.
+        rlevel : int, optional
+            Factor by which to rlevel output resolution.  Use -1 to get the
+            lowest resolution thumbnail.
+        workers : int, optional
+            Number of worker processes.  The default of 1 decodes in this
+            process.  Images that are not in a file are always decoded in
+            this process.
+        resume : bool, optional
+            If True and the output file exists, decode only the chunks that
+            its progress file does not list.  Without a progress file, the
+            output is taken to be complete.
+
+        Returns
+        -------
+        numpy.memmap
+            The image data, mapped from the output file.
+
+        Raises
+        ------
+        IOError
+            If the OpenJPEG library version is less than 2.1.0, if the
+            image components do not share a datatype, or if the file to be
+            resumed does not match the image.
+
+        Examples
+        --------
+        >>> import glymur, os, tempfile
+        >>> jp2 = glymur.Jp2k(glymur.data.nemo())
+        >>> path = os.path.join(tempfile.mkdtemp(), 'nemo.npy')
+        >>> jp2.read_to_file(path, rlevel=1).shape
+        (728, 1296, 3)
+        """
+        if version.openjpeg_version < '2.1.0':
+            msg = ("You must have at least version 2.1.0 of OpenJPEG "
+                   "installed before decoding to a file.  Your version of "
+                   "OpenJPEG is {version}.")
+            msg = msg.format(version=version.openjpeg_version)
+            raise IOError(msg)
+        if format not in ('npy', 'raw'):
+            msg = 'Invalid format "{0}".'.format(format)
+            raise ValueError(msg)
+        dtype = self._codestream_dtype()
+        if dtype is None:
+            msg = ("The image components must share a datatype of no more "
+                   "than 16 bits in order to be decoded to a file.")
+            raise IOError(msg)
+        self._subsampling_sanity_check()
+        rlevel = self._validate_rlevel(rlevel)
+        layer = self.layer
+
+        shape, (row0, col0) = self._decoded_shape(None, rlevel)
+        progress_path = path + '.progress'
+
+        done = set()
+        if resume and os.path.exists(path):
+            out = self._open_output_file(path, format, dtype, shape, 'r+')
+            if not os.path.exists(progress_path):
+                return out
+            with open(progress_path) as f:
+                for line in f:
+                    # The last line may be incomplete.
+                    area = tuple(int(x) for x in line.split())
+                    if len(area) == 4:
+                        done.add(area)
+        else:
+            out = self._open_output_file(path, format, dtype, shape, 'w+')
+            open(progress_path, 'w').close()
+
+        tasks = []
+        for sub_area in self._chunk_areas(rlevel):
+            if sub_area in done:
+                continue
+            sub_row, sub_col = self._output_offset(sub_area[0], sub_area[1],
+                                                   rlevel)
+            tasks.append((sub_area, sub_row - row0, sub_col - col0))
+
+        with open(progress_path, 'a') as progress:
+            def record(sub_area):
+                """Note that a chunk is safely on disk."""
+                progress.write('{0} {1} {2} {3}\n'.format(*sub_area))
+                progress.flush()
+
+            if workers > 1 and self._source is None and len(tasks) > 1:
+                initargs = (self.filename, path, dtype, shape, rlevel, layer,
+                            self.ignore_pclr_cmap_cdef, self.verbose,
+                            out.offset, True)
+                pool = multiprocessing.Pool(workers, _init_decode_worker,
+                                            initargs)
+                with ExitStack() as stack:
+                    stack.callback(pool.join)
+                    stack.callback(pool.terminate)
+                    for sub_area in pool.imap_unordered(_decode_sub_area,
+                                                        tasks):
+                        record(sub_area)
+            else:
+                with self.open_session() as session:
+                    for sub_area, row, col in tasks:
+                        data = session.read(area=sub_area, rlevel=rlevel,
+                                            layer=layer)
+                        out[row:row + data.shape[0],
+                            col:col + data.shape[1]] = data
+                        out.flush()
+                        record(sub_area)
+
+        os.remove(progress_path)
+        return out
+
+    @staticmethod
+    def _open_output_file(path, format, dtype, shape, mode):
+        """Map an output file of read_to_file.
+
+        Parameters
+        ----------
+        path : str
+            Output file.
+        format : {'npy', 'raw'}
+            Type of file.
+        dtype, shape
+            Datatype and shape of the image.
+        mode : {'w+', 'r+'}
+            Create the file, or open an existing one.
+
+        Returns
+        -------
+        numpy.memmap
+            The mapped array.
+        """
+        if format == 'npy':
+            out = np.lib.format.open_memmap(path, mode=mode, dtype=dtype,
+                                            shape=shape)
+        else:
+            nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+            if mode == 'r+' and os.path.getsize(path) != nbytes:
+                out = None
+            else:
+                out = np.memmap(path, dtype=dtype, mode=mode, shape=shape)
+        if out is None or out.shape != shape or out.dtype != dtype:
+            msg = "{0} does not hold an image of shape {1} and type {2}."
+            msg = msg.format(path, shape, np.dtype(dtype).name)
+            raise IOError(msg)
+        return out
+
+    def _chunk_areas(self, rlevel, area=None, max_bytes=None,
+                     num_components=None):
+        """Split an area into chunks to be decoded one at a time.
+
+        Each tile intersecting the area is a chunk.  With OpenJPEG 2.3 or
+        later, which decodes only the code blocks that intersect a window
+        of a tile, a tile is further split into horizontal strips if the
+        library's buffer for it would exceed max_bytes.  Older versions
+        decode the whole tile for any window of it.
+
+        Parameters
+        ----------
+        rlevel : int
+            Resolution level.
+        area : tuple, optional
+            Area of the reference grid, (first_row, first_col, last_row,
+            last_col).  Defaults to the entire image.
+        max_bytes : int, optional
+            Size limit of the library's buffer for one chunk, defaults to
+            _CHUNK_BYTES.
+        num_components : int, optional
+            Number of components decoded, defaults to all of them.
+
+        Returns
+        -------
+        list
+            Areas of the reference grid, (first_row, first_col, last_row,
+            last_col).
+        """
+        siz = self.codestream.segment[1]
+        factor = siz.yrsiz[0] << rlevel
+        if max_bytes is None:
+            max_bytes = _CHUNK_BYTES
+        if num_components is None:
+            num_components = len(siz.xrsiz)
+        strips = version.openjpeg_version_tuple >= [2, 3, 0]
+
+        areas = []
+        for _, (y0, x0, y1, x1) in self._tile_areas(area):
+            row0, col0 = self._output_offset(y0, x0, rlevel)
+            row1, col1 = self._output_offset(y1, x1, rlevel)
+            if not strips:
+                if row1 > row0 and col1 > col0:
+                    areas.append((y0, x0, y1, x1))
+                continue
+            # The library decodes into 4 byte integers.
+            row_bytes = 4 * num_components * max(col1 - col0, 1)
+            strip_rows = max(max_bytes // row_bytes, 1)
+            for row in range(row0, row1, strip_rows):
+                areas.append((max(row * factor, y0), x0,
+                              min((row + strip_rows) * factor, y1), x1))
+        return areas
+
+    def _decoded_shape(self, area, rlevel):
+        """Determine the shape of an area decoded at a resolution level.
+
+        Parameters
+        ----------
+        area : tuple or None
+            Area of the reference grid, (first_row, first_col, last_row,
+            last_col), defaults to the entire image.
+        rlevel : int
+            Resolution level.
+
+        Returns
+        -------
+        tuple
+            The shape, and the position of the first sample of the area in
+            the decoded image.
+        """
+        y0, x0, y1, x1 = self._clip_area(area)
+        row0, col0 = self._output_offset(y0, x0, rlevel)
+        row1, col1 = self._output_offset(y1, x1, rlevel)
+        shape = (row1 - row0, col1 - col0)
+        num_components = len(self.codestream.segment[1].xrsiz)
+        if num_components > 1:
+            shape += (num_components,)
+        return shape, (row0, col0)
+
+    def _codestream_dtype(self):
+        """Determine the datatype of the image from the SIZ segment.
+
+        Returns
+        -------
+        builtins.type or None
+            numpy datatype common to all the image components, or None if the
+            components differ or if a palette changes them.
+        """
+        siz = self.codestream.segment[1]
+        dtypes = set()
+        for bitdepth, signed in zip(siz.bitdepth, siz.signed):
+            if bitdepth > 16:
+                return None
+            if signed:
+                dtypes.add(np.int8 if bitdepth <= 8 else np.int16)
+            else:
+                dtypes.add(np.uint8 if bitdepth <= 8 else np.uint16)
+        if len(dtypes) > 1:
+            return None
+
+        if not self.ignore_pclr_cmap_cdef:
+            jp2h = [box for box in self.box if box.box_id == 'jp2h']
+            if len(jp2h) > 0 and any(box.box_id == 'pclr'
+                                     for box in jp2h[0].box):
+                return None
+
+        return dtypes.pop()
+
     def _subsampling_sanity_check(self):
         """Check for differing subsample factors.
         """
@@ -1198,7 +2007,7 @@ class Jp2k(Jp2kBox):
 
                 opj.setup_decoder(dinfo, self._dparams)
 
-                with open(self.filename, 'rb') as fptr:
+                with self._open_source() as fptr:
                     src = fptr.read()
                 cio = opj.cio_open(dinfo, src)
 
@@ -1225,7 +2034,8 @@ class Jp2k(Jp2kBox):
         return image
 
     def _read_openjp2(self, rlevel=0, layer=None, area=None, tile=None,
-                      verbose=False):
+                      verbose=False, num_threads=None, out=None,
+                      layout='hwc', components=None):
         """Read a JPEG 2000 image using libopenjp2.
 
         Parameters
@@ -1242,6 +2052,14 @@ class Jp2k(Jp2kBox):
             Number of tile to decode.
         verbose : bool, optional
             Print informational messages produced by the OpenJPEG library.
+        num_threads : int, optional
+            Number of threads the OpenJPEG library uses when decoding.
+        out : ndarray or buffer, optional
+            Destination for the image data.
+        layout : {'hwc', 'chw'}, optional
+            Whether the components are the last or the first dimension.
+        components : list, optional
+            Ascending indices of the only components to decode.
 
         Returns
         -------
@@ -1255,38 +2073,136 @@ class Jp2k(Jp2kBox):
         """
         self.layer = layer
         self._subsampling_sanity_check()
+
+        image = self._read_openjp2_chunked(rlevel, area, tile,
+                                           num_threads=num_threads, out=out,
+                                           layout=layout,
+                                           components=components)
+        if image is not None:
+            return image
+
         self._populate_dparams(rlevel, tile=tile, area=area)
-        image = self._read_openjp2_common()
+        image = self._read_openjp2_common(num_threads=num_threads, out=out,
+                                          layout=layout,
+                                          components=components)
         return image
 
-    def _read_openjp2_common(self):
-        """
-        Read a JPEG 2000 image using libopenjp2.
+    def _read_openjp2_chunked(self, rlevel, area, tile, num_threads=None,
+                              out=None, layout='hwc', components=None):
+        """Read an area in chunks whose library buffers fit within the
+        'decode.max_working_bytes' option, writing each one into the output
+        image as it is decoded.  The chunks are decoded through a single
+        decoder session.
+
+        Parameters
+        ----------
+        rlevel : int
+            Factor by which to rlevel output resolution.
+        area : tuple or None
+            Specifies decoding image area,
+            (first_row, first_col, last_row, last_col)
+        tile : int or None
+            Number of tile to decode.
+        num_threads : int, optional
+            Number of threads the OpenJPEG library uses when decoding.
+        out : ndarray or buffer, optional
+            Destination for the image data.
+        layout : {'hwc', 'chw'}, optional
+            Whether the components are the last or the first dimension.
+        components : list, optional
+            Ascending indices of the only components to decode.
 
         Returns
         -------
-        ndarray or lst
-            Either the image as an ndarray or a list of ndarrays, each item
-            corresponding to one band.
+        ndarray or None
+            The image data, or None if the area does not need to be split or
+            if the components differ in datatype or subsampling.
         """
-        with ExitStack() as stack:
-            filename = self.filename
-            stream = opj2.stream_create_default_file_stream(filename, True)
-            stack.callback(opj2.stream_destroy, stream)
-            codec = opj2.create_decompress(self._codec_format)
-            stack.callback(opj2.destroy_codec, codec)
+        max_bytes = get_option('decode.max_working_bytes')
+        if max_bytes <= 0 or tile is not None:
+            return None
+        if layout not in ('hwc', 'chw'):
+            msg = 'Invalid layout "{0}".'.format(layout)
+            raise ValueError(msg)
+        dtype = self._codestream_dtype()
+        siz = self.codestream.segment[1]
+        if ((dtype is None or len(set(siz.xrsiz)) > 1 or
+             len(set(siz.yrsiz)) > 1)):
+            return None
+
+        rlevel = self._validate_rlevel(rlevel)
+        shape, (row0, col0) = self._decoded_shape(area, rlevel)
+        if components is None:
+            num_components = len(siz.xrsiz)
+        else:
+            num_components = len(components)
+        if 4 * num_components * shape[0] * shape[1] <= max_bytes:
+            return None
+        sub_areas = self._chunk_areas(rlevel, area=area, max_bytes=max_bytes,
+                                      num_components=num_components)
+        if len(sub_areas) < 2:
+            return None
+
+        if layout == 'hwc':
+            shape = shape[:2] + (num_components,)
+        else:
+            shape = (num_components,) + shape[:2]
+        if out is None:
+            image = np.empty(shape, dtype)
+        else:
+            image = self._validate_output_array(out, shape, dtype)
+
+        layer = self.layer
+        with DecoderSession(self, num_threads=num_threads,
+                            components=components) as session:
+            for sub_area in sub_areas:
+                data = session.read(area=sub_area, rlevel=rlevel,
+                                    layer=layer)
+                if data.ndim == 2:
+                    data = data[:, :, np.newaxis]
+                row, col = self._output_offset(sub_area[0], sub_area[1],
+                                               rlevel)
+                rows = slice(row - row0, row - row0 + data.shape[0])
+                cols = slice(col - col0, col - col0 + data.shape[1])
+                if layout == 'hwc':
+                    image[rows, cols] = data
+                else:
+                    image[:, rows, cols] = np.transpose(data, (2, 0, 1))
 
-            opj2.set_error_handler(codec, _ERROR_CALLBACK)
-            opj2.set_warning_handler(codec, _WARNING_CALLBACK)
+        if isinstance(out, np.ndarray):
+            return out
+        if num_components == 1:
+            return image.reshape(shape[1:] if layout == 'chw' else shape[:2])
+        return image
 
-            if self._verbose:
-                opj2.set_info_handler(codec, _INFO_CALLBACK)
-            else:
-                opj2.set_info_handler(codec, None)
+    def _read_openjp2_common(self, num_threads=None, out=None, layout='hwc',
+                             components=None):
+        """
+        Read a JPEG 2000 image using libopenjp2.
 
-            opj2.setup_decoder(codec, self._dparams)
-            raw_image = opj2.read_header(stream, codec)
-            stack.callback(opj2.image_destroy, raw_image)
+        Parameters
+        ----------
+        num_threads : int, optional
+            Number of threads the OpenJPEG library uses when decoding.
+        out : ndarray or buffer, optional
+            Destination for the image data.
+        layout : {'hwc', 'chw'}, optional
+            Whether the components are the last or the first dimension.
+        components : list, optional
+            Ascending indices of the only components to decode.
+
+        Returns
+        -------
+        ndarray or lst
+            Either the image as an ndarray or a list of ndarrays, each item
+            corresponding to one band.
+        """
+        with ExitStack() as stack:
+            stream, codec, raw_image = self._open_openjp2_decoder(
+                stack, num_threads=num_threads)
+
+            if components is not None:
+                opj2.set_decoded_components(codec, components)
 
             if self._dparams.nb_tile_to_decode:
                 opj2.get_decoded_tile(codec, stream, raw_image,
@@ -1299,10 +2215,571 @@ class Jp2k(Jp2kBox):
 
             opj2.end_decompress(codec, stream)
 
-            image = self._extract_image(raw_image)
+            image = self._extract_image(raw_image, out=out, layout=layout)
 
         return image
 
+    def _open_openjp2_decoder(self, stack, num_threads=None):
+        """
+        Create the stream and codec and read the main header.
+
+        All three resources are registered with the exit stack for cleanup.
+
+        Parameters
+        ----------
+        stack : ExitStack
+            Context in which the decoder resources live.
+        num_threads : int, optional
+            Number of threads the OpenJPEG library uses when decoding.  If
+            not provided, the num_threads property is used, and failing that
+            the 'lib.num_threads' option.
+
+        Returns
+        -------
+        tuple
+            The stream, the codec, and the image structure populated by the
+            main header.
+        """
+        if self._source is None:
+            stream = opj2.stream_create_default_file_stream(self.filename,
+                                                            True)
+            stack.callback(opj2.stream_destroy, stream)
+        else:
+            stream = _stream.create_read_stream(self._source, stack)
+        codec = opj2.create_decompress(self._codec_format)
+        stack.callback(opj2.destroy_codec, codec)
+
+        opj2.set_error_handler(codec, _ERROR_CALLBACK)
+        opj2.set_warning_handler(codec, _WARNING_CALLBACK)
+
+        if self._verbose:
+            opj2.set_info_handler(codec, _INFO_CALLBACK)
+        else:
+            opj2.set_info_handler(codec, None)
+
+        opj2.setup_decoder(codec, self._dparams)
+
+        if num_threads is None:
+            num_threads = self._num_threads
+        if num_threads is None:
+            num_threads = get_option('lib.num_threads')
+        else:
+            _validate_num_threads(num_threads)
+        if num_threads > 1:
+            opj2.codec_set_threads(codec, num_threads)
+
+        raw_image = opj2.read_header(stream, codec)
+        stack.callback(opj2.image_destroy, raw_image)
+
+        return stream, codec, raw_image
+
+    def open_session(self):
+        """Open a decoder session for making many reads of this image.
+
+        The session keeps the stream, the codec, and the parsed main header
+        open between reads.  It should be closed when no longer needed, most
+        easily by using it as a context manager.
+
+        Returns
+        -------
+        DecoderSession
+            Decoder session bound to this image.
+
+        Examples
+        --------
+        >>> import glymur
+        >>> jfile = glymur.data.nemo()
+        >>> jp2 = glymur.Jp2k(jfile)
+        >>> with jp2.open_session() as session:
+        ...     windows = [session.read(area=(r, 0, r + 256, 256))
+        ...                for r in range(0, 1024, 256)]
+        >>> windows[0].shape
+        (256, 256, 3)
+        """
+        if version.openjpeg_version < '2.1.0':
+            msg = ("You must have at least version 2.1.0 of OpenJPEG "
+                   "installed before using this method.  Your version of "
+                   "OpenJPEG is {version}.")
+            msg = msg.format(version=version.openjpeg_version)
+            raise IOError(msg)
+
+        return DecoderSession(self)
+
+    def iter_tiles(self, rlevel=0, layer=None):
+        """Decode the image one tile at a time.
+
+        The codestream is streamed through once, in file order, so memory use
+        is bounded by the size of a single tile.  The components are those of
+        the codestream, i.e. any palette is not applied.
+
+        Parameters
+        ----------
+        rlevel : int, optional
+            Factor by which to rlevel output resolution.  Use -1 to get the
+            lowest resolution thumbnail.
+        layer : int, optional
+            Number of quality layer to decode.
+
+        Yields
+        ------
+        tile_index : int
+            Index of the tile.
+        area : tuple
+            Position of the tile in the image decoded at the same rlevel,
+            (first_row, first_col, last_row, last_col).
+        ndarray or list
+            The tile, or a list with one ndarray per component if the
+            components differ in size or precision.
+
+        Raises
+        ------
+        IOError
+            If the OpenJPEG library version is less than 2.1.0.
+
+        Examples
+        --------
+        >>> import glymur
+        >>> jfile = glymur.data.nemo()
+        >>> jp2 = glymur.Jp2k(jfile)
+        >>> for tile_index, area, tile in jp2.iter_tiles():
+        ...     print(tile_index, area, tile.shape)
+        0 (0, 0, 1456, 2592) (1456, 2592, 3)
+        """
+        if version.openjpeg_version < '2.1.0':
+            msg = ("Iterating over tiles requires version 2.1.0 or higher "
+                   "of the OpenJPEG library.  The installed version is "
+                   "{version}.")
+            msg = msg.format(version=version.openjpeg_version)
+            raise IOError(msg)
+
+        self.layer = layer
+        self._populate_dparams(rlevel)
+        rlevel = self._dparams.cp_reduce
+
+        siz = self.codestream.segment[1]
+        row_origin, col_origin = self._output_offset(siz.yosiz, siz.xosiz,
+                                                     rlevel)
+
+        with ExitStack() as stack:
+            stream, codec, _ = self._open_openjp2_decoder(stack)
+            while True:
+                tile_header = opj2.read_tile_header(codec, stream)
+                tile_index, data_size, x0, y0, x1, y1, _, go_on = tile_header
+                if not go_on:
+                    break
+
+                data = np.empty(data_size, dtype=np.uint8)
+                opj2.decode_tile_data(codec, tile_index, data, data_size,
+                                      stream)
+
+                row0, col0 = self._output_offset(y0, x0, rlevel)
+                row1, col1 = self._output_offset(y1, x1, rlevel)
+                area = (row0 - row_origin, col0 - col_origin,
+                        row1 - row_origin, col1 - col_origin)
+                tile = self._split_tile_data(data, (y0, x0, y1, x1), rlevel)
+                yield tile_index, area, tile
+
+            opj2.end_decompress(codec, stream)
+
+    def iter_strips(self, rows_per_strip, rlevel=0):
+        """Decode the image one horizontal strip at a time.
+
+        Each strip is decoded as a window of the image through a single
+        decoder session.  This is meant for images consisting of one large
+        tile, for which iter_tiles would decode everything at once.  The
+        quality layer is taken from the layer property.
+
+        With OpenJPEG 2.3 or later, the library only decodes the code blocks
+        that intersect each window, and it holds the compressed tile in
+        memory between strips.  The peak memory use is then about the size
+        of the compressed codestream, plus 4 bytes per sample for the
+        library's buffer of one strip, plus the strip itself.  Code blocks
+        straddling the edges of a strip add up to a code block's height of
+        rows to the library's buffer.  Older versions of the library read
+        the codestream anew for each strip.
+
+        Parameters
+        ----------
+        rows_per_strip : int
+            Number of rows in each strip at the given rlevel.  The last
+            strip may have fewer.
+        rlevel : int, optional
+            Factor by which to rlevel output resolution.  Use -1 to get the
+            lowest resolution thumbnail.
+
+        Yields
+        ------
+        area : tuple
+            Position of the strip in the image decoded at the same rlevel,
+            (first_row, first_col, last_row, last_col).
+        ndarray
+            The strip.
+
+        Raises
+        ------
+        IOError
+            If the OpenJPEG library version is less than 2.1.0.
+
+        Examples
+        --------
+        >>> import glymur
+        >>> jfile = glymur.data.nemo()
+        >>> jp2 = glymur.Jp2k(jfile)
+        >>> for area, strip in jp2.iter_strips(512, rlevel=1):
+        ...     print(area, strip.shape)
+        (0, 0, 512, 1296) (512, 1296, 3)
+        (512, 0, 728, 1296) (216, 1296, 3)
+        """
+        if rows_per_strip < 1:
+            msg = "The number of rows per strip must be positive."
+            raise ValueError(msg)
+
+        rlevel = self._validate_rlevel(rlevel)
+        factor = 1 << rlevel
+        numrows, numcols = self.shape[:2]
+
+        layer = self.layer
+        with self.open_session() as session:
+            for row in range(0, _ceildiv(numrows, factor), rows_per_strip):
+                area = (row * factor, 0,
+                        min((row + rows_per_strip) * factor, numrows),
+                        numcols)
+                strip = session.read(area=area, rlevel=rlevel, layer=layer)
+                yield ((row, 0, row + strip.shape[0], strip.shape[1]),
+                       strip)
+
+    def iter_layers(self, area=None, rlevel=0):
+        """Decode the image at each quality layer in turn.
+
+        The first image yielded is the coarsest one, decoded from the first
+        quality layer only, and the last one is decoded from all of them.
+        This is a convenience for progressive display, no cheaper than
+        reading each layer with read_bands(layer=...).  OpenJPEG fixes the
+        number of layers when a codec is set up and cannot add layers to an
+        image it has already decoded, so the stream and codec are reopened
+        and the main header is read again for each layer, and each layer
+        requires a decode of the area from scratch.  The layer property is
+        left unchanged.
+
+        Parameters
+        ----------
+        area : tuple, optional
+            Specifies decoding image area,
+            (first_row, first_col, last_row, last_col)
+        rlevel : int, optional
+            Factor by which to rlevel output resolution.  Use -1 to get the
+            lowest resolution thumbnail.
+
+        Yields
+        ------
+        layer : int
+            Number of quality layers decoded.
+        ndarray
+            The image data.
+
+        Raises
+        ------
+        IOError
+            If the OpenJPEG library version is less than 2.1.0.
+
+        Examples
+        --------
+        >>> import glymur
+        >>> jfile = glymur.data.nemo()
+        >>> jp2 = glymur.Jp2k(jfile)
+        >>> for layer, image in jp2.iter_layers(rlevel=1):
+        ...     print(layer, image.shape)
+        1 (728, 1296, 3)
+        2 (728, 1296, 3)
+        """
+        num_layers = self.codestream.segment[2].layers
+        original_layer = self.layer
+        try:
+            with self.open_session() as session:
+                for layer in range(1, num_layers + 1):
+                    image = session.read(area=area, rlevel=rlevel,
+                                         layer=layer)
+                    yield layer, image
+        finally:
+            self._layer = original_layer
+
+    def read_pyramid(self, levels=None, area=None):
+        """Decode the image at many resolution levels.
+
+        This is a convenience for reading each level in turn, no faster than
+        slicing level by level.  OpenJPEG fixes the resolution level when a
+        codec is set up, so the stream and codec are reopened and the main
+        header is read again for each level, and each level is decoded from
+        its code blocks on up.  The quality layer is taken from the layer
+        property.
+
+        Parameters
+        ----------
+        levels : iterable, optional
+            The resolution levels to decode, -1 being shorthand for the
+            lowest resolution.  Defaults to all of them, from 0 up to the
+            number of decomposition levels.
+        area : tuple, optional
+            Specifies decoding image area in full resolution image
+            coordinates, (first_row, first_col, last_row, last_col)
+
+        Returns
+        -------
+        list
+            One ndarray per requested resolution level, in the same order.
+
+        Raises
+        ------
+        IOError
+            If the OpenJPEG library version is less than 2.1.0, or if a
+            resolution level is out of range.
+
+        Examples
+        --------
+        >>> import glymur
+        >>> jfile = glymur.data.nemo()
+        >>> jp2 = glymur.Jp2k(jfile)
+        >>> [image.shape for image in jp2.read_pyramid()]
+        [(1456, 2592, 3), (728, 1296, 3)]
+        """
+        if levels is None:
+            levels = range(self.codestream.segment[2].num_res + 1)
+        levels = [self._validate_rlevel(rlevel) for rlevel in levels]
+
+        layer = self.layer
+        with self.open_session() as session:
+            return [session.read(area=area, rlevel=rlevel, layer=layer)
+                    for rlevel in levels]
+
+    def read_to_size(self, shape, area=None, resample='area'):
+        """Read an area of the image resampled to a given size.
+
+        Only the deepest resolution level that is at least as large as the
+        requested size is decoded, and that is then resampled.
+
+        Parameters
+        ----------
+        shape : tuple
+            Number of rows and columns wanted.  Either may be None, in which
+            case it follows from the aspect ratio of the area.
+        area : tuple, optional
+            Specifies decoding image area,
+            (first_row, first_col, last_row, last_col)
+        resample : {'area', 'nearest'}, optional
+            Average the samples falling within each output pixel, weighted
+            by the area they cover, or take the nearest sample.
+
+        Returns
+        -------
+        ndarray
+            The image data.
+
+        Examples
+        --------
+        >>> import glymur
+        >>> jfile = glymur.data.nemo()
+        >>> jp2 = glymur.Jp2k(jfile)
+        >>> jp2.read_to_size((512, None)).shape
+        (512, 911, 3)
+        """
+        if resample not in ('area', 'nearest'):
+            msg = 'Invalid resampling method "{0}".'.format(resample)
+            raise ValueError(msg)
+
+        area = self._clip_area(area)
+        y0, x0 = self._output_offset(area[0], area[1], 0)
+        y1, x1 = self._output_offset(area[2], area[3], 0)
+        numrows, numcols = shape
+        if numrows is None and numcols is None:
+            msg = "At least one of the number of rows and columns is needed."
+            raise ValueError(msg)
+        if numrows is None:
+            numrows = max(1, int(round(numcols * float(y1 - y0) / (x1 - x0))))
+        if numcols is None:
+            numcols = max(1, int(round(numrows * float(x1 - x0) / (y1 - y0))))
+
+        rlevel = 0
+        for level in range(1, self.codestream.segment[2].num_res + 1):
+            y0, x0 = self._output_offset(area[0], area[1], level)
+            y1, x1 = self._output_offset(area[2], area[3], level)
+            if y1 - y0 < numrows or x1 - x0 < numcols:
+                break
+            rlevel = level
+
+        image = self._read_area(area, rlevel)
+        if isinstance(image, list):
+            return [_resample(band, numrows, numcols, resample)
+                    for band in image]
+        return _resample(image, numrows, numcols, resample)
+
+    def to_dask(self, rlevel=0, chunks='tiles'):
+        """Represent the image as a lazily-decoded dask array.
+
+        The chunks follow the tile grid, so that each chunk decodes exactly
+        one tile, or an aligned group of tiles.  The task graph only refers
+        to the file by name and can be shipped to a distributed scheduler.
+
+        Parameters
+        ----------
+        rlevel : int, optional
+            Factor by which to rlevel output resolution.  Use -1 to get the
+            lowest resolution thumbnail.
+        chunks : 'tiles' or tuple, optional
+            Either 'tiles' for one tile per chunk, or the number of tiles
+            (rows, columns) in each chunk.
+
+        Returns
+        -------
+        dask.array.Array
+            The image data.
+
+        Raises
+        ------
+        IOError
+            If the image is not in a file, or if its components do not share
+            a datatype.
+
+        Examples
+        --------
+        >>> import glymur
+        >>> jfile = glymur.data.nemo()
+        >>> jp2 = glymur.Jp2k(jfile)
+        >>> jp2.to_dask(rlevel=1).chunks
+        ((728,), (1296,), (3,))
+        """
+        import dask.array as da
+        from dask.base import tokenize
+
+        if self._source is not None:
+            msg = "Only JPEG 2000 files can be read as dask arrays."
+            raise IOError(msg)
+        dtype = self._codestream_dtype()
+        if dtype is None:
+            msg = ("The image components must share a datatype of no more "
+                   "than 16 bits in order to be read as a dask array.")
+            raise IOError(msg)
+        self._subsampling_sanity_check()
+        rlevel = self._validate_rlevel(rlevel)
+
+        if chunks == 'tiles':
+            chunks = (1, 1)
+
+        siz = self.codestream.segment[1]
+        row_bounds, rows = self._chunk_bounds(siz.yosiz, siz.ysiz, siz.ytosiz,
+                                              siz.ytsiz, chunks[0],
+                                              siz.yrsiz[0] << rlevel)
+        col_bounds, cols = self._chunk_bounds(siz.xosiz, siz.xsiz, siz.xtosiz,
+                                              siz.xtsiz, chunks[1],
+                                              siz.xrsiz[0] << rlevel)
+
+        name = 'jp2k-' + tokenize(os.path.realpath(self.filename),
+                                  os.path.getmtime(self.filename), rlevel,
+                                  self.ignore_pclr_cmap_cdef, row_bounds,
+                                  col_bounds)
+
+        num_components = len(siz.xrsiz)
+        component_key = (0,) if num_components > 1 else ()
+        dsk = {}
+        for i in range(len(rows)):
+            for j in range(len(cols)):
+                area = (row_bounds[i], col_bounds[j],
+                        row_bounds[i + 1], col_bounds[j + 1])
+                key = (name, i, j) + component_key
+                dsk[key] = (_decode_area, self.filename, area, rlevel,
+                            self.ignore_pclr_cmap_cdef)
+
+        array_chunks = (tuple(rows), tuple(cols))
+        if num_components > 1:
+            array_chunks += ((num_components,),)
+        return da.Array(dsk, name, array_chunks, dtype=dtype)
+
+    @staticmethod
+    def _chunk_bounds(start, stop, tile_offset, tile_size, tiles_per_chunk,
+                      factor):
+        """Split one dimension of the image along tile boundaries.
+
+        Parameters
+        ----------
+        start, stop : int
+            Image extent on the reference grid.
+        tile_offset, tile_size : int
+            Tile grid offset and tile size on the reference grid.
+        tiles_per_chunk : int
+            Number of tiles in each chunk.
+        factor : int
+            Subsampling times the resolution reduction.
+
+        Returns
+        -------
+        tuple
+            The chunk boundaries on the reference grid, and the chunk sizes
+            in the decoded image.  Boundaries that would leave a chunk
+            without any decoded samples are dropped.
+        """
+        step = tile_size * tiles_per_chunk
+        bounds = [start]
+        position = tile_offset + step
+        while position < stop:
+            if _ceildiv(position, factor) > _ceildiv(bounds[-1], factor):
+                bounds.append(position)
+            position += step
+        if _ceildiv(stop, factor) > _ceildiv(bounds[-1], factor):
+            bounds.append(stop)
+        else:
+            bounds[-1] = stop
+
+        sizes = [_ceildiv(b, factor) - _ceildiv(a, factor)
+                 for a, b in zip(bounds[:-1], bounds[1:])]
+        return bounds, sizes
+
+    def _split_tile_data(self, data, area, rlevel):
+        """Interpret the tile buffer filled by opj_decode_tile_data.
+
+        The buffer holds each component in turn, with samples of 1, 2 or 4
+        bytes depending upon the precision.
+
+        Parameters
+        ----------
+        data : ndarray
+            Raw tile data.
+        area : tuple
+            Tile extent on the reference grid, (y0, x0, y1, x1).
+        rlevel : int
+            Resolution reduction factor the tile was decoded with.
+
+        Returns
+        -------
+        ndarray or list
+            The tile, or a list with one ndarray per component if the
+            components differ in size or precision.
+        """
+        siz = self.codestream.segment[1]
+        y0, x0, y1, x1 = area
+
+        bands = []
+        offset = 0
+        for k in range(len(siz.xrsiz)):
+            dy = siz.yrsiz[k] << rlevel
+            dx = siz.xrsiz[k] << rlevel
+            rows = _ceildiv(y1, dy) - _ceildiv(y0, dy)
+            cols = _ceildiv(x1, dx) - _ceildiv(x0, dx)
+
+            nbytes = (siz.bitdepth[k] + 7) // 8
+            nbytes = 4 if nbytes == 3 else nbytes
+            kind = 'i' if siz.signed[k] else 'u'
+            dtype = np.dtype('{0}{1}'.format(kind, nbytes))
+
+            count = rows * cols * nbytes
+            band = data[offset:offset + count].view(dtype)
+            bands.append(band.reshape(rows, cols))
+            offset += count
+
+        if len(bands) == 1:
+            return bands[0]
+        if len(set((band.shape, band.dtype) for band in bands)) > 1:
+            return bands
+        return np.dstack(bands)
+
     def _populate_dparams(self, rlevel, tile=None, area=None):
         """Populate decompression structure with appropriate input parameters.
 
@@ -1322,7 +2799,7 @@ class Jp2k(Jp2kBox):
             dparam = opj.DecompressionParametersType()
             opj.set_default_decoder_parameters(ctypes.byref(dparam))
 
-        infile = self.filename.encode()
+        infile = b'' if self.filename is None else self.filename.encode()
         nelts = opj2.PATH_LEN - len(infile)
         infile += b'0' * nelts
         dparam.infile = infile
@@ -1334,20 +2811,7 @@ class Jp2k(Jp2kBox):
         dparam.decod_format = self._codec_format
         dparam.cp_layer = self._layer
 
-        # Must check the specified rlevel against the maximum.
-        if rlevel != 0:
-            # Must check the specified rlevel against the maximum.
-            max_rlevel = self.codestream.segment[2].num_res
-            if rlevel == -1:
-                # -1 is shorthand for the largest rlevel
-                rlevel = max_rlevel
-            elif rlevel < -1 or rlevel > max_rlevel:
-                msg = ("rlevel must be in the range [-1, {max_rlevel}] "
-                       "for this image.")
-                msg = msg.format(max_rlevel=max_rlevel)
-                raise IOError(msg)
-
-        dparam.cp_reduce = rlevel
+        dparam.cp_reduce = self._validate_rlevel(rlevel)
 
         if area is not None:
             if area[0] < 0 or area[1] < 0 or area[2] <= 0 or area[3] <= 0:
@@ -1369,8 +2833,131 @@ class Jp2k(Jp2kBox):
 
         self._dparams = dparam
 
+    def _validate_rlevel(self, rlevel):
+        """Check the specified rlevel against the maximum.
+
+        Parameters
+        ----------
+        rlevel : int
+            Factor by which to rlevel output resolution, -1 being shorthand
+            for the largest rlevel.
+
+        Returns
+        -------
+        int
+            The rlevel, with -1 resolved to the actual maximum.
+        """
+        if rlevel != 0:
+            max_rlevel = self.codestream.segment[2].num_res
+            if rlevel == -1:
+                # -1 is shorthand for the largest rlevel
+                rlevel = max_rlevel
+            elif rlevel < -1 or rlevel > max_rlevel:
+                msg = ("rlevel must be in the range [-1, {max_rlevel}] "
+                       "for this image.")
+                msg = msg.format(max_rlevel=max_rlevel)
+                raise IOError(msg)
+        return rlevel
+
+    def _tile_areas(self, area=None):
+        """Intersect the tile grid with an area of the reference grid.
+
+        Parameters
+        ----------
+        area : tuple, optional
+            Area of the reference grid, (first_row, first_col, last_row,
+            last_col).  Defaults to the entire image.
+
+        Returns
+        -------
+        list
+            (tile_index, (first_row, first_col, last_row, last_col)) for
+            each tile intersecting the area, in raster order, with the tile
+            extents clipped to the area.
+        """
+        siz = self.codestream.segment[1]
+        y0, x0, y1, x1 = self._clip_area(area)
+
+        num_tile_cols = _ceildiv(siz.xsiz - siz.xtosiz, siz.xtsiz)
+        first_tile_row = (y0 - siz.ytosiz) // siz.ytsiz
+        last_tile_row = _ceildiv(y1 - siz.ytosiz, siz.ytsiz)
+        first_tile_col = (x0 - siz.xtosiz) // siz.xtsiz
+        last_tile_col = _ceildiv(x1 - siz.xtosiz, siz.xtsiz)
+
+        tiles = []
+        for p in range(first_tile_row, last_tile_row):
+            ty0 = max(siz.ytosiz + p * siz.ytsiz, y0)
+            ty1 = min(siz.ytosiz + (p + 1) * siz.ytsiz, y1)
+            for q in range(first_tile_col, last_tile_col):
+                tx0 = max(siz.xtosiz + q * siz.xtsiz, x0)
+                tx1 = min(siz.xtosiz + (q + 1) * siz.xtsiz, x1)
+                tiles.append((p * num_tile_cols + q, (ty0, tx0, ty1, tx1)))
+        return tiles
+
+    def _tile_extent(self, tile_index):
+        """Find the extent of a tile on the reference grid.
+
+        Parameters
+        ----------
+        tile_index : int
+            Index of the tile in raster order.
+
+        Returns
+        -------
+        tuple
+            (first_row, first_col, last_row, last_col), clipped to the image
+            area.
+        """
+        siz = self.codestream.segment[1]
+        num_tile_cols = _ceildiv(siz.xsiz - siz.xtosiz, siz.xtsiz)
+        p, q = divmod(tile_index, num_tile_cols)
+        return (max(siz.ytosiz + p * siz.ytsiz, siz.yosiz),
+                max(siz.xtosiz + q * siz.xtsiz, siz.xosiz),
+                min(siz.ytosiz + (p + 1) * siz.ytsiz, siz.ysiz),
+                min(siz.xtosiz + (q + 1) * siz.xtsiz, siz.xsiz))
+
+    def _clip_area(self, area=None):
+        """Clip an area to the image area of the reference grid.
+
+        Parameters
+        ----------
+        area : tuple, optional
+            Area of the reference grid, (first_row, first_col, last_row,
+            last_col).  Defaults to the entire image.
+
+        Returns
+        -------
+        tuple
+            The area, clipped.
+        """
+        siz = self.codestream.segment[1]
+        if area is None:
+            return (siz.yosiz, siz.xosiz, siz.ysiz, siz.xsiz)
+        return (max(area[0], siz.yosiz), max(area[1], siz.xosiz),
+                min(area[2], siz.ysiz), min(area[3], siz.xsiz))
+
+    def _output_offset(self, row, col, rlevel):
+        """Map a reference grid position to a position in a decoded image.
+
+        Parameters
+        ----------
+        row, col : int
+            Position on the reference grid.
+        rlevel : int
+            Resolution level of the decoded image.
+
+        Returns
+        -------
+        tuple
+            Row and column of the decoded image.
+        """
+        siz = self.codestream.segment[1]
+        return (_ceildiv(row, siz.yrsiz[0] << rlevel),
+                _ceildiv(col, siz.xrsiz[0] << rlevel))
+
     def read_bands(self, rlevel=0, layer=None, area=None, tile=None,
-                   verbose=False, ignore_pclr_cmap_cdef=False):
+                   verbose=False, ignore_pclr_cmap_cdef=False,
+                   num_threads=None, out=None, layout='hwc'):
         """Read a JPEG 2000 image.
 
         The only time you should use this method is when the image has
@@ -1393,11 +2980,24 @@ class Jp2k(Jp2kBox):
             color transformation.  Defaults to False.
         verbose : bool, optional
             Print informational messages produced by the OpenJPEG library.
+        num_threads : int, optional
+            Number of threads the OpenJPEG library uses when decoding.
+            Overrides both the num_threads property and the 'lib.num_threads'
+            option.
+        out : ndarray or buffer, optional
+            Destination for the image data, which must then have equally-sized
+            components.  May be any C-contiguous array, memory map, or object
+            supporting the buffer protocol with the shape and datatype of the
+            image.
+        layout : {'hwc', 'chw'}, optional
+            If 'hwc' (the default), the components are the last dimension of
+            the image.  If 'chw', they are the first.
 
         Returns
         -------
-        list
-            List of the individual image components.
+        list or ndarray
+            List of the individual image components, or the image itself if
+            the components are equally-sized.
 
         See also
         --------
@@ -1419,11 +3019,18 @@ class Jp2k(Jp2kBox):
 
         self.ignore_pclr_cmap_cdef = ignore_pclr_cmap_cdef
         self.layer = layer
+        image = self._read_openjp2_chunked(rlevel, area, tile,
+                                           num_threads=num_threads, out=out,
+                                           layout=layout)
+        if image is not None:
+            return image
+
         self._populate_dparams(rlevel, tile=tile, area=area)
-        lst = self._read_openjp2_common()
+        lst = self._read_openjp2_common(num_threads=num_threads, out=out,
+                                        layout=layout)
         return lst
 
-    def _extract_image(self, raw_image):
+    def _extract_image(self, raw_image, out=None, layout='hwc'):
         """
         Extract unequally-sized image bands.
 
@@ -1431,6 +3038,10 @@ class Jp2k(Jp2kBox):
         ----------
         raw_image : reference to openjpeg ImageType instance
             The image structure initialized with image characteristics.
+        out : ndarray or buffer, optional
+            Destination for equally-sized image bands.
+        layout : {'hwc', 'chw'}, optional
+            Whether the bands are the last or the first dimension.
 
         Returns
         -------
@@ -1439,13 +3050,18 @@ class Jp2k(Jp2kBox):
             extracted into a list, otherwise a numpy array.
 
         """
+        if layout not in ('hwc', 'chw'):
+            msg = 'Invalid layout "{0}".'.format(layout)
+            raise ValueError(msg)
+
         ncomps = raw_image.contents.numcomps
 
         # Make a pass thru the image, see if any of the band datatypes or
         # dimensions differ.
+        components = [raw_image.contents.comps[k] for k in range(ncomps)]
         dtypes, nrows, ncols = [], [], []
-        for k in range(raw_image.contents.numcomps):
-            component = raw_image.contents.comps[k]
+        for k, component in enumerate(components):
+            self._validate_nonzero_image_size(component.h, component.w, k)
             dtypes.append(self._component2dtype(component))
             nrows.append(component.h)
             ncols.append(component.w)
@@ -1453,34 +3069,94 @@ class Jp2k(Jp2kBox):
                       for r, c, d in zip(nrows, ncols, dtypes))
 
         if is_cube:
-            image = np.zeros((nrows[0], ncols[0], ncomps), dtypes[0])
+            if layout == 'hwc':
+                shape = (nrows[0], ncols[0], ncomps)
+            else:
+                shape = (ncomps, nrows[0], ncols[0])
+            if out is None:
+                # Every element is written below, no need to initialize.
+                image = np.empty(shape, dtypes[0])
+            else:
+                image = self._validate_output_array(out, shape, dtypes[0])
+        elif out is not None:
+            msg = ("An output array cannot be used when the image components "
+                   "differ in size or datatype.")
+            raise ValueError(msg)
         else:
             image = []
 
-        for k in range(raw_image.contents.numcomps):
-            component = raw_image.contents.comps[k]
+        # Each component is converted from int32 and written to its place in
+        # the image in a single pass, without any temporary copy.
+        for k, component in enumerate(components):
+            nelts = nrows[k] * ncols[k]
+            buffer = (ctypes.c_int32 * nelts).from_address(
+                ctypes.addressof(component.data.contents))
+            band = np.frombuffer(buffer, dtype=np.int32)
+            band = band.reshape(nrows[k], ncols[k])
+            if is_cube:
+                dest = image[:, :, k] if layout == 'hwc' else image[k]
+                np.copyto(dest, band, casting='unsafe')
+            else:
+                image.append(band.astype(dtypes[k]))
+
+        if out is not None:
+            if isinstance(out, np.ndarray):
+                return out
+            if ncomps == 1:
+                return image.reshape(image.shape[1:] if layout == 'chw'
+                                     else image.shape[:2])
+            return image
+
+        if is_cube and ncomps == 1:
+            # The component dimension has just a single layer.  Make the image
+            # data 2D instead of 3D.
+            image.shape = image.shape[1:] if layout == 'chw' else \
+                image.shape[0:2]
 
-            self._validate_nonzero_image_size(nrows[k], ncols[k], k)
+        return image
 
-            addr = ctypes.addressof(component.data.contents)
-            with warnings.catch_warnings():
-                warnings.simplefilter("ignore")
-                nelts = nrows[k] * ncols[k]
-                band = np.ctypeslib.as_array(
-                    (ctypes.c_int32 * nelts).from_address(addr))
-                if is_cube:
-                    image[:, :, k] = np.reshape(band.astype(dtypes[k]),
-                                                (nrows[k], ncols[k]))
-                else:
-                    image.append(np.reshape(band.astype(dtypes[k]),
-                                 (nrows[k], ncols[k])))
+    def _validate_output_array(self, out, shape, dtype):
+        """Make sure that a caller-supplied output array can hold the image.
 
-        if is_cube and image.shape[2] == 1:
-            # The third dimension has just a single layer.  Make the image
-            # data 2D instead of 3D.
-            image.shape = image.shape[0:2]
+        Parameters
+        ----------
+        out : ndarray or buffer
+            Destination for the image data.
+        shape : tuple
+            Shape of the image, including the component dimension.
+        dtype : builtins.type
+            Datatype of the image.
 
-        return image
+        Returns
+        -------
+        ndarray
+            View of the output array with the given shape.
+        """
+        if isinstance(out, np.ndarray):
+            array = out
+            shape_ok = array.shape == shape
+            if not shape_ok and array.size == np.prod(shape):
+                # The component dimension may be dropped for a single
+                # component.
+                shape_ok = array.shape == shape[:2] or array.shape == shape[1:]
+        else:
+            array = np.frombuffer(out, dtype=dtype)
+            shape_ok = array.size == np.prod(shape)
+
+        if array.dtype != dtype:
+            msg = ("The output array datatype is {actual}, but the image "
+                   "datatype is {expected}.")
+            msg = msg.format(actual=array.dtype, expected=np.dtype(dtype))
+            raise ValueError(msg)
+        if not shape_ok:
+            msg = "The output array shape must be {shape}, not {actual}."
+            msg = msg.format(shape=shape, actual=array.shape)
+            raise ValueError(msg)
+        if not array.flags.c_contiguous or not array.flags.writeable:
+            msg = "The output array must be both C-contiguous and writeable."
+            raise ValueError(msg)
+
+        return array.reshape(shape)
 
     def _component2dtype(self, component):
         """Determin the appropriate numpy datatype for an OpenJPEG component.
@@ -1537,7 +3213,7 @@ class Jp2k(Jp2kBox):
             Signed:  (False, False, False)
             Vertical, Horizontal Subsampling:  ((1, 1), (1, 1), (1, 1))
         """
-        with open(self.filename, 'rb') as fptr:
+        with self._open_source() as fptr:
             if self._codec_format == opj2.CODEC_J2K:
                 codestream = Codestream(fptr, self.length,
                                         header_only=header_only)
@@ -1549,7 +3225,7 @@ class Jp2k(Jp2kBox):
                 if box_length == 0:
                     # The length of the box is presumed to last until the end
                     # of the file.  Compute the effective length of the box.
-                    box_length = os.path.getsize(fptr.name) - fptr.tell() + 8
+                    box_length = self.length - fptr.tell() + 8
                 elif box_length == 1:
                     # Seek past the XL field.
                     read_buffer = fptr.read(8)
@@ -1865,6 +3541,397 @@ class Jp2k(Jp2kBox):
                     self._validate_label(box.box)
 
 
+class DecoderSession(object):
+    """Decoder resources held open across many reads of one image.
+
+    Reads made through a session do not repeat the per-file work done by
+    array-style slicing.  The codestream metadata is checked once, and the
+    stream, codec, and main header are kept open between reads.  With OpenJPEG
+    2.3 or later, a codec may decode more than once only if the image consists
+    of a single tile and all of its components are decoded, so otherwise or
+    after a change of quality layer or resolution level a new codec is set up
+    transparently.
+
+    A session is not thread-safe; use one session per thread.
+
+    Parameters
+    ----------
+    jp2 : Jp2k
+        Image to be read.
+    num_threads : int, optional
+        Number of threads the OpenJPEG library uses when decoding.
+    components : list, optional
+        Ascending indices of the only components to decode.
+    """
+
+    def __init__(self, jp2, num_threads=None, components=None):
+        self._jp2 = jp2
+        self._num_threads = num_threads
+        self._components = components
+
+        jp2._subsampling_sanity_check()
+
+        siz = jp2.codestream.segment[1]
+        num_tiles = (math.ceil(float(siz.xsiz - siz.xtosiz) / siz.xtsiz) *
+                     math.ceil(float(siz.ysiz - siz.ytosiz) / siz.ytsiz))
+        # OpenJPEG fails to decode a subset of the components twice with
+        # the same codec.
+        self._reusable = (num_tiles == 1 and components is None and
+                          version.openjpeg_version_tuple >= [2, 3, 0])
+
+        self._stack = None
+        self._stream = None
+        self._codec = None
+        self._image = None
+        self._layer = None
+        self._reduce = None
+        self._used = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Release the stream, the codec, and the image structure."""
+        if self._stack is not None:
+            self._stack.close()
+        self._stack = None
+        self._stream = self._codec = self._image = None
+        self._used = False
+
+    def _open(self, dparams):
+        """Set up a new codec for the given decompression parameters."""
+        self.close()
+        stack = ExitStack()
+        try:
+            self._stream, self._codec, self._image = \
+                self._jp2._open_openjp2_decoder(
+                    stack, num_threads=self._num_threads)
+            if self._components is not None:
+                opj2.set_decoded_components(self._codec, self._components)
+        except Exception:
+            stack.close()
+            raise
+        self._stack = stack
+        self._layer = dparams.cp_layer
+        self._reduce = dparams.cp_reduce
+
+    def read(self, area=None, rlevel=0, layer=None, out=None, layout='hwc'):
+        """Read image data through the session.
+
+        Parameters
+        ----------
+        area : tuple, optional
+            Specifies decoding image area,
+            (first_row, first_col, last_row, last_col)
+        rlevel : int, optional
+            Factor by which to rlevel output resolution.  Use -1 to get the
+            lowest resolution thumbnail.
+        layer : int, optional
+            Number of quality layer to decode.
+        out : ndarray or buffer, optional
+            Destination for the image data.  Reading repeatedly into the same
+            output array avoids allocating a new one for each read.  See
+            Jp2k.read_bands.
+        layout : {'hwc', 'chw'}, optional
+            Whether the components are the last or the first dimension.
+
+        Returns
+        -------
+        ndarray
+            The image data.
+        """
+        jp2 = self._jp2
+        jp2.layer = layer
+        jp2._populate_dparams(rlevel, area=area)
+        dparams = jp2._dparams
+
+        if ((self._codec is None or
+             (self._used and not self._reusable) or
+             dparams.cp_layer != self._layer or
+             dparams.cp_reduce != self._reduce)):
+            self._open(dparams)
+
+        try:
+            opj2.set_decode_area(self._codec, self._image,
+                                 dparams.DA_x0, dparams.DA_y0,
+                                 dparams.DA_x1, dparams.DA_y1)
+            self._used = True
+            opj2.decode(self._codec, self._stream, self._image)
+        except Exception:
+            # The codec cannot be trusted after a failure.
+            self.close()
+            raise
+
+        return jp2._extract_image(self._image, out=out, layout=layout)
+
+
+class TileWriter(object):
+    """Encoder writing an image to file one tile at a time.
+
+    The tiles are passed to the OpenJPEG library in raster order, as the
+    library requires.  A tile that arrives early is copied and held until
+    the tiles before it have been written.  Once the last tile is written,
+    the codestream is finished and the file is parsed.  A write that is
+    abandoned before then should be closed to release the encoder.
+
+    Parameters
+    ----------
+    jp2 : Jp2k
+        Image to be written, with its shape set.
+    dtype : numpy.dtype
+        Datatype of the image.
+    kwargs : dict
+        Keyword arguments of the image given to Jp2k.
+    """
+
+    def __init__(self, jp2, dtype, kwargs):
+        if opj2.OPENJP2 is None:
+            msg = ("Partial writes require version 2 of the OpenJPEG "
+                   "library.")
+            raise IOError(msg)
+        if ((kwargs.get('grid_offset') is not None or
+             kwargs.get('subsam') is not None)):
+            msg = ("Partial writes are not supported with a grid offset or "
+                   "with subsampling.")
+            raise IOError(msg)
+
+        self._jp2 = jp2
+        kwargs = dict(kwargs)
+        verbose = kwargs.pop('verbose', False)
+        num_threads = jp2._encoder_threads(kwargs.pop('num_threads', None))
+
+        shape = jp2.shape if len(jp2.shape) == 3 else jp2.shape + (1,)
+        numrows, numcols, _ = shape
+        tile_rows, tile_cols = kwargs['tilesize']
+        self._num_tiles = (_ceildiv(numrows, tile_rows) *
+                           _ceildiv(numcols, tile_cols))
+        self._next_tile = 0
+        self._pending = {}
+
+        # The parameters are determined from an array of the image shape and
+        # datatype whose elements all share the memory of a single sample.
+        template = np.lib.stride_tricks.as_strided(np.zeros(1, dtype=dtype),
+                                                   shape=shape,
+                                                   strides=(0, 0, 0))
+        jp2._determine_colorspace(**kwargs)
+        jp2._populate_cparams(template, **kwargs)
+        jp2._populate_comptparms(template)
+        cparams = jp2._cparams
+
+        self._stack = ExitStack()
+        try:
+            image = opj2.image_tile_create(jp2._comptparms, jp2._colorspace)
+            self._stack.callback(opj2.image_destroy, image)
+            image.contents.x0 = cparams.image_offset_x0
+            image.contents.y0 = cparams.image_offset_y0
+            image.contents.x1 = image.contents.x0 + numcols
+            image.contents.y1 = image.contents.y0 + numrows
+
+            self._codec = opj2.create_compress(cparams.codec_fmt)
+            self._stack.callback(opj2.destroy_codec, self._codec)
+
+            if jp2._verbose or verbose:
+                info_handler = _INFO_CALLBACK
+            else:
+                info_handler = None
+            opj2.set_info_handler(self._codec, info_handler)
+            opj2.set_warning_handler(self._codec, _WARNING_CALLBACK)
+            opj2.set_error_handler(self._codec, _ERROR_CALLBACK)
+
+            opj2.setup_encoder(self._codec, cparams, image)
+            if num_threads > 1:
+                opj2.codec_set_threads(self._codec, num_threads)
+
+            self._stream = opj2.stream_create_default_file_stream(
+                jp2.filename, False)
+            self._stack.callback(opj2.stream_destroy, self._stream)
+
+            opj2.start_compress(self._codec, image, self._stream)
+        except Exception:
+            self._stack.close()
+            raise
+
+        self._dtype = np.dtype(dtype)
+
+    def write(self, tile_index, block):
+        """Write a tile, or hold it until the tiles before it are written.
+
+        Parameters
+        ----------
+        tile_index : int
+            Index of the tile.
+        block : ndarray
+            Image data of the tile, (rows, columns) or (rows, columns,
+            components).
+        """
+        if self._stack is None:
+            msg = "All of the tiles have already been written."
+            raise IOError(msg)
+        if tile_index < self._next_tile or tile_index in self._pending:
+            msg = "Tile {0} has already been written.".format(tile_index)
+            raise IOError(msg)
+        if block.dtype != self._dtype:
+            msg = ("The tile datatype is {actual}, but the image datatype is "
+                   "{expected}.")
+            msg = msg.format(actual=block.dtype, expected=self._dtype)
+            raise ValueError(msg)
+
+        if tile_index != self._next_tile:
+            self._pending[tile_index] = np.array(block)
+            return
+
+        self._encode(tile_index, block)
+        while self._next_tile in self._pending:
+            self._encode(self._next_tile, self._pending.pop(self._next_tile))
+
+        if self._next_tile == self._num_tiles:
+            try:
+                opj2.end_compress(self._codec, self._stream)
+            finally:
+                self._close()
+            self._jp2.parse()
+
+    def _encode(self, tile_index, block):
+        """Pass a tile to the library, one component after another."""
+        if block.ndim == 2:
+            data = np.ascontiguousarray(block)
+        else:
+            data = np.ascontiguousarray(np.transpose(block, (2, 0, 1)))
+        try:
+            opj2.write_tile(self._codec, tile_index, data, data.nbytes,
+                            self._stream)
+        except Exception:
+            # The codestream cannot be completed after a failure.
+            self._close()
+            raise
+        self._next_tile += 1
+
+    def close(self):
+        """Abandon an unfinished write, releasing the encoder.
+
+        The file is left incomplete.  Closing a finished write does nothing.
+        """
+        if self._stack is not None:
+            self._close()
+
+    def _close(self):
+        """Release the codec, the stream, and the image structure."""
+        self._stack.close()
+        self._stack = None
+        self._next_tile = self._num_tiles
+
+
+def _ceildiv(a, b):
+    """Integer division, rounding up."""
+    return -(-a // b)
+
+
+def _area_weights(n_out, n_in):
+    """Weights for resampling n_in samples to n_out by area averaging.
+
+    Returns
+    -------
+    ndarray
+        Matrix of shape (n_out, n_in), each row holding the fractions of the
+        input samples covered by that output sample, normalized to sum to 1.
+    """
+    edges = np.arange(n_out + 1) * (float(n_in) / n_out)
+    lo = edges[:-1, np.newaxis]
+    hi = edges[1:, np.newaxis]
+    j = np.arange(n_in)
+    overlap = np.minimum(hi, j + 1) - np.maximum(lo, j)
+    overlap = np.clip(overlap, 0, None)
+    return overlap / overlap.sum(axis=1, keepdims=True)
+
+
+def _resample(image, numrows, numcols, method):
+    """Resample an image in its first two dimensions.
+
+    Parameters
+    ----------
+    image : ndarray
+        Image of shape (rows, columns) or (rows, columns, bands).
+    numrows, numcols : int
+        Size of the output image.
+    method : {'area', 'nearest'}
+        Resampling method.
+
+    Returns
+    -------
+    ndarray
+        The resampled image, of the same datatype.
+    """
+    if image.shape[:2] == (numrows, numcols):
+        return image
+
+    if method == 'nearest':
+        rows = (np.arange(numrows) + 0.5) * image.shape[0] // numrows
+        cols = (np.arange(numcols) + 0.5) * image.shape[1] // numcols
+        return image[rows.astype(np.intp)[:, np.newaxis],
+                     cols.astype(np.intp)]
+
+    row_weights = _area_weights(numrows, image.shape[0])
+    col_weights = _area_weights(numcols, image.shape[1])
+    data = np.tensordot(row_weights, image, axes=(1, 0))
+    data = np.tensordot(col_weights, data, axes=(1, 1)).swapaxes(0, 1)
+
+    if np.issubdtype(image.dtype, np.integer):
+        info = np.iinfo(image.dtype)
+        data = np.clip(np.rint(data), info.min, info.max)
+    return data.astype(image.dtype)
+
+
+# Largest library buffer for one chunk decoded by Jp2k.read_to_file.
+_CHUNK_BYTES = 64 * 1024 * 1024
+
+# Process-wide state for workers decoding sub-areas of an image in parallel.
+_DECODE_WORKER = {}
+
+
+def _decode_area(filename, area, rlevel, ignore_pclr_cmap_cdef=False):
+    """Decode one chunk of the dask array made by Jp2k.to_dask."""
+    jp2 = Jp2k(filename)
+    jp2.ignore_pclr_cmap_cdef = ignore_pclr_cmap_cdef
+    return jp2._read(area=area, rlevel=rlevel)
+
+
+def _init_decode_worker(filename, path, dtype, shape, rlevel, layer,
+                        ignore_pclr_cmap_cdef, verbose, offset=0,
+                        flush=False):
+    """Open the image and the shared output array once per worker process."""
+    jp2 = Jp2k(filename)
+    jp2.ignore_pclr_cmap_cdef = ignore_pclr_cmap_cdef
+    jp2.verbose = verbose
+    _DECODE_WORKER['jp2'] = jp2
+    _DECODE_WORKER['out'] = np.memmap(path, dtype=dtype, mode='r+',
+                                      shape=shape, offset=offset)
+    _DECODE_WORKER['rlevel'] = rlevel
+    _DECODE_WORKER['layer'] = layer
+    _DECODE_WORKER['flush'] = flush
+
+
+def _decode_sub_area(task):
+    """Decode one sub-area of the image into the shared output array.
+
+    Returns
+    -------
+    tuple
+        The sub-area.
+    """
+    area, row, col = task
+    jp2 = _DECODE_WORKER['jp2']
+    data = jp2._read(area=area, rlevel=_DECODE_WORKER['rlevel'],
+                     layer=_DECODE_WORKER['layer'])
+    out = _DECODE_WORKER['out']
+    out[row:row + data.shape[0], col:col + data.shape[1]] = data
+    if _DECODE_WORKER['flush']:
+        out.flush()
+    return area
+
+
 # Setup the default callback handlers.  See the callback functions subsection
 # in the ctypes section of the Python documentation for a solid explanation of
 # what's going on here.
@@ -44,6 +44,19 @@ CINEMA_MODE_TYPE = ctypes.c_int32
 RSIZ_CAPABILITIES_TYPE = ctypes.c_int32
 STREAM_TYPE_P = ctypes.c_void_p
 
+# Callback prototypes for streams with user-supplied I/O functions.
+STREAM_READ_FN = ctypes.CFUNCTYPE(ctypes.c_size_t, ctypes.c_void_p,
+                                  ctypes.c_size_t, ctypes.c_void_p)
+STREAM_WRITE_FN = ctypes.CFUNCTYPE(ctypes.c_size_t, ctypes.c_void_p,
+                                   ctypes.c_size_t, ctypes.c_void_p)
+STREAM_SKIP_FN = ctypes.CFUNCTYPE(ctypes.c_int64, ctypes.c_int64,
+                                  ctypes.c_void_p)
+STREAM_SEEK_FN = ctypes.CFUNCTYPE(BOOL_TYPE, ctypes.c_int64, ctypes.c_void_p)
+STREAM_FREE_USER_DATA_FN = ctypes.CFUNCTYPE(None, ctypes.c_void_p)
+
+# Default size of the stream buffer, OPJ_J2K_STREAM_CHUNK_SIZE.
+STREAM_CHUNK_SIZE = 0x100000
+
 PATH_LEN = 4096
 J2K_MAXRLVLS = 33
 J2K_MAXBANDS = (3 * J2K_MAXRLVLS - 2)
@@ -594,6 +607,33 @@ def check_error(status):
             raise OpenJPEGLibraryError("OpenJPEG function failure.")
 
 
+def codec_set_threads(codec, num_threads):
+    """Allocates worker threads for the compressor/decompressor.
+
+    Wraps the openjp2 library function opj_codec_set_threads.  This function
+    is only available in version 2.2.0 and higher of the openjp2 library, and
+    only supports compressors in version 2.4.0 and higher.  It must be called
+    after opj_setup_decoder and before opj_read_header when decoding, or
+    after opj_setup_encoder and before opj_start_compress when encoding.
+
+    Parameters
+    ----------
+    codec : CODEC_TYPE
+        The JPEG2000 codec.
+    num_threads : int
+        Number of threads.
+
+    Raises
+    ------
+    RuntimeError
+        If the OpenJPEG library routine opj_codec_set_threads fails.
+    """
+    OPENJP2.opj_codec_set_threads.argtypes = [CODEC_TYPE, ctypes.c_int]
+    OPENJP2.opj_codec_set_threads.restype = check_error
+
+    OPENJP2.opj_codec_set_threads(codec, ctypes.c_int(num_threads))
+
+
 def create_compress(codec_format):
     """Creates a J2K/JP2 compress structure.
 
@@ -812,6 +852,26 @@ def end_decompress(codec, stream):
     OPENJP2.opj_end_decompress(codec, stream)
 
 
+def has_thread_support():
+    """Determine if the library can use multiple threads.
+
+    Wraps the openjp2 library function opj_has_thread_support.  Libraries
+    older than version 2.2.0 do not provide the function and so are treated as
+    having no thread support.
+
+    Returns
+    -------
+    bool
+        True if the library was built with thread support.
+    """
+    if OPENJP2 is None or not hasattr(OPENJP2, 'opj_has_thread_support'):
+        return False
+
+    OPENJP2.opj_has_thread_support.argtypes = []
+    OPENJP2.opj_has_thread_support.restype = BOOL_TYPE
+    return bool(OPENJP2.opj_has_thread_support())
+
+
 def image_destroy(image):
     """Deallocate any resources associated with an image.
 
@@ -1028,6 +1088,38 @@ def set_decode_area(codec, image, start_x=0, start_y=0, end_x=0, end_y=0):
                                 ctypes.c_int32(end_y))
 
 
+def set_decoded_components(codec, components):
+    """Restricts the decoding to a subset of the components.
+
+    Wraps the openjp2 library function opj_set_decoded_components, which is
+    only available in version 2.3.0 or higher.  This function should be
+    called right after read_header and before set_decode_area.
+
+    Parameters
+    ----------
+    codec : CODEC_TYPE
+        Codec initialized by create_decompress function.
+    components : sequence
+        Zero-based indices of the components to decode, without duplicates.
+
+    Raises
+    ------
+    RuntimeError
+        If the OpenJPEG library routine opj_set_decoded_components fails.
+    """
+    OPENJP2.opj_set_decoded_components.argtypes = [
+        CODEC_TYPE, ctypes.c_uint32, ctypes.POINTER(ctypes.c_uint32),
+        BOOL_TYPE
+    ]
+    OPENJP2.opj_set_decoded_components.restype = check_error
+
+    indices = (ctypes.c_uint32 * len(components))(*components)
+
+    # The library refuses to apply color transforms to a component subset.
+    OPENJP2.opj_set_decoded_components(codec, len(components), indices,
+                                       FALSE)
+
+
 def set_default_decoder_parameters():
     """Wraps openjp2 library function opj_set_default_decoder_parameters.
 
@@ -1244,6 +1336,32 @@ def start_compress(codec, image, stream):
     OPENJP2.opj_start_compress(codec, image, stream)
 
 
+def stream_create(buffer_size, isa_read_stream):
+    """Wraps openjp2 library function opj_stream_create.
+
+    Creates a stream without any I/O functions.  The read, write, skip and
+    seek functions must then be supplied with the stream_set_* functions.
+
+    Parameters
+    ----------
+    buffer_size : int
+        Size of the internal buffer of the stream.
+    isa_read_stream:  bool
+        True (read) or False (write)
+
+    Returns
+    -------
+    stream : stream_t
+        An OpenJPEG stream.
+    """
+    ARGTYPES = [ctypes.c_size_t, BOOL_TYPE]
+    OPENJP2.opj_stream_create.argtypes = ARGTYPES
+    OPENJP2.opj_stream_create.restype = STREAM_TYPE_P
+    read_stream = 1 if isa_read_stream else 0
+    stream = OPENJP2.opj_stream_create(buffer_size, read_stream)
+    return stream
+
+
 def stream_create_default_file_stream(fname, isa_read_stream):
     """Wraps openjp2 library function opj_stream_create_default_vile_stream.
 
@@ -1287,6 +1405,109 @@ def stream_destroy(stream):
     OPENJP2.opj_stream_destroy(stream)
 
 
+def stream_set_read_function(stream, read_function):
+    """Wraps openjp2 library function opj_stream_set_read_function.
+
+    Parameters
+    ----------
+    stream : STREAM_TYPE_P
+        The stream.
+    read_function : STREAM_READ_FN
+        Reads up to the requested number of bytes into a buffer, returning
+        the number of bytes read or (size_t)-1 at the end of the stream.
+    """
+    ARGTYPES = [STREAM_TYPE_P, STREAM_READ_FN]
+    OPENJP2.opj_stream_set_read_function.argtypes = ARGTYPES
+    OPENJP2.opj_stream_set_read_function.restype = None
+    OPENJP2.opj_stream_set_read_function(stream, read_function)
+
+
+def stream_set_seek_function(stream, seek_function):
+    """Wraps openjp2 library function opj_stream_set_seek_function.
+
+    Parameters
+    ----------
+    stream : STREAM_TYPE_P
+        The stream.
+    seek_function : STREAM_SEEK_FN
+        Moves to an absolute position, returning OPJ_TRUE on success.
+    """
+    ARGTYPES = [STREAM_TYPE_P, STREAM_SEEK_FN]
+    OPENJP2.opj_stream_set_seek_function.argtypes = ARGTYPES
+    OPENJP2.opj_stream_set_seek_function.restype = None
+    OPENJP2.opj_stream_set_seek_function(stream, seek_function)
+
+
+def stream_set_skip_function(stream, skip_function):
+    """Wraps openjp2 library function opj_stream_set_skip_function.
+
+    Parameters
+    ----------
+    stream : STREAM_TYPE_P
+        The stream.
+    skip_function : STREAM_SKIP_FN
+        Moves relative to the current position, returning the number of
+        bytes skipped or -1 on failure.
+    """
+    ARGTYPES = [STREAM_TYPE_P, STREAM_SKIP_FN]
+    OPENJP2.opj_stream_set_skip_function.argtypes = ARGTYPES
+    OPENJP2.opj_stream_set_skip_function.restype = None
+    OPENJP2.opj_stream_set_skip_function(stream, skip_function)
+
+
+def stream_set_write_function(stream, write_function):
+    """Wraps openjp2 library function opj_stream_set_write_function.
+
+    Parameters
+    ----------
+    stream : STREAM_TYPE_P
+        The stream.
+    write_function : STREAM_WRITE_FN
+        Writes the requested number of bytes from a buffer, returning the
+        number of bytes written or (size_t)-1 on failure.
+    """
+    ARGTYPES = [STREAM_TYPE_P, STREAM_WRITE_FN]
+    OPENJP2.opj_stream_set_write_function.argtypes = ARGTYPES
+    OPENJP2.opj_stream_set_write_function.restype = None
+    OPENJP2.opj_stream_set_write_function(stream, write_function)
+
+
+def stream_set_user_data(stream, data, free_function=None):
+    """Wraps openjp2 library function opj_stream_set_user_data.
+
+    Parameters
+    ----------
+    stream : STREAM_TYPE_P
+        The stream.
+    data : ctypes.c_void_p
+        User data passed to each of the stream I/O functions.
+    free_function : STREAM_FREE_USER_DATA_FN, optional
+        Called with the user data when the stream is destroyed.
+    """
+    ARGTYPES = [STREAM_TYPE_P, ctypes.c_void_p, STREAM_FREE_USER_DATA_FN]
+    OPENJP2.opj_stream_set_user_data.argtypes = ARGTYPES
+    OPENJP2.opj_stream_set_user_data.restype = None
+    if free_function is None:
+        free_function = STREAM_FREE_USER_DATA_FN()
+    OPENJP2.opj_stream_set_user_data(stream, data, free_function)
+
+
+def stream_set_user_data_length(stream, length):
+    """Wraps openjp2 library function opj_stream_set_user_data_length.
+
+    Parameters
+    ----------
+    stream : STREAM_TYPE_P
+        The stream.
+    length : int
+        Total length of the data to be read.
+    """
+    ARGTYPES = [STREAM_TYPE_P, ctypes.c_uint64]
+    OPENJP2.opj_stream_set_user_data_length.argtypes = ARGTYPES
+    OPENJP2.opj_stream_set_user_data_length.restype = None
+    OPENJP2.opj_stream_set_user_data_length(stream, length)
+
+
 def write_tile(codec, tile_index, data, data_size, stream):
     """Wraps openjp2 library function opj_write_tile.
 
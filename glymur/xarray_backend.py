@@ -0,0 +1,283 @@
+"""This file is part of glymur, a Python interface for accessing JPEG 2000.
+
+Backend for opening JPEG 2000 files with xarray, i.e.
+
+    xarray.open_dataset('scene.jp2', engine='glymur')
+
+http://glymur.readthedocs.org
+
+Copyright 2013 John Evans
+
+License:  MIT
+"""
+# Standard library imports...
+import copy
+import os
+import threading
+
+# Third party library imports
+import numpy as np
+import xarray as xr
+from xarray.backends import BackendArray, BackendEntrypoint
+from xarray.core import indexing
+
+# Local imports...
+from .jp2k import Jp2k
+from .jp2box import _GEOTIFF_UUID
+from ._stream import is_source
+
+# Values of the GTRasterTypeGeoKey.
+_PIXEL_IS_AREA = 1
+_PIXEL_IS_POINT = 2
+
+
+class Jp2kBackendArray(BackendArray):
+    """Lazily decoded resolution level of a JPEG 2000 image.
+
+    The array has dimensions (band, y, x).  Indexing it decodes only the
+    area and bands selected, by way of the Jp2k slicing protocol.
+    """
+    def __init__(self, jp2, rlevel):
+        self.jp2 = jp2
+        self.rlevel = rlevel
+
+        numrows, numcols = jp2.shape[:2]
+        numbands = 1 if len(jp2.shape) == 2 else jp2.shape[2]
+        factor = 1 << rlevel
+        self.shape = (numbands, -(-numrows // factor), -(-numcols // factor))
+        self.dtype = np.dtype(jp2._codestream_dtype())
+
+        # Images in files are read with a copy of the Jp2k object per read,
+        # but in-memory sources share a single file position.
+        self._lock = threading.Lock() if jp2._source is not None else None
+
+    def __getitem__(self, key):
+        return indexing.explicit_indexing_adapter(
+            key, self.shape, indexing.IndexingSupport.BASIC, self._getitem)
+
+    def _getitem(self, key):
+        """Read the smallest area and band range that covers the basic
+        indexer, and index that in memory.
+        """
+        bounds = []
+        local_key = []
+        for k, size in zip(key, self.shape):
+            lo, hi, local = _normalize_index(k, size)
+            bounds.append((lo, hi))
+            local_key.append(local)
+
+        (b0, b1), (y0, y1), (x0, x1) = bounds
+        if b0 == b1 or y0 == y1 or x0 == x1:
+            data = np.zeros((b1 - b0, y1 - y0, x1 - x0), dtype=self.dtype)
+            return data[tuple(local_key)]
+
+        # Map the rows and columns back to the full resolution image.
+        numrows, numcols = self.jp2.shape[:2]
+        factor = 1 << self.rlevel
+        rows = slice(y0 * factor, min(y1 * factor, numrows), factor)
+        cols = slice(x0 * factor, min(x1 * factor, numcols), factor)
+
+        if self._lock is None:
+            data = self._read(copy.copy(self.jp2), rows, cols, b0, b1)
+        else:
+            with self._lock:
+                data = self._read(self.jp2, rows, cols, b0, b1)
+
+        data = np.transpose(data, (2, 0, 1))
+        return data[tuple(local_key)]
+
+    @staticmethod
+    def _read(jp2, rows, cols, b0, b1):
+        """Decode rows and columns of a range of bands, as (y, x, band)."""
+        if len(jp2.shape) == 2:
+            return jp2[rows, cols][:, :, np.newaxis]
+        return jp2[rows, cols, b0:b1]
+
+
+class GlymurBackendEntrypoint(BackendEntrypoint):
+    """Open JPEG 2000 files as xarray datasets.
+
+    The dataset has one variable per resolution level, 'rlevel_0' being
+    the full resolution image with dimensions (band, y, x), 'rlevel_1'
+    being half that resolution with dimensions (band, y_1, x_1), and so
+    on.  If the file has a GeoTIFF UUID box, the x and y coordinates are
+    those of the pixel centres.  Nothing is decoded until the variables
+    are indexed or loaded.
+
+    Examples
+    --------
+    >>> import glymur, xarray as xr
+    >>> ds = xr.open_dataset(glymur.data.nemo(), engine='glymur')
+    >>> ds['rlevel_1'].shape
+    (3, 728, 1296)
+    """
+    open_dataset_parameters = ('filename_or_obj', 'drop_variables',
+                               'rlevels')
+    description = "Open JPEG 2000 files in xarray with glymur."
+    url = "http://glymur.readthedocs.org"
+
+    def open_dataset(self, filename_or_obj, drop_variables=None,
+                     rlevels=None):
+        """Open a JPEG 2000 file as a dataset.
+
+        Parameters
+        ----------
+        filename_or_obj : str, bytes, or file object
+            The JPEG 2000 file, or anything else that Jp2k can read.
+        drop_variables : list, optional
+            Names of the resolution levels to leave out of the dataset.
+        rlevels : iterable, optional
+            The resolution levels to include, defaults to all of them.
+
+        Returns
+        -------
+        xarray.Dataset
+            The lazily decoded resolution levels.
+        """
+        if not is_source(filename_or_obj):
+            filename_or_obj = os.fspath(filename_or_obj)
+        jp2 = Jp2k(filename_or_obj)
+        if jp2._codestream_dtype() is None:
+            msg = ("The image components must share a datatype of no more "
+                   "than 16 bits in order to be opened with xarray.")
+            raise IOError(msg)
+
+        num_res = jp2.codestream.segment[2].num_res
+        if rlevels is None:
+            rlevels = range(num_res + 1)
+        drop_variables = set(drop_variables or ())
+
+        geotiff = _geotiff_tags(jp2)
+
+        variables = {}
+        coords = {}
+        for rlevel in rlevels:
+            rlevel = jp2._validate_rlevel(rlevel)
+            name = 'rlevel_{0}'.format(rlevel)
+            if name in drop_variables:
+                continue
+
+            if rlevel == 0:
+                dims = ('band', 'y', 'x')
+            else:
+                dims = ('band', 'y_{0}'.format(rlevel),
+                        'x_{0}'.format(rlevel))
+
+            backend_array = Jp2kBackendArray(jp2, rlevel)
+            data = indexing.LazilyIndexedArray(backend_array)
+            variables[name] = xr.Variable(dims, data)
+
+            if geotiff is not None:
+                xy = _pixel_centres(geotiff, backend_array.shape[1:], rlevel)
+                if xy is not None:
+                    coords[dims[2]] = xr.Variable(dims[2], xy[0])
+                    coords[dims[1]] = xr.Variable(dims[1], xy[1])
+
+        return xr.Dataset(variables, coords=coords)
+
+    def guess_can_open(self, filename_or_obj):
+        try:
+            _, ext = os.path.splitext(os.fspath(filename_or_obj))
+        except TypeError:
+            return False
+        return ext.lower() in ('.jp2', '.j2k', '.j2c', '.jpx', '.jpf')
+
+
+def _normalize_index(key, size):
+    """Turn a basic index of one dimension into the range that it covers
+    and the index into that range.
+
+    Parameters
+    ----------
+    key : int or slice
+        Basic index.
+    size : int
+        Length of the dimension.
+
+    Returns
+    -------
+    tuple
+        The first and one past the last position covered, and the index
+        relative to the first position.
+    """
+    if isinstance(key, slice):
+        positions = range(*key.indices(size))
+        if len(positions) == 0:
+            return 0, 0, slice(0, 0)
+        lo = min(positions[0], positions[-1])
+        hi = max(positions[0], positions[-1]) + 1
+        return lo, hi, slice(None, None, positions.step)
+
+    key = int(key)
+    if key < 0:
+        key += size
+    if not 0 <= key < size:
+        msg = "Index {0} is out of bounds for size {1}.".format(key, size)
+        raise IndexError(msg)
+    return key, key + 1, 0
+
+
+def _geotiff_tags(jp2):
+    """Find the tags of the GeoTIFF UUID box, if any."""
+    for box in jp2.box:
+        if box.box_id == 'uuid' and box.uuid == _GEOTIFF_UUID:
+            if isinstance(box.data, dict):
+                return box.data
+    return None
+
+
+def _pixel_centres(tags, shape, rlevel):
+    """Compute the model coordinates of the pixel centres of a resolution
+    level.
+
+    Parameters
+    ----------
+    tags : dict
+        GeoTIFF tags.
+    shape : tuple
+        Number of rows and columns of the resolution level.
+    rlevel : int
+        The resolution level.
+
+    Returns
+    -------
+    tuple or None
+        The x coordinates of the columns and the y coordinates of the rows,
+        or None if the tags do not describe an unrotated grid.
+    """
+    factor = 1 << rlevel
+
+    # Raster space positions of the pixel centres.  In the PixelIsArea
+    # model pixels are the unit squares between integer positions, and in
+    # the PixelIsPoint model they are centred upon integer positions.
+    rows = (np.arange(shape[0]) + 0.5) * factor
+    cols = (np.arange(shape[1]) + 0.5) * factor
+    if _raster_type(tags) == _PIXEL_IS_POINT:
+        rows -= 0.5
+        cols -= 0.5
+
+    if 'ModelTransformation' in tags:
+        m = tags['ModelTransformation']
+        if m[1] != 0 or m[4] != 0:
+            # Rotated or sheared, no 1D coordinates.
+            return None
+        return m[0] * cols + m[3], m[5] * rows + m[7]
+
+    if 'ModelPixelScale' in tags and 'ModelTiePoint' in tags:
+        sx, sy = tags['ModelPixelScale'][:2]
+        i, j, _, x, y = tags['ModelTiePoint'][:5]
+        return x + (cols - i) * sx, y - (rows - j) * sy
+
+    return None
+
+
+def _raster_type(tags):
+    """Look up the GTRasterTypeGeoKey, PixelIsArea by default."""
+    keys = tags.get('GeoKeyDirectory')
+    if keys is None:
+        return _PIXEL_IS_AREA
+    for n in range(4, len(keys) - 3, 4):
+        key_id, location, _, value = keys[n:n + 4]
+        if key_id == 1025 and location == 0:
+            return value
+    return _PIXEL_IS_AREA
@@ -17,6 +17,9 @@ kwargs = {
     'package_data': {'glymur': ['data/*.jp2', 'data/*.j2k', 'data/*.jpx']},
     'entry_points': {
         'console_scripts': ['jp2dump=glymur.command_line:main'],
+        'xarray.backends': [
+            'glymur=glymur.xarray_backend:GlymurBackendEntrypoint'
+        ],
     },
     'license': 'MIT',
     'test_suite': 'glymur.test'
@@ -26,6 +29,8 @@ install_requires = ['numpy>=1.7.1', 'setuptools']
 if sys.hexversion < 0x03030000:
     install_requires.append('contextlib2>=0.4')
     install_requires.append('mock>=0.7.2')
+if sys.hexversion < 0x03020000:
+    install_requires.append('futures>=3.0')
 kwargs['install_requires'] = install_requires
 
 clssfrs = ["Programming Language :: Python",
@@ -199,6 +199,20 @@ try:
 except ImportError:
     HAVE_GDAL = False
 
+# Do we have dask?
+try:
+    import dask.array
+    HAVE_DASK = True
+except ImportError:
+    HAVE_DASK = False
+
+# Do we have xarray?
+try:
+    import xarray
+    HAVE_XARRAY = True
+except ImportError:
+    HAVE_XARRAY = False
+
 def _indent(textstr):
     """
     Indent a string.
@@ -0,0 +1,200 @@
+"""
+Tests for reading many files at once.
+"""
+# Standard library imports ...
+import doctest
+import os
+import shutil
+import tempfile
+import unittest
+try:
+    from unittest.mock import patch
+except ImportError:
+    from mock import patch
+
+# Third party library imports ...
+import numpy as np
+
+# Local imports
+import glymur
+from glymur import Jp2k
+from glymur.version import openjpeg_version
+
+from glymur import batch
+
+from .fixtures import OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG
+
+
+# Doc tests should be run as well.
+def load_tests(loader, tests, ignore):
+    """Should run doc tests as well"""
+    if glymur.lib.openjp2.OPENJP2 is not None:
+        tests.addTests(doctest.DocTestSuite('glymur.batch'))
+    return tests
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+@unittest.skipIf(openjpeg_version < '2.1.0', "Requires as least v2.1.0")
+class TestReadMany(unittest.TestCase):
+    """
+    Tests for glymur.read_many.
+    """
+    @classmethod
+    def setUpClass(self):
+        self.jp2file = glymur.data.nemo()
+        self.j2kfile = glymur.data.goodstuff()
+        self.jp2_data = Jp2k(self.jp2file)[:]
+        self.j2k_data = Jp2k(self.j2kfile)[:]
+        self.paths = [self.jp2file, 'no_such_file.jp2', self.j2kfile]
+
+    def _check_results(self, results):
+        self.assertEqual([result.index for result in results], [0, 1, 2])
+        np.testing.assert_array_equal(results[0].image, self.jp2_data)
+        self.assertIsNone(results[1].image)
+        self.assertIsInstance(results[1].error, IOError)
+        np.testing.assert_array_equal(results[2].image, self.j2k_data)
+
+    def test_threads(self):
+        results = glymur.read_many(self.paths, workers=2)
+        self._check_results(results)
+
+    def test_processes(self):
+        results = glymur.read_many(self.paths, workers=2, executor='process')
+        self._check_results(results)
+
+    def test_as_completed(self):
+        results = glymur.read_many(self.paths, workers=2, ordered=False)
+        results = sorted(results, key=lambda result: result.index)
+        self._check_results(results)
+
+    def test_area_and_rlevel(self):
+        results = glymur.read_many([self.jp2file], area=(0, 0, 256, 512),
+                                   rlevel=1)
+        np.testing.assert_array_equal(results[0].image,
+                                      Jp2k(self.jp2file)[:256:2, :512:2])
+
+    def test_stack(self):
+        for executor in ('thread', 'process'):
+            paths = ['no_such_file.jp2'] + [self.jp2file, self.j2kfile] * 2
+            out, results = glymur.read_many(paths, area=(0, 0, 100, 100),
+                                            workers=2, executor=executor,
+                                            stack=True)
+            self.assertEqual(out.shape, (5, 100, 100, 3))
+            self.assertIsNotNone(results[0].error)
+            np.testing.assert_array_equal(out[0], 0)
+            np.testing.assert_array_equal(out[3], self.jp2_data[:100, :100])
+            np.testing.assert_array_equal(out[4], self.j2k_data[:100, :100])
+            self.assertTrue(np.shares_memory(results[4].image, out))
+
+    def test_stack_shape_mismatch(self):
+        out, results = glymur.read_many([self.jp2file, self.j2kfile],
+                                        stack=True)
+        self.assertEqual(out.shape, (2,) + self.jp2_data.shape)
+        self.assertIsInstance(results[1].error, ValueError)
+
+    def test_bad_executor(self):
+        with self.assertRaises(IOError):
+            glymur.read_many(self.paths, executor='greenlet')
+
+    def test_stack_unordered(self):
+        with self.assertRaises(IOError):
+            glymur.read_many(self.paths, stack=True, ordered=False)
+
+
+class TestWriteManyWithoutEncoding(unittest.TestCase):
+    """
+    Tests for glymur.write_many that do not need the library.
+    """
+    def setUp(self):
+        self.tdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tdir)
+
+    def test_parameters(self):
+        """
+        Per-item parameters override the common ones.
+        """
+        data = np.zeros((8, 8), dtype=np.uint8)
+        items = [('a.jp2', data), ('b.jp2', data, {'numres': 2}),
+                 ('c.jp2',)]
+        with patch('glymur.batch.Jp2k') as mock_jp2k:
+            results = glymur.write_many(items, executor='thread',
+                                        numres=3, irreversible=True)
+
+        self.assertEqual([result.path for result in results],
+                         ['a.jp2', 'b.jp2', None])
+        self.assertIsNone(results[0].error)
+        self.assertIsNone(results[1].error)
+        self.assertIsInstance(results[2].error, ValueError)
+        self.assertIsNotNone(results[0].seconds)
+
+        kwargs = sorted((args[0], kwargs['numres'], kwargs['irreversible'])
+                        for args, kwargs in mock_jp2k.call_args_list)
+        self.assertEqual(kwargs, [('a.jp2', 3, True), ('b.jp2', 2, True)])
+
+    def test_shared_array(self):
+        data = np.arange(60, dtype=np.uint16).reshape(3, 4, 5)
+        shared = batch._SharedArray(data, self.tdir, 7)
+        np.testing.assert_array_equal(shared.attach(), data)
+        self.assertEqual(os.listdir(self.tdir), ['7.dat'])
+
+        shared.release()
+        self.assertEqual(os.listdir(self.tdir), [])
+
+    def test_bad_executor(self):
+        with self.assertRaises(IOError):
+            glymur.write_many([], executor='greenlet')
+
+
+@unittest.skipIf(glymur.lib.openjp2.OPENJP2 is None,
+                 "Requires the OpenJPEG 2.x library")
+class TestWriteMany(unittest.TestCase):
+    """
+    Tests for glymur.write_many.
+    """
+    def setUp(self):
+        self.tdir = tempfile.mkdtemp()
+        self.chips = [np.random.randint(0, 256,
+                                        size=(32, 48, 3)).astype(np.uint8)
+                      for _ in range(5)]
+        self.paths = [os.path.join(self.tdir, '{0}.jp2'.format(j))
+                      for j in range(5)]
+
+    def tearDown(self):
+        shutil.rmtree(self.tdir)
+
+    def _check_results(self, results):
+        self.assertEqual([result.index for result in results],
+                         list(range(5)))
+        for result, path, chip in zip(results, self.paths, self.chips):
+            self.assertIsNone(result.error)
+            self.assertEqual(result.path, path)
+            self.assertGreaterEqual(result.seconds, 0)
+            np.testing.assert_array_equal(Jp2k(path)[:], chip)
+
+    def test_processes(self):
+        results = glymur.write_many(zip(self.paths, self.chips), workers=2)
+        self._check_results(results)
+
+    def test_threads(self):
+        results = glymur.write_many(zip(self.paths, self.chips), workers=2,
+                                    executor='thread')
+        self._check_results(results)
+
+    def test_as_completed(self):
+        results = glymur.write_many(zip(self.paths, self.chips), workers=2,
+                                    ordered=False)
+        results = sorted(results, key=lambda result: result.index)
+        self._check_results(results)
+
+    def test_error(self):
+        """
+        A file that cannot be written does not stop the others.
+        """
+        items = list(zip(self.paths, self.chips))
+        items[1] = (self.paths[1], self.chips[1].astype(np.float64))
+        results = glymur.write_many(items, workers=2)
+        self.assertIsNotNone(results[1].error)
+        self.assertIsNone(results[0].error)
+        self.assertIsNone(results[2].error)
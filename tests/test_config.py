@@ -75,6 +75,61 @@ class TestSuiteOptions(unittest.TestCase):
                 warnings.simplefilter('ignore')
                 glymur.config.set_printoptions(blah='value-blah')
 
+    def test_async_workers_default(self):
+        """
+        The asyncio API uses as many threads as there are CPUs by default.
+        """
+        self.assertIsNone(glymur.get_option('async.workers'))
+
+    def test_tile_cache_default(self):
+        """
+        The tile cache is disabled by default.
+        """
+        self.assertEqual(glymur.get_option('cache.tile_bytes'), 0)
+
+    def test_max_working_bytes_default(self):
+        """
+        Decoding is not split up to bound memory use by default.
+        """
+        self.assertEqual(glymur.get_option('decode.max_working_bytes'), 0)
+
+    def test_encode_num_threads_default(self):
+        """
+        Encoding is single-threaded by default.
+        """
+        self.assertEqual(glymur.get_option('encode.num_threads'), 1)
+
+    def test_encode_num_threads_old_library(self):
+        """
+        Verify exception when the library cannot encode with threads.
+        """
+        with patch('glymur.lib.openjp2.has_thread_support') as mock_support:
+            mock_support.return_value = True
+            with patch('glymur.version.openjpeg_version_tuple', [2, 3, 1]):
+                with self.assertRaises(RuntimeError):
+                    glymur.set_option('encode.num_threads', 4)
+
+                # A single thread is always allowed.
+                glymur.set_option('encode.num_threads', 1)
+
+    def test_num_threads_default(self):
+        """
+        Decoding is single-threaded by default.
+        """
+        self.assertEqual(glymur.get_option('lib.num_threads'), 1)
+
+    def test_num_threads_without_thread_support(self):
+        """
+        Verify exception when the library cannot use threads.
+        """
+        with patch('glymur.lib.openjp2.has_thread_support') as mock_support:
+            mock_support.return_value = False
+            with self.assertRaises(RuntimeError):
+                glymur.set_option('lib.num_threads', 4)
+
+            # A single thread is always allowed.
+            glymur.set_option('lib.num_threads', 1)
+
 
 @unittest.skipIf(sys.hexversion < 0x03020000,
                  "TemporaryDirectory introduced in 3.2.")
@@ -5,11 +5,14 @@ Tests for general glymur functionality.
 import datetime
 import doctest
 from io import BytesIO
+import mmap
 import os
+import pickle
 import re
 import struct
 import sys
 import tempfile
+import threading
 import unittest
 import uuid
 import warnings
@@ -142,6 +145,75 @@ class TestSliceProtocolBaseWrite(SliceProtocolBase):
                 j[:25, :45, :] = self.j2k_data[:25, :25, :]
 
 
+@unittest.skipIf(os.name == "nt", fixtures.WINDOWS_TMP_FILE_MSG)
+class TestTileWrite(unittest.TestCase):
+    """
+    Tests for writing an image one tile-aligned block at a time.
+    """
+    def setUp(self):
+        self.data = np.random.randint(0, 256,
+                                      size=(64, 80, 3)).astype(np.uint8)
+
+    def test_unaligned_blocks(self):
+        with tempfile.NamedTemporaryFile(suffix='.j2k') as tfile:
+            j = Jp2k(tfile.name, shape=self.data.shape, tilesize=(32, 32))
+            with self.assertRaises(TypeError):
+                j[16:48, :32] = self.data[16:48, :32]
+            with self.assertRaises(TypeError):
+                j[:32, :40] = self.data[:32, :40]
+            with self.assertRaises(TypeError):
+                j[:32, :32, 0] = self.data[:32, :32, 0]
+            with self.assertRaises(TypeError):
+                j[:32:2, :32] = self.data[:32:2, :32]
+            with self.assertRaises(ValueError):
+                j[:32, :32] = self.data[:16, :32]
+
+    @unittest.skipIf(glymur.lib.openjp2.OPENJP2 is None,
+                     "Requires the OpenJPEG 2.x library")
+    def test_write_tiles_in_order(self):
+        with tempfile.NamedTemporaryFile(suffix='.j2k') as tfile:
+            j = Jp2k(tfile.name, shape=self.data.shape, tilesize=(32, 32))
+            for row in range(0, 64, 32):
+                for col in range(0, 80, 32):
+                    j[row:row + 32, col:col + 32] = \
+                        self.data[row:row + 32, col:col + 32]
+
+            actual = Jp2k(tfile.name)[:]
+            siz = Jp2k(tfile.name).codestream.segment[1]
+
+        np.testing.assert_array_equal(actual, self.data)
+        self.assertEqual((siz.ytsiz, siz.xtsiz), (32, 32))
+
+    @unittest.skipIf(glymur.lib.openjp2.OPENJP2 is None,
+                     "Requires the OpenJPEG 2.x library")
+    def test_write_blocks_out_of_order(self):
+        """
+        Blocks of several tiles can arrive in any order.
+        """
+        with tempfile.NamedTemporaryFile(suffix='.j2k') as tfile:
+            j = Jp2k(tfile.name, shape=self.data.shape, tilesize=(32, 32))
+            j[32:, :] = self.data[32:, :]
+            j[:32, 64:] = self.data[:32, 64:]
+            j[:32, :64] = self.data[:32, :64]
+
+            actual = Jp2k(tfile.name)[:]
+
+            with self.assertRaises(IOError):
+                j[:32, :32] = self.data[:32, :32]
+
+        np.testing.assert_array_equal(actual, self.data)
+
+    @unittest.skipIf(glymur.lib.openjp2.OPENJP2 is None,
+                     "Requires the OpenJPEG 2.x library")
+    def test_full_write_uses_keywords(self):
+        with tempfile.NamedTemporaryFile(suffix='.j2k') as tfile:
+            j = Jp2k(tfile.name, shape=self.data.shape, tilesize=(32, 32))
+            j[:] = self.data
+            siz = Jp2k(tfile.name).codestream.segment[1]
+
+        self.assertEqual((siz.ytsiz, siz.xtsiz), (32, 32))
+
+
 @unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
 class TestSliceProtocolRead(SliceProtocolBase):
 
@@ -2354,3 +2426,1157 @@ class TestReadArea(unittest.TestCase):
         actual = self.j2k[20:50:4, 150:200:4]
         expected = self.j2k_quarter_data[5:13, 38:50]
         np.testing.assert_array_equal(actual, expected)
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+@unittest.skipIf(glymur.version.openjpeg_version < '2.1.0',
+                 "Requires as least v2.1.0")
+@unittest.skipIf(os.name == "nt", fixtures.WINDOWS_TMP_FILE_MSG)
+class TestDecoderSession(unittest.TestCase):
+    """
+    Tests for reading through a decoder session.
+    """
+    @classmethod
+    def setUpClass(self):
+        self.jp2 = Jp2k(glymur.data.nemo())
+        self.jp2_data = self.jp2[:]
+
+    def test_windows(self):
+        """
+        Should be able to read many windows through one session.
+        """
+        with self.jp2.open_session() as session:
+            for r in range(0, 1024, 256):
+                actual = session.read(area=(r, 0, r + 256, 256))
+                expected = self.jp2_data[r:r + 256, :256]
+                np.testing.assert_array_equal(actual, expected)
+
+    def test_change_rlevel(self):
+        """
+        Changing the resolution level between reads should be handled.
+        """
+        with self.jp2.open_session() as session:
+            actual = session.read(rlevel=1)
+            np.testing.assert_array_equal(actual, self.jp2[::2, ::2])
+
+            actual = session.read(area=(100, 100, 300, 300))
+            expected = self.jp2_data[100:300, 100:300]
+            np.testing.assert_array_equal(actual, expected)
+
+    def test_tiled(self):
+        """
+        A multi-tile image must transparently reopen the codec.
+        """
+        with tempfile.NamedTemporaryFile(suffix='.jp2') as tfile:
+            j = Jp2k(tfile.name, data=self.jp2_data[:512, :512],
+                     tilesize=(256, 256))
+            with j.open_session() as session:
+                for r in range(0, 512, 200):
+                    actual = session.read(area=(r, 10, r + 100, 400))
+                    expected = self.jp2_data[r:r + 100, 10:400]
+                    np.testing.assert_array_equal(actual, expected)
+
+    def test_closed_session_can_be_reused(self):
+        """
+        Reading after closing the session sets up a new codec.
+        """
+        session = self.jp2.open_session()
+        session.read(area=(0, 0, 64, 64))
+        session.close()
+        actual = session.read(area=(0, 0, 64, 64))
+        session.close()
+        np.testing.assert_array_equal(actual, self.jp2_data[:64, :64])
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+@unittest.skipIf(not glymur.lib.openjp2.has_thread_support(),
+                 "Requires OpenJPEG with thread support")
+@unittest.skipIf(os.name == "nt", fixtures.WINDOWS_TMP_FILE_MSG)
+class TestThreads(unittest.TestCase):
+    """
+    Tests for multi-threaded decoding.
+    """
+    @classmethod
+    def setUpClass(self):
+        self.jp2 = Jp2k(glymur.data.nemo())
+        self.jp2_data = self.jp2[:]
+
+    def tearDown(self):
+        glymur.reset_option('all')
+
+    def test_option(self):
+        """
+        Threads may be requested through the lib.num_threads option.
+        """
+        with tempfile.NamedTemporaryFile(suffix='.jp2') as tfile:
+            j = Jp2k(tfile.name, data=self.jp2_data, tilesize=(512, 512))
+            glymur.set_option('lib.num_threads', 4)
+            actual = j[:]
+        np.testing.assert_array_equal(actual, self.jp2_data)
+
+    def test_property(self):
+        """
+        Threads may be requested on a single image.
+        """
+        jp2 = Jp2k(glymur.data.nemo())
+        jp2.num_threads = 2
+        actual = jp2[::2, ::2]
+        np.testing.assert_array_equal(actual, self.jp2[::2, ::2])
+
+    def test_read_bands(self):
+        """
+        Threads may be requested on a single read_bands call.
+        """
+        actual = self.jp2.read_bands(num_threads=2)
+        np.testing.assert_array_equal(actual, self.jp2_data)
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+@unittest.skipIf(not glymur.lib.openjp2.has_thread_support(),
+                 "Requires OpenJPEG with thread support")
+@unittest.skipIf(glymur.version.openjpeg_version < '2.4.0',
+                 "Requires as least v2.4.0")
+@unittest.skipIf(os.name == "nt", fixtures.WINDOWS_TMP_FILE_MSG)
+class TestEncodeThreads(unittest.TestCase):
+    """
+    Tests for multi-threaded encoding.
+    """
+    @classmethod
+    def setUpClass(self):
+        self.jp2_data = Jp2k(glymur.data.nemo())[:]
+
+    def tearDown(self):
+        glymur.reset_option('all')
+
+    def test_keyword(self):
+        """
+        The image is the same whatever the number of threads.
+        """
+        with tempfile.NamedTemporaryFile(suffix='.jp2') as tfile:
+            Jp2k(tfile.name, data=self.jp2_data, tilesize=(512, 512),
+                 num_threads=4)
+            actual = Jp2k(tfile.name)[:]
+        np.testing.assert_array_equal(actual, self.jp2_data)
+
+    def test_option(self):
+        """
+        Threads may be requested through the encode.num_threads option.
+        """
+        glymur.set_option('encode.num_threads', 4)
+        with patch('glymur.lib.openjp2.codec_set_threads',
+                   wraps=glymur.lib.openjp2.codec_set_threads) as mock_set:
+            with tempfile.NamedTemporaryFile(suffix='.jp2') as tfile:
+                Jp2k(tfile.name, data=self.jp2_data)
+                actual = Jp2k(tfile.name)[:]
+        np.testing.assert_array_equal(actual, self.jp2_data)
+        self.assertEqual(mock_set.call_args[0][1], 4)
+
+    def test_tile_writes(self):
+        """
+        Tile-by-tile writes may also use threads.
+        """
+        data = self.jp2_data[:512, :1024]
+        with tempfile.NamedTemporaryFile(suffix='.jp2') as tfile:
+            glymur.write_from(data, tfile.name, tilesize=(256, 256),
+                              num_threads=2)
+            actual = Jp2k(tfile.name)[:]
+        np.testing.assert_array_equal(actual, data)
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+@unittest.skipIf(glymur.version.openjpeg_version < '2.1.0',
+                 "Requires as least v2.1.0")
+@unittest.skipIf(os.name == "nt", fixtures.WINDOWS_TMP_FILE_MSG)
+class TestParallelRead(unittest.TestCase):
+    """
+    Tests for decoding tiles in a pool of worker processes.
+    """
+    @classmethod
+    def setUpClass(self):
+        self.jp2 = Jp2k(glymur.data.nemo())
+        self.jp2_data = self.jp2[:]
+
+        self.tfile = tempfile.NamedTemporaryFile(suffix='.jp2')
+        self.tiled = Jp2k(self.tfile.name, data=self.jp2_data,
+                          tilesize=(256, 256))
+
+    @classmethod
+    def tearDownClass(self):
+        self.tfile.close()
+
+    def test_full_image(self):
+        actual = self.tiled.read(parallel='process', workers=2)
+        np.testing.assert_array_equal(actual, self.jp2_data)
+
+    def test_area_and_rlevel(self):
+        """
+        Tile boundaries must line up in a reduced resolution subarea.
+        """
+        area = (100, 130, 900, 1500)
+        actual = self.tiled.read(parallel='process', workers=3, area=area,
+                                 rlevel=2)
+        expected = self.tiled[100:900:4, 130:1500:4]
+        np.testing.assert_array_equal(actual, expected)
+
+    def test_single_tile(self):
+        """
+        An image with just one tile is read serially.
+        """
+        actual = self.jp2.read(parallel='process', workers=2)
+        np.testing.assert_array_equal(actual, self.jp2_data)
+
+    def test_bad_parallel_mode(self):
+        with self.assertRaises(IOError):
+            self.jp2.read(parallel='thread')
+
+    def test_unsupported_parallel_options(self):
+        for kwargs in ({'out': np.zeros(self.jp2.shape, dtype=np.uint8)},
+                       {'layout': 'chw'}, {'tile': 0}, {'num_threads': 2}):
+            with self.assertRaises(IOError):
+                self.jp2.read(parallel='process', **kwargs)
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+@unittest.skipIf(glymur.version.openjpeg_version < '2.1.0',
+                 "Requires as least v2.1.0")
+class TestOutputArray(unittest.TestCase):
+    """
+    Tests for decoding into caller-supplied output arrays.
+    """
+    @classmethod
+    def setUpClass(self):
+        self.jp2 = Jp2k(glymur.data.nemo())
+        self.jp2_data = self.jp2[:256, :256]
+
+    def test_ndarray(self):
+        out = np.zeros((256, 256, 3), dtype=np.uint8)
+        actual = self.jp2.read_bands(area=(0, 0, 256, 256), out=out)
+        self.assertIs(actual, out)
+        np.testing.assert_array_equal(out, self.jp2_data)
+
+    def test_chw_layout(self):
+        expected = self.jp2_data.transpose(2, 0, 1)
+
+        actual = self.jp2.read_bands(area=(0, 0, 256, 256), layout='chw')
+        np.testing.assert_array_equal(actual, expected)
+
+        out = np.zeros((3, 256, 256), dtype=np.uint8)
+        self.jp2.read_bands(area=(0, 0, 256, 256), out=out, layout='chw')
+        np.testing.assert_array_equal(out, expected)
+
+    def test_buffer(self):
+        """
+        Any writeable object supporting the buffer protocol may be used.
+        """
+        out = bytearray(256 * 256 * 3)
+        self.jp2.read_bands(area=(0, 0, 256, 256), out=out)
+        actual = np.frombuffer(out, dtype=np.uint8).reshape(256, 256, 3)
+        np.testing.assert_array_equal(actual, self.jp2_data)
+
+    def test_session(self):
+        out = np.zeros((64, 64, 3), dtype=np.uint8)
+        with self.jp2.open_session() as session:
+            for r in range(0, 256, 64):
+                session.read(area=(r, 0, r + 64, 64), out=out)
+                np.testing.assert_array_equal(out,
+                                              self.jp2_data[r:r + 64, :64])
+
+    def test_bad_dtype(self):
+        out = np.zeros((256, 256, 3), dtype=np.uint16)
+        with self.assertRaises(ValueError):
+            self.jp2.read_bands(area=(0, 0, 256, 256), out=out)
+
+    def test_bad_shape(self):
+        out = np.zeros((256, 256, 4), dtype=np.uint8)
+        with self.assertRaises(ValueError):
+            self.jp2.read_bands(area=(0, 0, 256, 256), out=out)
+
+    def test_not_contiguous(self):
+        out = np.zeros((256, 256, 6), dtype=np.uint8)[:, :, ::2]
+        with self.assertRaises(ValueError):
+            self.jp2.read_bands(area=(0, 0, 256, 256), out=out)
+
+    def test_bad_layout(self):
+        with self.assertRaises(ValueError):
+            self.jp2.read_bands(area=(0, 0, 256, 256), layout='whc')
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+@unittest.skipIf(openjpeg_version < '2.1.0', "Requires as least v2.1.0")
+class TestInMemorySource(unittest.TestCase):
+    """
+    Tests for reading JPEG 2000 data from buffers and file objects.
+    """
+    @classmethod
+    def setUpClass(self):
+        with open(glymur.data.nemo(), 'rb') as f:
+            self.jp2_bytes = f.read()
+        self.jp2_data = Jp2k(glymur.data.nemo())[:]
+        with open(glymur.data.goodstuff(), 'rb') as f:
+            self.j2k_bytes = f.read()
+        self.j2k_data = Jp2k(glymur.data.goodstuff())[:]
+
+    def test_bytes(self):
+        jp2 = Jp2k(self.jp2_bytes)
+        self.assertEqual(jp2.shape, (1456, 2592, 3))
+        self.assertEqual([box.box_id for box in jp2.box],
+                         ['jP  ', 'ftyp', 'jp2h', 'uuid', 'jp2c'])
+        np.testing.assert_array_equal(jp2[:], self.jp2_data)
+
+    def test_raw_codestream(self):
+        for source in (bytearray(self.j2k_bytes), memoryview(self.j2k_bytes)):
+            j2k = Jp2k(source)
+            np.testing.assert_array_equal(j2k[:], self.j2k_data)
+
+    def test_file_object(self):
+        jp2 = Jp2k(BytesIO(self.jp2_bytes))
+        expected = Jp2k(glymur.data.nemo())[::2, ::2]
+        np.testing.assert_array_equal(jp2[::2, ::2], expected)
+
+        with open(glymur.data.goodstuff(), 'rb') as f:
+            j2k = Jp2k(f)
+            np.testing.assert_array_equal(j2k[:], self.j2k_data)
+
+    def test_mmap(self):
+        """
+        The mmap may be closed once the image has been read.
+        """
+        with open(glymur.data.nemo(), 'rb') as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            jp2 = Jp2k(buffer)
+            with jp2.open_session() as session:
+                actual = session.read(area=(0, 0, 64, 64))
+            buffer.close()
+        np.testing.assert_array_equal(actual, self.jp2_data[:64, :64])
+
+    def test_printing(self):
+        jp2 = Jp2k(BytesIO(self.jp2_bytes))
+        self.assertEqual(repr(jp2), "glymur.Jp2k(<BytesIO object>)")
+        self.assertIn('Contiguous Codestream Box', str(jp2))
+
+    def test_not_writable(self):
+        with self.assertRaises(IOError):
+            Jp2k(BytesIO(), data=self.j2k_data)
+
+    def test_not_jpeg2000(self):
+        with self.assertRaises(IOError):
+            Jp2k(b'\x00' * 64)
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+@unittest.skipIf(openjpeg_version < '2.1.0', "Requires as least v2.1.0")
+@unittest.skipIf(os.name == "nt", fixtures.WINDOWS_TMP_FILE_MSG)
+class TestIterTiles(unittest.TestCase):
+    """
+    Tests for decoding one tile at a time.
+    """
+    @classmethod
+    def setUpClass(self):
+        self.jp2_data = Jp2k(glymur.data.nemo())[:500, :700]
+
+    def test_tiled(self):
+        with tempfile.NamedTemporaryFile(suffix='.j2k') as tfile:
+            j = Jp2k(tfile.name, data=self.jp2_data, tilesize=(128, 256))
+            for rlevel in (0, 1):
+                step = 2 ** rlevel
+                expected = j[::step, ::step]
+                actual = np.zeros_like(expected)
+                tile_indices = []
+                for tile_index, area, tile in j.iter_tiles(rlevel=rlevel):
+                    y0, x0, y1, x1 = area
+                    actual[y0:y1, x0:x1] = tile
+                    tile_indices.append(tile_index)
+                self.assertEqual(tile_indices, list(range(12)))
+                np.testing.assert_array_equal(actual, expected)
+
+    def test_single_component(self):
+        with tempfile.NamedTemporaryFile(suffix='.j2k') as tfile:
+            j = Jp2k(tfile.name, data=self.jp2_data[:, :, 0],
+                     tilesize=(256, 256))
+            tiles = list(j.iter_tiles())
+            self.assertEqual(len(tiles), 6)
+            self.assertEqual(tiles[-1][1], (256, 512, 500, 700))
+            np.testing.assert_array_equal(tiles[-1][2],
+                                          self.jp2_data[256:, 512:, 0])
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+@unittest.skipIf(openjpeg_version < '2.3.0', "Requires as least v2.3.0")
+@unittest.skipIf(os.name == "nt", fixtures.WINDOWS_TMP_FILE_MSG)
+class TestDecodedComponents(unittest.TestCase):
+    """
+    Tests for decoding only the bands selected by slicing.
+    """
+    @classmethod
+    def setUpClass(self):
+        data = Jp2k(glymur.data.nemo())[:256, :256]
+        self.data = np.concatenate((data, data[:, :, ::-1]), axis=2)
+
+    def setUp(self):
+        self.tfile = tempfile.NamedTemporaryFile(suffix='.j2k')
+        self.j2k = Jp2k(self.tfile.name, data=self.data, mct=False)
+
+    def tearDown(self):
+        self.tfile.close()
+
+    def test_band_selections(self):
+        for bands in (0, [4], [5, 3], [4, 4, 1], slice(1, 6, 2)):
+            with patch('glymur.lib.openjp2.set_decoded_components',
+                       wraps=glymur.lib.openjp2.set_decoded_components) as p:
+                actual = self.j2k[:, :, bands]
+            np.testing.assert_array_equal(actual, self.data[:, :, bands])
+            self.assertEqual(p.call_count, 1)
+
+    def test_reduced_resolution(self):
+        actual = self.j2k[:128:2, :128:2, [3]]
+        expected = self.j2k[::2, ::2][:64, :64, [3]]
+        np.testing.assert_array_equal(actual, expected)
+
+    def test_multiple_component_transform(self):
+        """
+        The transformed components must be decoded together with the rest.
+        """
+        with tempfile.NamedTemporaryFile(suffix='.j2k') as tfile:
+            j = Jp2k(tfile.name, data=self.data, mct=True)
+            with patch('glymur.lib.openjp2.set_decoded_components') as p:
+                actual = j[:, :, 1]
+            np.testing.assert_array_equal(actual, self.data[:, :, 1])
+            self.assertEqual(p.call_count, 0)
+
+            np.testing.assert_array_equal(j[:, :, 4], self.data[:, :, 4])
+
+    def test_older_library(self):
+        with patch('glymur.version.openjpeg_version_tuple', [2, 2, 0]):
+            with patch('glymur.lib.openjp2.set_decoded_components') as p:
+                actual = self.j2k[:, :, [2]]
+        np.testing.assert_array_equal(actual, self.data[:, :, [2]])
+        self.assertEqual(p.call_count, 0)
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+@unittest.skipIf(openjpeg_version < '2.1.0', "Requires as least v2.1.0")
+@unittest.skipIf(os.name == "nt", fixtures.WINDOWS_TMP_FILE_MSG)
+class TestTileCache(unittest.TestCase):
+    """
+    Tests for assembling slices from cached tiles.
+    """
+    @classmethod
+    def setUpClass(self):
+        self.jp2_data = Jp2k(glymur.data.nemo())[:512, :768]
+
+    def setUp(self):
+        self.tfile = tempfile.NamedTemporaryFile(suffix='.j2k')
+        self.j2k = Jp2k(self.tfile.name, data=self.jp2_data,
+                        tilesize=(256, 256))
+        glymur.clear_tile_cache()
+        glymur.set_option('cache.tile_bytes', 2 ** 24)
+
+    def tearDown(self):
+        self.tfile.close()
+        glymur.reset_option('all')
+        glymur.clear_tile_cache()
+
+    def test_window(self):
+        actual = self.j2k[100:300, 100:400]
+        np.testing.assert_array_equal(actual, self.jp2_data[100:300, 100:400])
+        info = glymur.tile_cache_info()
+        self.assertEqual((info.hits, info.misses, info.tiles), (0, 4, 4))
+
+        # Only the tiles of the last column have not been seen before.
+        actual = self.j2k[200:400, 300:700]
+        np.testing.assert_array_equal(actual, self.jp2_data[200:400, 300:700])
+        info = glymur.tile_cache_info()
+        self.assertEqual((info.hits, info.misses), (2, 6))
+
+    def test_rlevel_and_bands(self):
+        expected = self.j2k[::2, ::2]
+        np.testing.assert_array_equal(self.j2k[::2, ::2], expected)
+        np.testing.assert_array_equal(self.j2k[100:300:2, 200:600:2, 1],
+                                      expected[50:150, 100:300, 1])
+        self.assertEqual(glymur.tile_cache_info().hits, 12)
+
+    def test_eviction(self):
+        """
+        Each tile is 256 x 256 x 3 bytes, so only two of them fit.
+        """
+        glymur.set_option('cache.tile_bytes', 2 * 256 * 256 * 3)
+        self.j2k[:256, :]
+        info = glymur.tile_cache_info()
+        self.assertEqual((info.evictions, info.tiles), (1, 2))
+
+        glymur.set_option('cache.tile_bytes', 0)
+        self.assertEqual(glymur.tile_cache_info().tiles, 0)
+
+    def test_rewritten_file(self):
+        self.j2k[:256, :256]
+        j2k = Jp2k(self.tfile.name, data=self.jp2_data[::-1],
+                   tilesize=(256, 256))
+        np.testing.assert_array_equal(j2k[:256, :256],
+                                      self.jp2_data[::-1][:256, :256])
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+@unittest.skipIf(openjpeg_version < '2.1.0', "Requires as least v2.1.0")
+@unittest.skipIf(sys.hexversion < 0x03050000, "Requires asyncio and await")
+class TestAsyncio(unittest.TestCase):
+    """
+    Tests for reading and writing from asyncio.
+    """
+    @classmethod
+    def setUpClass(self):
+        self.jp2_data = Jp2k(glymur.data.nemo())[:]
+
+    def setUp(self):
+        import asyncio
+        self.asyncio = asyncio
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+        glymur.reset_option('all')
+
+    def test_concurrent_reads(self):
+        """
+        Concurrent reads of one Jp2k object do not interfere.
+        """
+        jp2 = self.loop.run_until_complete(glymur.aopen(glymur.data.nemo()))
+        areas = [(r, 0, r + 64, 64) for r in range(0, 640, 64)]
+        reads = [jp2.aread(area=area) for area in areas]
+        reads.append(jp2.aread(rlevel=1))
+        reads = [self.asyncio.ensure_future(read, loop=self.loop)
+                 for read in reads]
+        images = self.loop.run_until_complete(self.asyncio.gather(*reads))
+        for (r, _, _, _), image in zip(areas, images):
+            np.testing.assert_array_equal(image,
+                                          self.jp2_data[r:r + 64, :64])
+        self.assertEqual(images[-1].shape, (728, 1296, 3))
+
+    def test_concurrent_reads_file_object(self):
+        """
+        Concurrent reads of one Jp2k object on a file object do not
+        interfere with each other's positions in the file.
+        """
+        glymur.set_option('async.workers', 4)
+        with open(glymur.data.nemo(), 'rb') as f:
+            jp2 = Jp2k(BytesIO(f.read()))
+        areas = [(r, 0, r + 64, 64) for r in range(0, 1024, 64)]
+        reads = [self.asyncio.ensure_future(jp2.aread(area=area),
+                                            loop=self.loop)
+                 for area in areas]
+        images = self.loop.run_until_complete(self.asyncio.gather(*reads))
+        for (r, _, _, _), image in zip(areas, images):
+            np.testing.assert_array_equal(image,
+                                          self.jp2_data[r:r + 64, :64])
+
+    @unittest.skipIf(os.name == "nt", fixtures.WINDOWS_TMP_FILE_MSG)
+    def test_write(self):
+        with tempfile.NamedTemporaryFile(suffix='.jp2') as tfile:
+            jp2 = self.loop.run_until_complete(
+                glymur.awrite(tfile.name, self.jp2_data[:256, :256],
+                              numres=3))
+            np.testing.assert_array_equal(jp2[:], self.jp2_data[:256, :256])
+            self.assertEqual(jp2.codestream.segment[2].num_res, 2)
+
+    def test_cancel_queued_read(self):
+        """
+        A read waiting for a worker never starts if cancelled.
+        """
+        glymur.set_option('async.workers', 1)
+        started = threading.Event()
+        release = threading.Event()
+
+        def block():
+            started.set()
+            release.wait()
+
+        jp2 = Jp2k(glymur.data.nemo())
+
+        async_block = glymur._async.run(block)
+        blocker = self.asyncio.ensure_future(async_block, loop=self.loop)
+        self.loop.run_until_complete(self.loop.run_in_executor(None,
+                                                               started.wait))
+
+        with patch.object(Jp2k, '_read') as mock_read:
+            read = self.asyncio.ensure_future(jp2.aread(), loop=self.loop)
+            self.loop.run_until_complete(self.asyncio.sleep(0.01))
+            read.cancel()
+            self.loop.run_until_complete(self.asyncio.sleep(0.01))
+            release.set()
+            self.loop.run_until_complete(blocker)
+            with self.assertRaises(self.asyncio.CancelledError):
+                self.loop.run_until_complete(read)
+        self.assertEqual(mock_read.call_count, 0)
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+@unittest.skipIf(openjpeg_version < '2.1.0', "Requires as least v2.1.0")
+@unittest.skipIf(not fixtures.HAVE_DASK, "Requires dask")
+@unittest.skipIf(os.name == "nt", fixtures.WINDOWS_TMP_FILE_MSG)
+class TestToDask(unittest.TestCase):
+    """
+    Tests for dask arrays chunked along the tile grid.
+    """
+    @classmethod
+    def setUpClass(self):
+        self.jp2_data = Jp2k(glymur.data.nemo())[:600, :800]
+
+    def setUp(self):
+        self.tfile = tempfile.NamedTemporaryFile(suffix='.j2k')
+        self.j2k = Jp2k(self.tfile.name, data=self.jp2_data,
+                        tilesize=(256, 256), numres=4)
+
+    def tearDown(self):
+        self.tfile.close()
+
+    def test_tile_chunks(self):
+        array = self.j2k.to_dask()
+        self.assertEqual(array.chunks,
+                         ((256, 256, 88), (256, 256, 256, 32), (3,)))
+        self.assertEqual(array.dtype, np.uint8)
+        np.testing.assert_array_equal(array.compute(scheduler='sync'),
+                                      self.jp2_data)
+
+    def test_tile_groups_and_rlevel(self):
+        array = self.j2k.to_dask(rlevel=2, chunks=(2, 3))
+        self.assertEqual(array.chunks, ((128, 22), (192, 8), (3,)))
+        np.testing.assert_array_equal(array.compute(scheduler='sync'),
+                                      self.j2k[::4, ::4])
+
+    def test_one_task_per_chunk(self):
+        """
+        Each chunk decodes exactly its own tile.
+        """
+        pickled = pickle.dumps(self.j2k.to_dask())
+        with patch('glymur.jp2k._decode_area',
+                   wraps=glymur.jp2k._decode_area) as p:
+            array = pickle.loads(pickled)
+            actual = array[300:400, 300:600].compute(scheduler='sync')
+        np.testing.assert_array_equal(actual,
+                                      self.jp2_data[300:400, 300:600])
+        areas = sorted(args[1] for args, _ in p.call_args_list)
+        self.assertEqual(areas, [(256, 256, 512, 512), (256, 512, 512, 768)])
+
+    def test_ignore_pclr_cmap_cdef(self):
+        """
+        Each chunk is decoded with the image's palette setting, so that it
+        matches the declared shape and datatype.
+        """
+        self.j2k.ignore_pclr_cmap_cdef = True
+        with patch('glymur.jp2k._decode_area',
+                   wraps=glymur.jp2k._decode_area) as p:
+            self.j2k.to_dask()[:10, :10].compute(scheduler='sync')
+        self.assertEqual(p.call_count, 1)
+        self.assertTrue(p.call_args[0][3])
+
+    def test_in_memory_source(self):
+        with open(self.tfile.name, 'rb') as f:
+            j2k = Jp2k(f.read())
+        with self.assertRaises(IOError):
+            j2k.to_dask()
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+@unittest.skipIf(openjpeg_version < '2.1.0', "Requires as least v2.1.0")
+@unittest.skipIf(os.name == "nt", fixtures.WINDOWS_TMP_FILE_MSG)
+class TestIterLayers(unittest.TestCase):
+    """
+    Tests for decoding at increasing quality layers.
+    """
+    @classmethod
+    def setUpClass(self):
+        self.jp2_data = Jp2k(glymur.data.nemo())[:256, :512]
+
+    def setUp(self):
+        self.tfile = tempfile.NamedTemporaryFile(suffix='.j2k')
+        self.j2k = Jp2k(self.tfile.name, data=self.jp2_data,
+                        cratios=[200, 50, 10])
+
+    def tearDown(self):
+        self.tfile.close()
+
+    def test_layers(self):
+        layers = list(self.j2k.iter_layers(area=(64, 128, 192, 384),
+                                           rlevel=1))
+        self.assertEqual([layer for layer, _ in layers], [1, 2, 3])
+
+        j2k = Jp2k(self.tfile.name)
+        for layer, image in layers:
+            expected = j2k.read_bands(layer=layer, rlevel=1,
+                                      area=(64, 128, 192, 384))
+            np.testing.assert_array_equal(image, expected)
+
+        np.testing.assert_array_equal(layers[-1][1], j2k[64:192:2, 128:384:2])
+
+    def test_layer_restored(self):
+        self.j2k.layer = 1
+        for layer, image in self.j2k.iter_layers():
+            pass
+        self.assertEqual(self.j2k.layer, 1)
+
+    def test_one_session(self):
+        with patch.object(Jp2k, 'open_session',
+                          autospec=True,
+                          side_effect=Jp2k.open_session) as mock_open:
+            for layer, image in self.j2k.iter_layers():
+                pass
+        self.assertEqual(mock_open.call_count, 1)
+        self.assertEqual(layer, 3)
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+@unittest.skipIf(openjpeg_version < '2.1.0', "Requires as least v2.1.0")
+@unittest.skipIf(os.name == "nt", fixtures.WINDOWS_TMP_FILE_MSG)
+class TestReadPyramid(unittest.TestCase):
+    """
+    Tests for decoding many resolution levels at once.
+    """
+    @classmethod
+    def setUpClass(self):
+        self.jp2_data = Jp2k(glymur.data.nemo())[:512, :768]
+
+    def setUp(self):
+        self.tfile = tempfile.NamedTemporaryFile(suffix='.j2k')
+        self.j2k = Jp2k(self.tfile.name, data=self.jp2_data,
+                        tilesize=(256, 256), numres=4)
+
+    def tearDown(self):
+        self.tfile.close()
+
+    def test_all_levels(self):
+        pyramid = self.j2k.read_pyramid()
+        self.assertEqual(len(pyramid), 4)
+        for rlevel, image in enumerate(pyramid):
+            step = 2 ** rlevel
+            np.testing.assert_array_equal(image, self.j2k[::step, ::step])
+
+    def test_levels_and_area(self):
+        pyramid = self.j2k.read_pyramid(levels=[-1, 1],
+                                        area=(128, 256, 384, 768))
+        np.testing.assert_array_equal(pyramid[0],
+                                      self.j2k[128:384:8, 256:768:8])
+        np.testing.assert_array_equal(pyramid[1],
+                                      self.j2k[128:384:2, 256:768:2])
+
+    def test_bad_level(self):
+        with self.assertRaises(IOError):
+            self.j2k.read_pyramid(levels=[0, 4])
+
+
+class TestResample(unittest.TestCase):
+    """
+    Tests for resampling decoded images.
+    """
+    def setUp(self):
+        self.image = np.arange(48, dtype=np.uint8).reshape(4, 4, 3)
+
+    def test_area(self):
+        actual = glymur.jp2k._resample(self.image, 2, 2, 'area')
+        expected = self.image.reshape(2, 2, 2, 2, 3).mean(axis=(1, 3))
+        self.assertEqual(actual.dtype, np.uint8)
+        np.testing.assert_array_equal(actual, np.rint(expected))
+
+    def test_area_fractional(self):
+        image = np.array([[0.0, 3.0, 6.0]])
+        actual = glymur.jp2k._resample(image, 1, 2, 'area')
+        np.testing.assert_allclose(actual, [[1.0, 5.0]])
+
+    def test_nearest(self):
+        actual = glymur.jp2k._resample(self.image[:, :, 0], 2, 3, 'nearest')
+        np.testing.assert_array_equal(actual, [[12, 18, 21], [36, 42, 45]])
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+@unittest.skipIf(openjpeg_version < '2.1.0', "Requires as least v2.1.0")
+@unittest.skipIf(os.name == "nt", fixtures.WINDOWS_TMP_FILE_MSG)
+class TestReadToSize(unittest.TestCase):
+    """
+    Tests for reading to a target size.
+    """
+    @classmethod
+    def setUpClass(self):
+        self.jp2_data = Jp2k(glymur.data.nemo())[:512, :768]
+
+    def setUp(self):
+        self.tfile = tempfile.NamedTemporaryFile(suffix='.j2k')
+        self.j2k = Jp2k(self.tfile.name, data=self.jp2_data, numres=4)
+
+    def tearDown(self):
+        self.tfile.close()
+
+    def test_deepest_rlevel(self):
+        """
+        At 100 rows, rlevel 2 (128 rows) is the deepest large enough.
+        """
+        with patch.object(Jp2k, '_read_area', autospec=True,
+                          side_effect=Jp2k._read_area) as mock_read:
+            actual = self.j2k.read_to_size((100, 150), resample='nearest')
+        self.assertEqual(actual.shape, (100, 150, 3))
+        self.assertEqual(mock_read.call_args[0][2], 2)
+
+        reduced = self.j2k[::4, ::4]
+        rows = ((np.arange(100) + 0.5) * 128 // 100).astype(np.intp)
+        cols = ((np.arange(150) + 0.5) * 192 // 150).astype(np.intp)
+        np.testing.assert_array_equal(actual,
+                                      reduced[rows[:, np.newaxis], cols])
+
+    def test_exact_size_and_area(self):
+        actual = self.j2k.read_to_size((64, None), area=(0, 256, 256, 512))
+        np.testing.assert_array_equal(actual, self.j2k[0:256:4, 256:512:4])
+
+    def test_upsample(self):
+        actual = self.j2k.read_to_size((1024, 1536))
+        self.assertEqual(actual.shape, (1024, 1536, 3))
+        np.testing.assert_array_equal(actual[::2, ::2], self.jp2_data)
+
+    def test_bad_resample(self):
+        with self.assertRaises(ValueError):
+            self.j2k.read_to_size((64, 64), resample='bicubic')
+
+
+class TestView(unittest.TestCase):
+    """
+    Tests for lazy views.  Decoding is faked by sampling an in-memory image
+    the way that a reduced resolution level samples the reference grid.
+    """
+    @classmethod
+    def setUpClass(self):
+        self.jp2 = Jp2k(glymur.data.nemo())
+        shape = self.jp2.shape
+        self.image = np.arange(np.prod(shape)).reshape(shape).astype(np.uint8)
+
+    def _fake_read_area(self, jp2, area, rlevel, components=None):
+        factor = 1 << rlevel
+        y0, x0, y1, x1 = area
+        y0 = -(-y0 // factor) * factor
+        x0 = -(-x0 // factor) * factor
+        return self.image[y0:y1:factor, x0:x1:factor].copy()
+
+    def _read(self, view):
+        with patch.object(Jp2k, '_read_area', autospec=True,
+                          side_effect=self._fake_read_area) as mock_read:
+            data = np.asarray(view)
+        self.assertEqual(mock_read.call_count, 1)
+        return data, mock_read.call_args[0][1:3]
+
+    def test_properties(self):
+        view = self.jp2.view[100:200, ..., 1:]
+        self.assertEqual(view.shape, (100, 2592, 2))
+        self.assertEqual(view.dtype, np.uint8)
+        self.assertEqual(view.ndim, 3)
+        self.assertEqual(len(view), 100)
+
+    def test_chained(self):
+        """
+        Chained slices are decoded as one area at a reduced rlevel.
+        """
+        view = self.jp2.view[1000:1400, :][::2, ::2][:, 200:300]
+        data, (area, rlevel) = self._read(view)
+        np.testing.assert_array_equal(data, self.image[1000:1400:2,
+                                                       400:600:2])
+        self.assertEqual(area, (1000, 400, 1399, 599))
+        self.assertEqual(rlevel, 1)
+
+    def test_unaligned_stride(self):
+        """
+        A stride that does not start on a multiple of itself is taken from
+        the full resolution image.
+        """
+        view = self.jp2.view[1::2, 10:20:6]
+        data, (area, rlevel) = self._read(view)
+        np.testing.assert_array_equal(data, self.image[1::2, 10:20:6])
+        self.assertEqual(rlevel, 0)
+
+    def test_integers_and_bands(self):
+        view = self.jp2.view[::-2][5, 100:110, [2, 0]]
+        data, _ = self._read(view)
+        np.testing.assert_array_equal(data,
+                                      self.image[::-2][5][100:110][:, [2, 0]])
+
+        view = self.jp2.view[..., 1][-1, -1]
+        self.assertEqual(view.shape, ())
+        data, _ = self._read(view)
+        self.assertEqual(data, self.image[-1, -1, 1])
+
+    def test_single_position(self):
+        """
+        A single row or column is decoded at full resolution, even where it
+        lies on the grid of a reduced resolution level.
+        """
+        for view in (self.jp2.view[64, 128], self.jp2.view[64:65, 128:129],
+                     self.jp2.view[0, 0], self.jp2.view[::4, ::4][16, :4]):
+            _, (_, rlevel) = self._read(view)
+            self.assertEqual(rlevel, 0)
+
+    def test_empty(self):
+        view = self.jp2.view[10:10]
+        self.assertEqual(view.shape, (0, 2592, 3))
+        with patch.object(Jp2k, '_read_area') as mock_read:
+            data = np.asarray(view)
+        self.assertEqual(data.shape, (0, 2592, 3))
+        self.assertEqual(mock_read.call_count, 0)
+
+    def test_bad_index(self):
+        with self.assertRaises(IndexError):
+            self.jp2.view[0, 0, 0, 0]
+        with self.assertRaises(IndexError):
+            self.jp2.view[[0, 1]]
+        with self.assertRaises(IndexError):
+            self.jp2.view[1456]
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+@unittest.skipIf(openjpeg_version < '2.1.0', "Requires as least v2.1.0")
+class TestViewDecode(unittest.TestCase):
+    """
+    Tests for decoding lazy views.
+    """
+    def test_view(self):
+        jp2 = Jp2k(glymur.data.nemo())
+        actual = np.asarray(jp2.view[200:1000][::2, ::2][:, 100:300, 1:])
+        np.testing.assert_array_equal(actual, jp2[200:1000:2, 200:600:2, 1:])
+
+    def test_single_position(self):
+        """
+        Integer and length-1 indexing give the full resolution pixels.
+        """
+        jp2 = Jp2k(glymur.data.nemo())
+        expected = jp2[:]
+        np.testing.assert_array_equal(np.asarray(jp2.view[64, 128]),
+                                      expected[64, 128])
+        np.testing.assert_array_equal(np.asarray(jp2.view[0, 0]),
+                                      expected[0, 0])
+        np.testing.assert_array_equal(np.asarray(jp2.view[64:65, 128:129]),
+                                      expected[64:65, 128:129])
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+@unittest.skipIf(openjpeg_version < '2.1.0', "Requires as least v2.1.0")
+class TestIterStrips(unittest.TestCase):
+    """
+    Tests for decoding one strip at a time.
+    """
+    @classmethod
+    def setUpClass(self):
+        self.jp2 = Jp2k(glymur.data.nemo())
+        self.jp2_data = self.jp2[:]
+
+    def test_strips(self):
+        for rlevel in (0, 1):
+            step = 2 ** rlevel
+            expected = self.jp2[::step, ::step]
+            actual = np.zeros_like(expected)
+            areas = []
+            for area, strip in self.jp2.iter_strips(300, rlevel=rlevel):
+                y0, x0, y1, x1 = area
+                actual[y0:y1, x0:x1] = strip
+                areas.append(area)
+            np.testing.assert_array_equal(actual, expected)
+            self.assertEqual(areas[0], (0, 0, 300, expected.shape[1]))
+            self.assertEqual(areas[-1][2], expected.shape[0])
+
+    def test_one_session(self):
+        with patch.object(Jp2k, 'open_session',
+                          autospec=True,
+                          side_effect=Jp2k.open_session) as mock_open:
+            strips = list(self.jp2.iter_strips(500))
+        self.assertEqual(mock_open.call_count, 1)
+        self.assertEqual(len(strips), 3)
+        np.testing.assert_array_equal(strips[1][1], self.jp2_data[500:1000])
+
+    def test_bad_rows_per_strip(self):
+        with self.assertRaises(ValueError):
+            next(self.jp2.iter_strips(0))
+
+
+class TestReadToFileChunks(unittest.TestCase):
+    """
+    Tests for the chunks and output files of Jp2k.read_to_file.
+    """
+    def setUp(self):
+        self.jp2 = Jp2k(glymur.data.nemo())
+
+    def test_single_tile_strips(self):
+        """
+        A single tile is split into strips of at most _CHUNK_BYTES of
+        library buffer.
+        """
+        with patch('glymur.version.openjpeg_version_tuple', new=[2, 3, 0]):
+            with patch('glymur.jp2k._CHUNK_BYTES', 4 * 3 * 1296 * 200):
+                areas = self.jp2._chunk_areas(1)
+            self.assertEqual(areas, [(0, 0, 400, 2592), (400, 0, 800, 2592),
+                                     (800, 0, 1200, 2592),
+                                     (1200, 0, 1456, 2592)])
+            self.assertEqual(self.jp2._chunk_areas(0), [(0, 0, 1456, 2592)])
+
+            areas = self.jp2._chunk_areas(0, area=(100, 200, 300, 400),
+                                          max_bytes=4 * 200 * 50,
+                                          num_components=1)
+            self.assertEqual(areas, [(100, 200, 150, 400),
+                                     (150, 200, 200, 400),
+                                     (200, 200, 250, 400),
+                                     (250, 200, 300, 400)])
+
+    def test_whole_tiles_before_openjpeg_23(self):
+        """
+        Older libraries decode a whole tile for any window of it.
+        """
+        with patch('glymur.version.openjpeg_version_tuple', new=[2, 2, 0]):
+            with patch('glymur.jp2k._CHUNK_BYTES', 4 * 3 * 1296 * 200):
+                areas = self.jp2._chunk_areas(1)
+        self.assertEqual(areas, [(0, 0, 1456, 2592)])
+
+    @unittest.skipIf(os.name == "nt", fixtures.WINDOWS_TMP_FILE_MSG)
+    def test_mismatched_file(self):
+        with tempfile.NamedTemporaryFile(suffix='.npy') as tfile:
+            np.save(tfile.name, np.zeros((10, 10), dtype=np.uint8))
+            with self.assertRaises(IOError):
+                self.jp2._open_output_file(tfile.name, 'npy', np.uint8,
+                                           (1456, 2592, 3), 'r+')
+            with self.assertRaises(IOError):
+                self.jp2._open_output_file(tfile.name, 'raw', np.uint8,
+                                           (1456, 2592, 3), 'r+')
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+@unittest.skipIf(openjpeg_version < '2.1.0', "Requires as least v2.1.0")
+@unittest.skipIf(os.name == "nt", fixtures.WINDOWS_TMP_FILE_MSG)
+class TestReadToFile(unittest.TestCase):
+    """
+    Tests for decoding into an array file.
+    """
+    @classmethod
+    def setUpClass(self):
+        self.jp2_data = Jp2k(glymur.data.nemo())[:600, :800]
+
+    def setUp(self):
+        self.tfile = tempfile.NamedTemporaryFile(suffix='.j2k')
+        self.j2k = Jp2k(self.tfile.name, data=self.jp2_data,
+                        tilesize=(256, 256))
+        self.outdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.outdir, 'out.npy')
+
+    def tearDown(self):
+        self.tfile.close()
+        for name in os.listdir(self.outdir):
+            os.remove(os.path.join(self.outdir, name))
+        os.rmdir(self.outdir)
+
+    def test_npy(self):
+        out = self.j2k.read_to_file(self.path)
+        np.testing.assert_array_equal(out, self.jp2_data)
+        np.testing.assert_array_equal(np.load(self.path), self.jp2_data)
+        self.assertFalse(os.path.exists(self.path + '.progress'))
+
+    def test_raw_rlevel(self):
+        path = os.path.join(self.outdir, 'out.raw')
+        self.j2k.read_to_file(path, format='raw', rlevel=1)
+        actual = np.fromfile(path, dtype=np.uint8).reshape(300, 400, 3)
+        np.testing.assert_array_equal(actual, self.j2k[::2, ::2])
+
+    def test_workers(self):
+        out = self.j2k.read_to_file(self.path, workers=2)
+        np.testing.assert_array_equal(out, self.jp2_data)
+
+    def test_resume(self):
+        """
+        Only the chunks missing from the progress file are decoded.
+        """
+        self.j2k.read_to_file(self.path)
+        out = np.lib.format.open_memmap(self.path, mode='r+')
+        out[256:] = 0
+        out.flush()
+        del out
+        areas = self.j2k._chunk_areas(0)
+        with open(self.path + '.progress', 'w') as f:
+            for area in areas[:4]:
+                f.write('{0} {1} {2} {3}\n'.format(*area))
+            f.write('512 0')
+
+        with patch.object(glymur.jp2k.DecoderSession, 'read',
+                          autospec=True,
+                          side_effect=glymur.jp2k.DecoderSession.read) as p:
+            out = self.j2k.read_to_file(self.path, resume=True)
+        np.testing.assert_array_equal(out, self.jp2_data)
+        self.assertEqual(p.call_count, len(areas) - 4)
+        self.assertFalse(os.path.exists(self.path + '.progress'))
+
+    def test_resume_complete(self):
+        self.j2k.read_to_file(self.path)
+        with patch.object(glymur.jp2k.DecoderSession, 'read') as p:
+            out = self.j2k.read_to_file(self.path, resume=True)
+        self.assertEqual(p.call_count, 0)
+        np.testing.assert_array_equal(out, self.jp2_data)
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+@unittest.skipIf(openjpeg_version < '2.1.0', "Requires as least v2.1.0")
+@unittest.skipIf(os.name == "nt", fixtures.WINDOWS_TMP_FILE_MSG)
+class TestMaxWorkingBytes(unittest.TestCase):
+    """
+    Tests for decoding in chunks to bound the library's memory use.
+    """
+    @classmethod
+    def setUpClass(self):
+        self.jp2_data = Jp2k(glymur.data.nemo())[:600, :800]
+
+    def setUp(self):
+        self.tfile = tempfile.NamedTemporaryFile(suffix='.j2k')
+        self.j2k = Jp2k(self.tfile.name, data=self.jp2_data,
+                        tilesize=(256, 256))
+        glymur.set_option('decode.max_working_bytes', 4 * 3 * 256 * 256)
+
+    def tearDown(self):
+        glymur.reset_option('decode.max_working_bytes')
+        self.tfile.close()
+
+    def _count_decodes(self, func):
+        with patch.object(glymur.jp2k.opj2, 'decode',
+                          side_effect=glymur.jp2k.opj2.decode) as p:
+            data = func()
+        return data, p.call_count
+
+    def _count_codecs(self, func):
+        with patch.object(Jp2k, '_open_openjp2_decoder', autospec=True,
+                          side_effect=Jp2k._open_openjp2_decoder) as p:
+            data = func()
+        return data, p.call_count
+
+    def test_tiles(self):
+        actual, count = self._count_decodes(lambda: self.j2k[:])
+        np.testing.assert_array_equal(actual, self.jp2_data)
+        self.assertEqual(count, 12)
+
+        actual, count = self._count_decodes(lambda: self.j2k[100:500, 100:700])
+        np.testing.assert_array_equal(actual, self.jp2_data[100:500, 100:700])
+        self.assertEqual(count, 6)
+
+    def test_small_area(self):
+        """
+        Areas within the limit are decoded in one piece.
+        """
+        actual, count = self._count_decodes(lambda: self.j2k[:256, :256])
+        np.testing.assert_array_equal(actual, self.jp2_data[:256, :256])
+        self.assertEqual(count, 1)
+
+    @unittest.skipIf(openjpeg_version < '2.3.0', "Requires as least v2.3.0")
+    def test_single_tile_strips(self):
+        with tempfile.NamedTemporaryFile(suffix='.j2k') as tfile:
+            j = Jp2k(tfile.name, data=self.jp2_data)
+            actual, count = self._count_decodes(lambda: j[:])
+            np.testing.assert_array_equal(actual, self.jp2_data)
+            # Strips of 81 rows of 800 columns of 3 components of 4 bytes.
+            self.assertEqual(count, 8)
+
+            # The strips are all decoded by one codec.
+            actual, count = self._count_codecs(lambda: j[:])
+            np.testing.assert_array_equal(actual, self.jp2_data)
+            self.assertEqual(count, 1)
+
+    def test_out_and_layout(self):
+        out = np.zeros((3, 600, 800), dtype=np.uint8)
+        actual, count = self._count_decodes(
+            lambda: self.j2k.read_bands(out=out, layout='chw'))
+        self.assertIs(actual, out)
+        np.testing.assert_array_equal(out, np.transpose(self.jp2_data,
+                                                        (2, 0, 1)))
+        self.assertEqual(count, 12)
@@ -0,0 +1,265 @@
+"""
+Tests for writing images one tile at a time.
+"""
+# Standard library imports ...
+import doctest
+import io
+import os
+import shutil
+import tempfile
+import unittest
+try:
+    from unittest.mock import patch
+except ImportError:
+    from mock import patch
+
+# Third party library imports ...
+import numpy as np
+
+# Local imports
+import glymur
+from glymur import Jp2k
+from glymur import _stream
+
+from . import fixtures
+
+
+# Doc tests should be run as well.
+def load_tests(loader, tests, ignore):
+    """Should run doc tests as well"""
+    if glymur.lib.openjp2.OPENJP2 is not None:
+        tests.addTests(doctest.DocTestSuite('glymur._write'))
+    return tests
+
+
+@unittest.skipIf(os.name == "nt", fixtures.WINDOWS_TMP_FILE_MSG)
+class TestWriteFromErrors(unittest.TestCase):
+    """
+    Tests for sources that cannot be written.  Nothing here is encoded.
+    """
+    def test_tiles_without_shape(self):
+        with tempfile.NamedTemporaryFile(suffix='.j2k') as tfile:
+            with self.assertRaises(ValueError):
+                glymur.write_from(iter([]), tfile.name, tilesize=(32, 32))
+
+
+@unittest.skipIf(glymur.lib.openjp2.OPENJP2 is None,
+                 "Requires the OpenJPEG 2.x library")
+@unittest.skipIf(os.name == "nt", fixtures.WINDOWS_TMP_FILE_MSG)
+class TestWriteFrom(unittest.TestCase):
+    """
+    Tests for glymur.write_from.
+    """
+    def setUp(self):
+        self.data = np.random.randint(0, 256,
+                                      size=(100, 70, 3)).astype(np.uint8)
+
+    def test_memmap(self):
+        with tempfile.NamedTemporaryFile(suffix='.npy') as nfile:
+            source = np.lib.format.open_memmap(nfile.name, mode='w+',
+                                               dtype=np.uint8,
+                                               shape=self.data.shape)
+            source[:] = self.data
+            source.flush()
+
+            with tempfile.NamedTemporaryFile(suffix='.jp2') as tfile:
+                jp2 = glymur.write_from(source, tfile.name, tilesize=(32, 32))
+                actual = Jp2k(tfile.name)[:]
+                siz = jp2.codestream.segment[1]
+
+        np.testing.assert_array_equal(actual, self.data)
+        self.assertEqual((siz.ytsiz, siz.xtsiz), (32, 32))
+
+    def test_sliceable_object(self):
+        """
+        Only the tiles are requested from the source.
+        """
+        class Source(object):
+            shape = (100, 70)
+            dtype = np.dtype(np.uint16)
+
+            def __init__(self, data):
+                self.data = data
+                self.requests = []
+
+            def __getitem__(self, index):
+                self.requests.append(index)
+                return self.data[index]
+
+        source = Source(self.data[:, :, 0].astype(np.uint16) * 200)
+        with tempfile.NamedTemporaryFile(suffix='.j2k') as tfile:
+            glymur.write_from(source, tfile.name, tilesize=(64, 64),
+                              numres=3)
+            actual = Jp2k(tfile.name)[:]
+
+        np.testing.assert_array_equal(actual, source.data)
+        self.assertEqual(source.requests,
+                         [(slice(0, 64), slice(0, 64)),
+                          (slice(0, 64), slice(64, 70)),
+                          (slice(64, 100), slice(0, 64)),
+                          (slice(64, 100), slice(64, 70))])
+
+    def test_generator(self):
+        def tiles():
+            for row in range(0, 100, 50):
+                for col in range(0, 70, 50):
+                    yield self.data[row:row + 50, col:col + 50]
+
+        with tempfile.NamedTemporaryFile(suffix='.jp2') as tfile:
+            glymur.write_from(tiles(), tfile.name, tilesize=(50, 50),
+                              shape=self.data.shape)
+            actual = Jp2k(tfile.name)[:]
+
+        np.testing.assert_array_equal(actual, self.data)
+
+    def test_generator_too_few_tiles(self):
+        """
+        The partly written file is removed and the encoder released.
+        """
+        tiles = [self.data[:50, :50], self.data[:50, 50:]]
+        tdir = tempfile.mkdtemp()
+        path = os.path.join(tdir, 'partial.jp2')
+        try:
+            with patch('glymur.jp2k.TileWriter.close', autospec=True,
+                       side_effect=glymur.jp2k.TileWriter.close) as mock_close:
+                with self.assertRaises(ValueError):
+                    glymur.write_from(tiles, path, tilesize=(50, 50),
+                                      shape=self.data.shape)
+            self.assertEqual(mock_close.call_count, 1)
+            self.assertEqual(os.listdir(tdir), [])
+        finally:
+            shutil.rmtree(tdir)
+
+    def test_source_error(self):
+        def tiles():
+            yield self.data[:50, :50]
+            raise RuntimeError('the source failed')
+
+        tdir = tempfile.mkdtemp()
+        path = os.path.join(tdir, 'partial.jp2')
+        try:
+            with self.assertRaises(RuntimeError):
+                glymur.write_from(tiles(), path, tilesize=(50, 50),
+                                  shape=self.data.shape)
+            self.assertEqual(os.listdir(tdir), [])
+        finally:
+            shutil.rmtree(tdir)
+
+
+class TestEncodeErrors(unittest.TestCase):
+    """
+    Tests for glymur.encode that do not need the library.
+    """
+    def test_bad_format(self):
+        with self.assertRaises(IOError):
+            glymur.encode(np.zeros((8, 8), dtype=np.uint8), format='jpx')
+
+    def test_write_all(self):
+        class Raw(object):
+            def __init__(self, limit):
+                self.data = b''
+                self.limit = limit
+
+            def write(self, data):
+                data = bytes(data[:self.limit])
+                self.data += data
+                return len(data)
+
+        target = Raw(3)
+        _stream.write_all(target, b'0123456789')
+        self.assertEqual(target.data, b'0123456789')
+
+        with self.assertRaises(IOError):
+            _stream.write_all(Raw(0), b'0123456789')
+
+    def test_is_seekable(self):
+        self.assertTrue(_stream.is_seekable(io.BytesIO()))
+
+        class Pipe(object):
+            def write(self, data):
+                pass
+
+            def seekable(self):
+                return False
+
+        self.assertFalse(_stream.is_seekable(Pipe()))
+        del Pipe.seekable
+        self.assertFalse(_stream.is_seekable(Pipe()))
+
+
+@unittest.skipIf(glymur.lib.openjp2.OPENJP2 is None,
+                 "Requires the OpenJPEG 2.x library")
+class TestEncode(unittest.TestCase):
+    """
+    Tests for glymur.encode.
+    """
+    def setUp(self):
+        self.data = np.random.randint(0, 256,
+                                      size=(64, 48, 3)).astype(np.uint8)
+
+    def test_bytes(self):
+        for format in ('jp2', 'j2k'):
+            b = glymur.encode(self.data, format=format, numres=4)
+            jp2 = Jp2k(b)
+            np.testing.assert_array_equal(jp2[:], self.data)
+            self.assertEqual(jp2.codestream.segment[2].num_res, 3)
+
+    def test_same_as_file(self):
+        """
+        The encoded bytes are those that would be written to a file.
+        """
+        with tempfile.NamedTemporaryFile(suffix='.jp2') as tfile:
+            Jp2k(tfile.name, data=self.data)
+            with open(tfile.name, 'rb') as f:
+                expected = f.read()
+        self.assertEqual(glymur.encode(self.data), expected)
+
+    def test_seekable_target(self):
+        """
+        Encoding starts at the current position of the target.
+        """
+        target = io.BytesIO()
+        target.write(b'header')
+        self.assertIsNone(glymur.encode(self.data, target))
+
+        b = target.getvalue()
+        self.assertEqual(b[:6], b'header')
+        np.testing.assert_array_equal(Jp2k(b[6:])[:], self.data)
+
+    def test_target_drops_bytes(self):
+        """
+        A target that writes nothing must make encoding fail rather than
+        silently truncate the image.
+        """
+        class NonBlocking(io.BytesIO):
+            def write(self, data):
+                return None
+
+        with self.assertRaises(glymur.lib.openjp2.OpenJPEGLibraryError):
+            glymur.encode(self.data, NonBlocking())
+
+    def test_unseekable_target(self):
+        """
+        Short writes to a target that cannot seek are continued.
+        """
+        class Pipe(object):
+            def __init__(self):
+                self.chunks = []
+
+            def write(self, data):
+                self.chunks.append(bytes(data[:1000]))
+                return len(self.chunks[-1])
+
+        target = Pipe()
+        glymur.encode(self.data, target)
+        self.assertGreater(len(target.chunks), 1)
+        np.testing.assert_array_equal(Jp2k(b''.join(target.chunks))[:],
+                                      self.data)
+
+    def test_unseekable_target_drops_bytes(self):
+        class Pipe(object):
+            def write(self, data):
+                return None
+
+        with self.assertRaises(IOError):
+            glymur.encode(self.data, Pipe())
@@ -0,0 +1,203 @@
+"""
+Tests for the xarray backend.
+"""
+# Standard library imports ...
+import doctest
+import os
+import tempfile
+import unittest
+import uuid
+try:
+    from unittest.mock import patch
+except ImportError:
+    from mock import patch
+
+# Third party library imports ...
+import numpy as np
+import pkg_resources as pkg
+
+# Local imports
+import glymur
+from glymur import Jp2k
+from glymur.version import openjpeg_version
+
+from .fixtures import OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG
+from .fixtures import WINDOWS_TMP_FILE_MSG
+from . import fixtures
+
+if fixtures.HAVE_XARRAY:
+    import xarray as xr
+    from glymur import xarray_backend
+
+
+# Doc tests should be run as well.
+def load_tests(loader, tests, ignore):
+    """Should run doc tests as well"""
+    if glymur.lib.openjp2.OPENJP2 is not None and fixtures.HAVE_XARRAY:
+        tests.addTests(doctest.DocTestSuite('glymur.xarray_backend'))
+    return tests
+
+
+@unittest.skipIf(not fixtures.HAVE_XARRAY, "Requires xarray")
+class TestOpenDataset(unittest.TestCase):
+    """
+    Tests for opening datasets.  Nothing here is decoded.
+    """
+    def setUp(self):
+        self.jp2file = glymur.data.nemo()
+        self.engine = xarray_backend.GlymurBackendEntrypoint
+
+    def test_variables(self):
+        with patch('glymur.jp2k.Jp2k.__getitem__') as mock_getitem:
+            ds = xr.open_dataset(self.jp2file, engine=self.engine)
+        self.assertEqual(mock_getitem.call_count, 0)
+
+        self.assertEqual(sorted(ds.data_vars), ['rlevel_0', 'rlevel_1'])
+        self.assertEqual(ds['rlevel_0'].dims, ('band', 'y', 'x'))
+        self.assertEqual(ds['rlevel_0'].shape, (3, 1456, 2592))
+        self.assertEqual(ds['rlevel_1'].dims, ('band', 'y_1', 'x_1'))
+        self.assertEqual(ds['rlevel_1'].shape, (3, 728, 1296))
+        self.assertEqual(ds['rlevel_0'].dtype, np.uint8)
+        self.assertEqual(len(ds.coords), 0)
+
+    def test_rlevels(self):
+        ds = xr.open_dataset(self.jp2file, engine=self.engine, rlevels=[-1])
+        self.assertEqual(list(ds.data_vars), ['rlevel_1'])
+
+        with self.assertRaises(IOError):
+            xr.open_dataset(self.jp2file, engine=self.engine, rlevels=[2])
+
+    def test_drop_variables(self):
+        ds = xr.open_dataset(self.jp2file, engine=self.engine,
+                             drop_variables=['rlevel_0'])
+        self.assertEqual(list(ds.data_vars), ['rlevel_1'])
+
+    def test_guess_can_open(self):
+        self.assertTrue(self.engine().guess_can_open('scene.JP2'))
+        self.assertTrue(self.engine().guess_can_open('scene.j2k'))
+        self.assertFalse(self.engine().guess_can_open('scene.tif'))
+        self.assertFalse(self.engine().guess_can_open(b'\x00\x00'))
+
+    def test_normalize_index(self):
+        self.assertEqual(xarray_backend._normalize_index(slice(2, 8, 3), 10),
+                         (2, 6, slice(None, None, 3)))
+        self.assertEqual(xarray_backend._normalize_index(slice(None, 3, -2),
+                                                         10),
+                         (5, 10, slice(None, None, -2)))
+        self.assertEqual(xarray_backend._normalize_index(-1, 10),
+                         (9, 10, 0))
+        with self.assertRaises(IndexError):
+            xarray_backend._normalize_index(10, 10)
+
+
+@unittest.skipIf(not fixtures.HAVE_XARRAY, "Requires xarray")
+@unittest.skipIf(os.name == "nt", WINDOWS_TMP_FILE_MSG)
+class TestGeoTIFFCoordinates(unittest.TestCase):
+    """
+    Tests for coordinates from the GeoTIFF UUID box.
+    """
+    def setUp(self):
+        relpath = os.path.join('data', 'degenerate_geotiff.tif')
+        path = pkg.resource_filename(__name__, relpath)
+        with open(path, 'rb') as fptr:
+            uuid_data = fptr.read()
+        the_uuid = uuid.UUID('b14bf8bd-083d-4b43-a5ae-8cd7d5a6ce03')
+        geotiff_uuid = glymur.jp2box.UUIDBox(the_uuid, uuid_data)
+
+        jp2 = Jp2k(glymur.data.nemo())
+        boxes = [jp2.box[0], jp2.box[1], jp2.box[2], geotiff_uuid,
+                 jp2.box[-1]]
+
+        with tempfile.NamedTemporaryFile(suffix=".jp2", delete=False) as tfile:
+            jp2.wrap(tfile.name, boxes=boxes)
+        self.jp2file = tfile.name
+        self.engine = xarray_backend.GlymurBackendEntrypoint
+
+    def tearDown(self):
+        os.unlink(self.jp2file)
+
+    def test_pixel_centres(self):
+        """
+        The tie point is the corner of the first pixel (PixelIsArea).
+        """
+        ds = xr.open_dataset(self.jp2file, engine=self.engine)
+
+        x = -2523306.125 + (np.arange(2592) + 0.5) * 0.25
+        y = -268608.875 - (np.arange(1456) + 0.5) * 0.25
+        np.testing.assert_allclose(ds['x'].values, x)
+        np.testing.assert_allclose(ds['y'].values, y)
+
+        x = -2523306.125 + (np.arange(1296) + 0.5) * 0.5
+        y = -268608.875 - (np.arange(728) + 0.5) * 0.5
+        np.testing.assert_allclose(ds['x_1'].values, x)
+        np.testing.assert_allclose(ds['y_1'].values, y)
+
+    def test_pixel_is_point(self):
+        tags = {
+            'ModelPixelScale': (2.0, 3.0, 0.0),
+            'ModelTiePoint': (0.0, 0.0, 0.0, 100.0, 200.0, 0.0),
+            'GeoKeyDirectory': (1, 1, 0, 1, 1025, 0, 1, 2),
+        }
+        x, y = xarray_backend._pixel_centres(tags, (2, 3), 0)
+        np.testing.assert_allclose(x, [100.0, 102.0, 104.0])
+        np.testing.assert_allclose(y, [200.0, 197.0])
+
+    def test_rotated(self):
+        tags = {
+            'ModelTransformation': (1.0, 0.5, 0.0, 0.0,
+                                    0.5, -1.0, 0.0, 0.0,
+                                    0.0, 0.0, 0.0, 0.0,
+                                    0.0, 0.0, 0.0, 1.0),
+        }
+        self.assertIsNone(xarray_backend._pixel_centres(tags, (2, 3), 0))
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+@unittest.skipIf(openjpeg_version < '2.1.0', "Requires as least v2.1.0")
+@unittest.skipIf(not fixtures.HAVE_XARRAY, "Requires xarray")
+class TestLazyIndexing(unittest.TestCase):
+    """
+    Tests for decoding through the dataset variables.
+    """
+    @classmethod
+    def setUpClass(self):
+        self.jp2file = glymur.data.nemo()
+        self.jp2_data = Jp2k(self.jp2file)[:]
+        self.engine = xarray_backend.GlymurBackendEntrypoint
+
+    def test_load(self):
+        ds = xr.open_dataset(self.jp2file, engine=self.engine)
+        np.testing.assert_array_equal(ds['rlevel_0'].values,
+                                      np.transpose(self.jp2_data, (2, 0, 1)))
+        expected = Jp2k(self.jp2file)[::2, ::2]
+        np.testing.assert_array_equal(ds['rlevel_1'].values,
+                                      np.transpose(expected, (2, 0, 1)))
+
+    def test_region_reads_only_region(self):
+        ds = xr.open_dataset(self.jp2file, engine=self.engine)
+        with patch('glymur.jp2k.Jp2k.__getitem__', autospec=True,
+                   side_effect=Jp2k.__getitem__) as mock_getitem:
+            actual = ds['rlevel_0'][1, 100:164:2, 200:264].values
+        np.testing.assert_array_equal(actual,
+                                      self.jp2_data[100:164:2, 200:264, 1])
+
+        self.assertEqual(mock_getitem.call_count, 1)
+        _, index = mock_getitem.call_args[0]
+        self.assertEqual(index, (slice(100, 163, 1), slice(200, 264, 1),
+                                 slice(1, 2)))
+
+    def test_reduced_region(self):
+        ds = xr.open_dataset(self.jp2file, engine=self.engine)
+        actual = ds['rlevel_1'][:, 10:20, -5:].values
+        numcols = self.jp2_data.shape[1]
+        expected = Jp2k(self.jp2file)[20:40:2, numcols - 10::2]
+        np.testing.assert_array_equal(actual,
+                                      np.transpose(expected, (2, 0, 1)))
+
+    def test_in_memory_source(self):
+        with open(self.jp2file, 'rb') as f:
+            data = f.read()
+        ds = xr.open_dataset(data, engine=self.engine)
+        np.testing.assert_array_equal(ds['rlevel_0'][:, :32, :32].values,
+                                      np.transpose(self.jp2_data[:32, :32],
+                                                   (2, 0, 1)))